@@ -1,3 +1,4 @@
 from .simulation import FluidSimulator
+from .ensemble import FluidEnsemble
 
-__all__ = ['FluidSimulator'] 
\ No newline at end of file
+__all__ = ['FluidSimulator', 'FluidEnsemble'] 
\ No newline at end of file
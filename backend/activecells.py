@@ -0,0 +1,184 @@
+import numpy as np
+from typing import Optional
+
+
+class ActiveCells:
+    """Compact index form of an obstacle mask, built once per ``set_obstacle``.
+
+    Holds the flat indices of the solid cells, of the solid surface (solid
+    cells with a fluid neighbour) and of the fluid boundary (fluid cells
+    whose 5-point stencil reaches into a solid), plus the bounding box of
+    the solids. ``spans`` are rectangles covering every ``block`` x ``block``
+    tile that holds a fluid cell, so sweeps can skip fully solid tiles; it
+    is None when no tile is entirely solid. Sweeping span by span costs a
+    few NumPy calls per span, so ``use_spans`` only turns it on for grids
+    of at least ``min_cells`` whose spans skip ``min_skipped`` of them.
+    ``edited`` derives the sets of a slightly different mask without
+    rescanning the grid.
+    """
+
+    # Jacobi sweeps over spans break even with the dense sweep at about a
+    # quarter of the grid skipped from 256x256 up, and lose even at 40%
+    # skipped on 128x128 (python -m backend.benchmarks.activecells)
+    min_skipped = 0.25
+    min_cells = 256 * 256
+
+    def __init__(self, mask: np.ndarray, block: Optional[int] = None):
+        mask = np.array(mask, dtype=bool)
+        mask.flags.writeable = False
+        self.mask = mask
+        self.shape = mask.shape
+        ny, nx = mask.shape
+        self.solid = np.flatnonzero(mask)
+
+        touches_solid = np.zeros_like(mask)
+        touches_solid[1:] |= mask[:-1]
+        touches_solid[:-1] |= mask[1:]
+        touches_solid[:, 1:] |= mask[:, :-1]
+        touches_solid[:, :-1] |= mask[:, 1:]
+        fluid = ~mask
+        touches_fluid = np.zeros_like(mask)
+        touches_fluid[1:] |= fluid[:-1]
+        touches_fluid[:-1] |= fluid[1:]
+        touches_fluid[:, 1:] |= fluid[:, :-1]
+        touches_fluid[:, :-1] |= fluid[:, 1:]
+        self.fluid_boundary = np.flatnonzero(touches_solid & fluid)
+        self.surface = np.flatnonzero(touches_fluid & mask)
+
+        self._find_box()
+
+        self.block = block or max(8, min(ny, nx) // 16)
+        b = self.block
+        by, bx = -(-ny // b), -(-nx // b)
+        padded = np.ones((by * b, bx * b), dtype=bool)
+        padded[:ny, :nx] = self.mask
+        self._full = padded.reshape(by, b, bx, b).all(axis=(1, 3))
+        self.spans, self.span_solid = self._find_spans()
+
+    def edited(self, mask: np.ndarray, cells: np.ndarray) -> "ActiveCells":
+        """The ActiveCells of ``mask``, which differs from this one at flat ``cells`` only.
+
+        Only the changed cells, their neighbours and their tiles are looked
+        at, so the cost follows the edit and the obstacle, not the grid.
+        """
+        cells = np.unique(cells)
+        if cells.size == 0:
+            return self
+        new = object.__new__(ActiveCells)
+        mask = np.array(mask, dtype=bool)
+        mask.flags.writeable = False
+        new.mask, new.shape, new.block = mask, self.shape, self.block
+        ny, nx = self.shape
+        flat = mask.reshape(-1)
+
+        # Surface and fluid-boundary membership can change on the edited
+        # cells and on their 5-point neighbours
+        rows, cols = np.divmod(cells, nx)
+        around = np.unique(np.concatenate((cells, cells[rows > 0] - nx, cells[rows < ny - 1] + nx,
+                                           cells[cols > 0] - 1, cells[cols < nx - 1] + 1)))
+        solid = flat[around]
+        touches_solid = np.zeros(around.size, dtype=bool)
+        touches_fluid = np.zeros(around.size, dtype=bool)
+        rows, cols = np.divmod(around, nx)
+        for valid, offset in ((rows > 0, -nx), (rows < ny - 1, nx), (cols > 0, -1), (cols < nx - 1, 1)):
+            neighbour = flat[around[valid] + offset]
+            touches_solid[valid] |= neighbour
+            touches_fluid[valid] |= ~neighbour
+        new.solid = _replace(self.solid, around, around[solid])
+        new.surface = _replace(self.surface, around, around[solid & touches_fluid])
+        new.fluid_boundary = _replace(self.fluid_boundary, around, around[~solid & touches_solid])
+        if flat[cells].all() and self.box is not None:
+            # Only additions: the box can only grow
+            r, c = np.divmod(cells, nx)
+            rs, cs = self.box
+            new.box = (slice(min(rs.start, r.min()), max(rs.stop, r.max() + 1)),
+                       slice(min(cs.start, c.min()), max(cs.stop, c.max() + 1)))
+            box_size = (new.box[0].stop - new.box[0].start) * (new.box[1].stop - new.box[1].start)
+            new._by_index = new.solid.size * 8 < box_size
+        else:
+            new._find_box()
+
+        b = self.block
+        full = self._full.copy()
+        for tile in np.unique((cells // nx // b) * full.shape[1] + cells % nx // b):
+            bi, bj = divmod(int(tile), full.shape[1])
+            full[bi, bj] = mask[bi * b:(bi + 1) * b, bj * b:(bj + 1) * b].all()
+        new._full = full
+        if self.spans is not None and np.array_equal(full, self._full):
+            # Same fully solid tiles, so the same spans
+            new.spans = self.spans
+            new.span_solid = _replace(self.span_solid, around, around[solid & ~full[rows // b, cols // b]])
+        else:
+            new.spans, new.span_solid = new._find_spans()
+        return new
+
+    def _find_box(self) -> None:
+        if self.solid.size:
+            rows, cols = np.divmod(self.solid, self.shape[1])
+            self.box = (slice(rows[0], rows[-1] + 1), slice(cols.min(), cols.max() + 1))
+            box_size = (rows[-1] + 1 - rows[0]) * (cols.max() + 1 - cols.min())
+        else:
+            self.box = None
+            box_size = 0
+        # Scattered solids are cheaper to zero by index, compact ones by a
+        # masked copy over their bounding box
+        self._by_index = self.solid.size * 8 < box_size
+
+    def _find_spans(self) -> tuple[Optional[list], Optional[np.ndarray]]:
+        ny, nx = self.shape
+        b = self.block
+        full = self._full
+        by, bx = full.shape
+        if not full.any():
+            return None, None
+
+        spans = []
+        prev_runs, prev_start = None, 0
+        for bi in range(by + 1):
+            runs = None
+            if bi < by:
+                edges = np.flatnonzero(np.diff(np.concatenate(([True], full[bi], [True])).astype(np.int8)))
+                runs = [(int(s) * b, min(int(e) * b, nx)) for s, e in zip(edges[::2], edges[1::2])]
+            if runs != prev_runs:
+                # Block rows with the same column runs merge into one span
+                if prev_runs:
+                    spans.extend((prev_start * b, min(bi * b, ny), c0, c1) for c0, c1 in prev_runs)
+                prev_runs, prev_start = runs, bi
+
+        # Spans tile exactly the tiles that are not fully solid
+        rows, cols = np.divmod(self.solid, nx)
+        return spans, self.solid[~full[rows // b, cols // b]]
+
+    @property
+    def skipped_fraction(self) -> float:
+        """Share of the grid outside ``spans``"""
+        if self.spans is None:
+            return 0.0
+        area = sum((r1 - r0) * (c1 - c0) for r0, r1, c0, c1 in self.spans)
+        return 1.0 - area / self.mask.size
+
+    @property
+    def use_spans(self) -> bool:
+        """Whether sweeps should go over ``spans`` instead of the whole grid"""
+        return (self.spans is not None and self.mask.size >= self.min_cells
+                and self.skipped_fraction >= self.min_skipped)
+
+    def zero(self, a: np.ndarray) -> None:
+        """Set ``a`` to zero on every solid cell"""
+        if self.box is None:
+            return
+        if self._by_index and a.flags.c_contiguous:
+            a.reshape(-1)[self.solid] = 0
+        else:
+            np.copyto(a[self.box], 0, where=self.mask[self.box])
+
+
+def _replace(indices: np.ndarray, region: np.ndarray, found: np.ndarray) -> np.ndarray:
+    """Sorted ``indices`` with their members in sorted ``region`` replaced by ``found`` (part of region)"""
+    # Only the run of indices between the first and last region cell can change
+    lo = np.searchsorted(indices, region[0])
+    hi = np.searchsorted(indices, region[-1], side='right')
+    middle = indices[lo:hi]
+    pos = np.searchsorted(region, middle)
+    kept = middle[region[np.minimum(pos, region.size - 1)] != middle]
+    return np.concatenate((indices[:lo], np.sort(np.concatenate((kept, found))), indices[hi:]))
@@ -0,0 +1,184 @@
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+import numpy as np
+
+from .simulation import FluidSimulator
+
+
+def _frozen(a: np.ndarray) -> np.ndarray:
+    a = a.copy()
+    a.flags.writeable = False
+    return a
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    """Immutable copy of the simulator state, with the simulator's getters"""
+    step_count: int
+    time: float
+    u: np.ndarray
+    v: np.ndarray
+    p: np.ndarray
+    obstacle: np.ndarray
+    stats: dict = field(default_factory=dict)
+    steps_per_sec: float = 0.0
+    version: int = 0
+    dx: float = 1.0
+
+    @classmethod
+    def capture(cls, sim: FluidSimulator, steps_per_sec: float = 0.0) -> "Snapshot":
+        stats = sim.get_statistics()
+        stats['steps_per_sec'] = steps_per_sec
+        # ActiveCells keeps a read-only copy of the mask that is only
+        # replaced, never modified, so it can be shared without copying
+        return cls(sim.step_count, sim.time, _frozen(sim.u), _frozen(sim.v), _frozen(sim.p),
+                   sim.active.mask, stats, steps_per_sec, sim.version, sim.dx)
+
+    def get_velocity(self) -> tuple[np.ndarray, np.ndarray]:
+        return self.u, self.v
+
+    def get_pressure(self) -> np.ndarray:
+        return self.p
+
+    def get_obstacle(self) -> np.ndarray:
+        return self.obstacle
+
+    def get_velocity_magnitude(self) -> np.ndarray:
+        return np.sqrt(self.u**2 + self.v**2)
+
+    def get_vorticity(self) -> np.ndarray:
+        vorticity = np.zeros_like(self.u)
+        vorticity[1:-1, 1:-1] = (
+            (self.v[1:-1, 2:] - self.v[1:-1, :-2]) -
+            (self.u[2:, 1:-1] - self.u[:-2, 1:-1])
+        ) / (2 * self.dx)
+        return vorticity
+
+    def get_statistics(self) -> dict:
+        return self.stats
+
+
+class BackgroundSimulation:
+    """Steps a FluidSimulator on a worker thread at full speed.
+
+    The worker publishes a new Snapshot at most every ``publish_interval``
+    seconds; publishing is a single reference swap, so ``latest()`` never
+    blocks and readers may keep a snapshot as long as they like. Edits are
+    queued with ``submit(fn, *args)`` and run as ``fn(sim, *args)`` on the
+    worker between steps, so the simulator is only ever touched by one
+    thread.
+    """
+
+    def __init__(self, sim: FluidSimulator, publish_interval: float = 1 / 120,
+                 rate_window: float = 0.5):
+        self.sim = sim
+        self.publish_interval = publish_interval
+        self.rate_window = rate_window
+        self.steps_per_sec = 0.0
+        self.error: Optional[BaseException] = None
+        self._paused = threading.Event()
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._commands: "queue.SimpleQueue[tuple]" = queue.SimpleQueue()
+        self._snapshot = Snapshot.capture(sim)
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def paused(self) -> bool:
+        return self._paused.is_set()
+
+    @paused.setter
+    def paused(self, value: bool) -> None:
+        if value:
+            self._paused.set()
+        else:
+            self._paused.clear()
+            self._wake.set()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> "BackgroundSimulation":
+        if not self.running:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="fluid-simulation", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Stop the worker; re-raises an exception it died with"""
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        if self.error is not None:
+            raise self.error
+
+    def submit(self, fn: Callable, *args) -> None:
+        """Queue ``fn(sim, *args)`` to run on the worker before its next step"""
+        self._commands.put((fn, args))
+        self._wake.set()
+
+    def set_obstacle(self, mask: np.ndarray) -> None:
+        self.submit(FluidSimulator.set_obstacle, mask)
+
+    def set_viscosity(self, nu: float) -> None:
+        self.submit(FluidSimulator.set_viscosity, nu)
+
+    def reset(self) -> None:
+        self.submit(FluidSimulator.reset)
+
+    def latest(self) -> Snapshot:
+        """Most recently published snapshot"""
+        return self._snapshot
+
+    def _drain(self) -> bool:
+        ran = False
+        while True:
+            try:
+                fn, args = self._commands.get_nowait()
+            except queue.Empty:
+                return ran
+            fn(self.sim, *args)
+            ran = True
+
+    def _publish(self) -> None:
+        last = self._snapshot
+        if last.version == self.sim.version and last.steps_per_sec == self.steps_per_sec:
+            return  # Nothing changed, readers keep the current snapshot
+        self._snapshot = Snapshot.capture(self.sim, self.steps_per_sec)
+
+    def _run(self) -> None:
+        try:
+            last_publish = window_start = time.perf_counter()
+            window_steps = 0
+            while not self._stop.is_set():
+                edited = self._drain()
+                if self._paused.is_set():
+                    self.steps_per_sec = 0.0
+                    if edited:
+                        self._publish()
+                    self._wake.wait(0.05)
+                    self._wake.clear()
+                    window_start, window_steps = time.perf_counter(), 0
+                    continue
+
+                self.sim.step()
+                window_steps += 1
+                now = time.perf_counter()
+                if now - window_start >= self.rate_window:
+                    self.steps_per_sec = window_steps / (now - window_start)
+                    window_start, window_steps = now, 0
+                if edited or now - last_publish >= self.publish_interval:
+                    self._publish()
+                    last_publish = now
+            self._drain()
+            self._publish()
+        except BaseException as exc:  # surfaced by stop()
+            self.error = exc
@@ -0,0 +1,66 @@
+"""Jacobi pressure solve with and without the ActiveCells index at several solid fractions.
+
+Times the dense sweep, the span sweep forced on, and whatever
+``ActiveCells.use_spans`` picks, for square obstacles and the ``circle``
+preset (about 5% solid, few fully solid tiles), so the ``min_skipped``
+threshold can be checked against both sides of the break-even point.
+
+Run with ``python -m backend.benchmarks.activecells [--sizes 256 1024]``.
+"""
+import argparse
+import time
+
+import numpy as np
+
+from ..activecells import ActiveCells
+from ..simulation import FluidSimulator
+from ..solvers import JacobiSolver
+from ..sweep import OBSTACLE_PRESETS
+
+
+def block_obstacle(n: int, fraction: float) -> np.ndarray:
+    """Square obstacle covering ``fraction`` of an n x n grid"""
+    mask = np.zeros((n, n), dtype=bool)
+    w = int(n * fraction**0.5)
+    mask[(n - w) // 2:(n - w) // 2 + w, n // 4:n // 4 + w] = True
+    return mask
+
+
+def _solve_time(n: int, div: np.ndarray, mask: np.ndarray, active, iterations: int) -> float:
+    solver = JacobiSolver(tol=0.0, max_iter=iterations)
+    solver.active = active
+    solver.solve(np.zeros((n, n)), div, mask, 1.0)  # warm up buffers
+    best = float("inf")
+    for _ in range(3):
+        p = np.zeros((n, n))
+        start = time.perf_counter()
+        solver.solve(p, div, mask, 1.0)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[256, 1024])
+    parser.add_argument("--fractions", type=float, nargs="+", default=[0.0, 0.1, 0.25, 0.5])
+    parser.add_argument("--iterations", type=int, default=50)
+    args = parser.parse_args(argv)
+
+    print(f"{'n':>5} {'mask':>8} {'solid':>6} {'skipped':>8} {'dense [ms]':>11} "
+          f"{'spans [ms]':>11} {'auto [ms]':>10}  path")
+    for n in args.sizes:
+        div = np.random.default_rng(0).standard_normal((n, n)) * 1e-2
+        masks = [(f"{fraction:g}", block_obstacle(n, fraction)) for fraction in args.fractions]
+        masks.append(("circle", OBSTACLE_PRESETS['circle'](FluidSimulator(n, n))))
+        for label, mask in masks:
+            auto = ActiveCells(mask)
+            forced = ActiveCells(mask)
+            forced.min_skipped, forced.min_cells = 0.0, 0
+            times = [_solve_time(n, div, mask, index, args.iterations) for index in (None, forced, auto)]
+            print(f"{n:>5} {label:>8} {mask.mean():>6.2f} {auto.skipped_fraction:>8.2f} "
+                  f"{times[0] * 1e3:>11.1f} {times[1] * 1e3:>11.1f} {times[2] * 1e3:>10.1f}  "
+                  f"{'spans' if auto.use_spans else 'dense'}")
+
+
+if __name__ == "__main__":
+    main()
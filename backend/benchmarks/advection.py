@@ -0,0 +1,61 @@
+"""Time and allocation comparison of the advection engine against the original path.
+
+Run with ``python -m backend.benchmarks.advection [--sizes 128 512 1024]``.
+"""
+import argparse
+import time
+import tracemalloc
+
+import numpy as np
+
+from ..advection import SemiLagrangianAdvector
+from ..reference import reference_advect
+
+
+def measure(fn, repeat: int) -> tuple[float, int]:
+    """Best wall time and peak traced allocation of one call"""
+    fn()  # warm up caches and buffers
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[128, 512, 1024])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    print(f"{'n':>5} {'path':<10} {'time [ms]':>10} {'peak alloc [MB]':>16}")
+    for n in args.sizes:
+        rng = np.random.default_rng(0)
+        u = rng.standard_normal((n, n))
+        v = rng.standard_normal((n, n))
+        obstacle = np.zeros((n, n), dtype=bool)
+        obstacle[n // 3:n // 2, n // 4:n // 3] = True
+        dt_dx = 0.1
+        engine = SemiLagrangianAdvector(n, n)
+        out = [np.empty((n, n)), np.empty((n, n))]
+
+        def original():
+            u0, v0 = u.copy(), v.copy()
+            reference_advect(u, u0, v0, dt_dx, obstacle)
+            reference_advect(v, u0, v0, dt_dx, obstacle)
+
+        def cached():
+            engine.advect([u, v], u, v, dt_dx, out=out, obstacle=obstacle)
+
+        for name, fn in (("original", original), ("engine", cached)):
+            elapsed, peak = measure(fn, args.repeat)
+            print(f"{n:>5} {name:<10} {elapsed * 1e3:>10.2f} {peak / 2**20:>16.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""Time-to-solution of explicit versus implicit diffusion at equal accuracy.
+
+Diffuses the lowest sine mode of the grid, whose exact decay is known, at
+high viscosity. Explicit Euler runs at its stability limit; each implicit
+scheme takes the largest step ``t_end / 2**k`` that still meets
+``--error`` (found with CG), and every solver is timed at that step.
+Run with ``python -m backend.benchmarks.diffusion [--n 128] [--viscosity 1]``.
+"""
+import argparse
+import time
+
+import numpy as np
+
+from ..simulation import FluidSimulator
+from ..solvers import DIFFUSION_SOLVERS
+
+
+def sine_mode(n: int) -> tuple[np.ndarray, float]:
+    """Lowest Dirichlet mode of an n x n grid and its discrete Laplacian eigenvalue (dx = 1)"""
+    s = np.sin(np.pi * np.arange(n) / (n - 1))
+    return np.outer(s, s), 2 * (2 - 2 * np.cos(np.pi / (n - 1)))
+
+
+def run(n: int, nu: float, t_end: float, dt: float, **kwargs) -> tuple[float, float, int]:
+    """(relative error, wall seconds, steps) diffusing the sine mode to ``t_end``"""
+    field, lam = sine_mode(n)
+    sim = FluidSimulator(nx=n, ny=n, viscosity=nu, **kwargs)
+    steps = int(np.ceil(t_end / dt - 1e-9))
+    start = time.perf_counter()
+    for _ in range(steps):
+        field = sim.diffuse(field, dt=t_end / steps, name='u')
+    wall = time.perf_counter() - start
+    exact = sine_mode(n)[0] * np.exp(-nu * lam * t_end)
+    return float(np.linalg.norm(field - exact) / np.linalg.norm(exact)), wall, steps
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--n", type=int, default=128)
+    parser.add_argument("--viscosity", type=float, default=1.0)
+    parser.add_argument("--t-end", type=float, default=500.0)
+    parser.add_argument("--error", type=float, default=1e-3, help="relative error every run must meet")
+    args = parser.parse_args(argv)
+
+    limit = 0.9 / (4 * args.viscosity)
+    print(f"{'scheme':>15} {'solver':>7} {'dt':>8} {'steps':>6} {'error':>9} {'wall [s]':>9}")
+    error, wall, steps = run(args.n, args.viscosity, args.t_end, limit)
+    print(f"{'explicit':>15} {'-':>7} {limit:>8.3f} {steps:>6} {error:>9.2e} {wall:>9.2f}")
+    for scheme in ("backward-euler", "crank-nicolson"):
+        dt = args.t_end
+        while dt > limit and run(args.n, args.viscosity, args.t_end, dt, diffusion=scheme,
+                                 diffusion_solver="cg")[0] > args.error:
+            dt /= 2
+        for name, cls in DIFFUSION_SOLVERS.items():
+            error, wall, steps = run(args.n, args.viscosity, args.t_end, dt, diffusion=scheme,
+                                     diffusion_solver=cls(tol=1e-8, max_iter=1000))
+            print(f"{scheme:>15} {name:>7} {dt:>8.3f} {steps:>6} {error:>9.2e} {wall:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
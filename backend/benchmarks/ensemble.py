@@ -0,0 +1,45 @@
+"""Stepping N simulators in a Python loop versus one batched FluidEnsemble.
+
+Run with ``python -m backend.benchmarks.ensemble [--members 16 64] [--sizes 64 128]``.
+"""
+import argparse
+import time
+
+import numpy as np
+
+from ..ensemble import FluidEnsemble
+from ..simulation import FluidSimulator
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--members", type=int, nargs="+", default=[16, 64])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[64, 128])
+    parser.add_argument("--steps", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    print(f"{'n':>5} {'members':>8} {'loop [ms/step]':>15} {'batched [ms/step]':>18} {'speedup':>8}")
+    for n in args.sizes:
+        for members in args.members:
+            nus = np.linspace(0.01, 0.05, members)
+            sims = [FluidSimulator(n, n, viscosity=nu, workspace=True) for nu in nus]
+            for k, sim in enumerate(sims):
+                sim.set_obstacle(sim.create_circle_obstacle(n // 4 + k % 8, n // 2, n // 10))
+            ens = FluidEnsemble.from_simulators(sims)
+
+            start = time.perf_counter()
+            for _ in range(args.steps):
+                for sim in sims:
+                    sim.step()
+            loop = (time.perf_counter() - start) / args.steps
+
+            start = time.perf_counter()
+            for _ in range(args.steps):
+                ens.step()
+            batched = (time.perf_counter() - start) / args.steps
+
+            print(f"{n:>5} {members:>8} {loop * 1e3:>15.1f} {batched * 1e3:>18.1f} {loop / batched:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Per-kernel microbenchmark of the NumPy path against the compiled backend.
+
+Run with ``python -m backend.benchmarks.kernels [--sizes 256 1024]``.
+"""
+import argparse
+import time
+
+import numpy as np
+
+from ..advection import SemiLagrangianAdvector
+from ..kernels import make_kernels
+from ..simulation import FluidSimulator, laplacian
+from ..solvers import JacobiSolver
+
+
+def best_of(fn, repeat: int) -> float:
+    fn()  # warm up (and JIT compile)
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[256, 1024])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    jit = make_kernels("auto")
+    if jit is None:
+        print("numba is not installed, only the NumPy path is timed")
+    print(f"{'n':>5} {'kernel':<10} {'numpy [ms]':>11} {'jit [ms]':>9} {'speedup':>8}")
+    for n in args.sizes:
+        rng = np.random.default_rng(0)
+        u, v = rng.standard_normal((n, n)), rng.standard_normal((n, n))
+        obstacle = np.zeros((n, n), dtype=bool)
+        obstacle[n // 3:n // 2, n // 4:n // 3] = True
+        out = [np.empty((n, n)), np.empty((n, n))]
+        advector = SemiLagrangianAdvector(n, n)
+        np_jacobi, jit_jacobi = JacobiSolver(tol=0), JacobiSolver(tol=0)
+        jit_jacobi.kernels = jit
+        sim = FluidSimulator(n, n)
+        sim.set_obstacle(obstacle)
+
+        cases = {
+            "laplacian": (lambda: laplacian(u, 1.0, out=out[0]),
+                          jit and (lambda: jit.laplacian(u, 1.0, out=out[0]))),
+            "advect": (lambda: advector.advect([u, v], u, v, 0.1, out=out, obstacle=obstacle),
+                       jit and (lambda: jit.advect([u, v], u, v, 0.1, out=out, obstacle=obstacle))),
+            "jacobi": (lambda: np_jacobi.solve(np.zeros((n, n)), u, obstacle, 1.0),
+                       jit and (lambda: jit_jacobi.solve(np.zeros((n, n)), u, obstacle, 1.0))),
+            "boundary": (sim.enforce_boundaries, jit and (lambda: jit.enforce_boundaries(out[0], out[1], 1.0, obstacle))),
+        }
+        for name, (numpy_fn, jit_fn) in cases.items():
+            t_np = best_of(numpy_fn, args.repeat) if numpy_fn else float("nan")
+            t_jit = best_of(jit_fn, args.repeat) if jit_fn else float("nan")
+            print(f"{n:>5} {name:<10} {t_np * 1e3:>11.2f} {t_jit * 1e3:>9.2f} {t_np / t_jit:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Spin-up wall time: fine grid only vs a coarse copy prolonged onto the fine grid.
+
+Develops the flow past a circle up to ``--t-end`` once on the fine grid
+and once on a 2x and 4x coarser copy that is then prolonged, then runs
+both for ``--settle`` more simulated seconds on the fine grid. Reports the
+spin-up wall time and how far the coarse-started velocity is from the
+fine-only one (relative L2) at the end, next to a cold start that only
+runs the ``--settle`` seconds from rest.
+
+Run with ``python -m backend.benchmarks.multires [--nx 257 --ny 129 --t-end 100]``.
+"""
+import argparse
+import time
+
+import numpy as np
+
+from ..multires import MultiResolution
+from ..simulation import FluidSimulator
+
+
+def make_simulator(nx: int, ny: int) -> FluidSimulator:
+    sim = FluidSimulator(nx=nx, ny=ny)
+    sim.set_obstacle(sim.create_circle_obstacle(nx // 4, ny // 2, ny // 10))
+    return sim
+
+
+def relative_error(sim: FluidSimulator, ref: FluidSimulator) -> float:
+    diff = np.sqrt(np.sum((sim.u - ref.u)**2 + (sim.v - ref.v)**2))
+    return float(diff / np.sqrt(np.sum(ref.u**2 + ref.v**2)))
+
+
+def main(argv=None) -> dict:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--nx", type=int, default=257)
+    parser.add_argument("--ny", type=int, default=129)
+    parser.add_argument("--t-end", type=float, default=100.0)
+    parser.add_argument("--settle", type=float, default=5.0, help="fine-grid seconds after the spin-up")
+    parser.add_argument("--factors", type=int, nargs="+", default=[2, 4])
+    args = parser.parse_args(argv)
+
+    ref = make_simulator(args.nx, args.ny)
+    start = time.perf_counter()
+    ref.advance_to(args.t_end)
+    t_ref = time.perf_counter() - start
+    ref.advance_to(args.t_end + args.settle)
+    cold = make_simulator(args.nx, args.ny)
+    cold.advance_to(args.settle)
+    results = {0: (0.0, relative_error(cold, ref)), 1: (t_ref, 0.0)}
+    print(f"{'factor':>6} {'spin-up [s]':>12} {'speed-up':>9} {'rel. error':>11}")
+    print(f"{'cold':>6} {0:>12.2f} {'':>9} {results[0][1]:>11.3f}")
+    print(f"{1:>6} {t_ref:>12.2f} {1:>9.1f} {0:>11.3f}")
+    for factor in args.factors:
+        sim = make_simulator(args.nx, args.ny)
+        multires = MultiResolution(sim, factor)
+        start = time.perf_counter()
+        multires.spin_up(args.t_end)
+        elapsed = time.perf_counter() - start
+        sim.advance_to(args.t_end + args.settle)
+        results[factor] = (elapsed, relative_error(sim, ref))
+        print(f"{factor:>6} {elapsed:>12.2f} {t_ref / elapsed:>9.1f} {results[factor][1]:>11.3f}")
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Freehand obstacle drawing cost: full-mask rebuilds vs incremental edits.
+
+Replays a drag of ``--events`` mouse positions across an n x n grid with a
+circle obstacle already in place, three ways: the original per-event
+copy-flip-``set_obstacle``, one ``add_obstacle_cells`` per event, and one
+``apply_obstacle_stroke`` per frame of ``--events-per-frame`` positions as
+the UI now sends them.
+
+Run with ``python -m backend.benchmarks.obstacle_edits [--sizes 256 1024]``.
+"""
+import argparse
+import time
+
+import numpy as np
+
+from ..simulation import FluidSimulator
+
+
+def drag_path(n: int, events: int) -> list:
+    """(x, y) positions of a diagonal drag with a small wobble"""
+    t = np.linspace(0.1, 0.9, events)
+    x = n * t
+    y = n * (0.3 + 0.4 * t + 0.05 * np.sin(12 * t))
+    return [(int(a), int(b)) for a, b in zip(x, y)]
+
+
+def full_rebuild(sim: FluidSimulator, path: list, per_frame: int) -> None:
+    for x, y in path:
+        mask = sim.get_obstacle().copy()
+        mask[y, x] = True
+        sim.set_obstacle(mask)
+
+
+def cell_edits(sim: FluidSimulator, path: list, per_frame: int) -> None:
+    for x, y in path:
+        sim.add_obstacle_cells([(y, x)])
+
+
+def frame_strokes(sim: FluidSimulator, path: list, per_frame: int) -> None:
+    for start in range(0, len(path), per_frame):
+        # Each frame's stroke starts at the last point of the previous one
+        sim.apply_obstacle_stroke(path[max(start - 1, 0):start + per_frame], 0.75)
+
+
+METHODS = {'set_obstacle': full_rebuild, 'add_cells': cell_edits, 'stroke': frame_strokes}
+
+
+def main(argv=None) -> dict:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[256, 1024])
+    parser.add_argument("--events", type=int, default=200)
+    parser.add_argument("--events-per-frame", type=int, default=8)
+    args = parser.parse_args(argv)
+
+    results = {}
+    print(f"{'n':>5} {'method':<13} {'total [ms]':>11} {'per event [us]':>15}")
+    for n in args.sizes:
+        path = drag_path(n, args.events)
+        for name, method in METHODS.items():
+            sim = FluidSimulator(nx=n, ny=n)
+            sim.set_obstacle(sim.create_circle_obstacle(n // 4, n // 2, n // 10))
+            start = time.perf_counter()
+            method(sim, path, args.events_per_frame)
+            elapsed = time.perf_counter() - start
+            results[(n, name)] = elapsed
+            print(f"{n:>5} {name:<13} {elapsed * 1e3:>11.2f} {elapsed / args.events * 1e6:>15.1f}")
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""Obstacle mask generation time, original full-grid builders vs backend.obstacles.
+
+Run with ``python -m backend.benchmarks.obstacles [--sizes 100 500 1000]``.
+"""
+import argparse
+import time
+
+import numpy as np
+
+from .. import obstacles
+from ..reference import reference_circle, reference_semicircle, reference_triangle
+
+
+def best_time(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 500, 1000])
+    parser.add_argument("--radius", type=int, default=6)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    print(f"{'n':>5} {'shape':<11} {'original [ms]':>14} {'cold [ms]':>10} {'cached [ms]':>12}")
+    for n in args.sizes:
+        c, r = n // 2, args.radius
+        cases = {
+            "circle": (lambda: reference_circle(n, n, c, c, r), obstacles.Circle(c, c, r)),
+            "semicircle": (lambda: reference_semicircle(n, n, c, c, r), obstacles.Semicircle(c, c, r)),
+            "triangle": (lambda: reference_triangle(n, n, c, c, r), obstacles.Triangle(c, c, r)),
+        }
+        for name, (original, shape) in cases.items():
+            repeat = 1 if name == "triangle" else args.repeat
+            t_orig = best_time(original, repeat)
+            obstacles.clear_cache()
+            start = time.perf_counter()
+            obstacles.rasterize(shape, (n, n))
+            t_cold = time.perf_counter() - start
+            t_cached = best_time(lambda: obstacles.rasterize(shape, (n, n)), args.repeat)
+            print(f"{n:>5} {name:<11} {t_orig * 1e3:>14.2f} {t_cold * 1e3:>10.3f} {t_cached * 1e3:>12.3f}")
+
+
+if __name__ == "__main__":
+    main()
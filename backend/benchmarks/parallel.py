@@ -0,0 +1,40 @@
+"""Strong scaling of strip-parallel stepping on one large grid.
+
+Run with ``python -m backend.benchmarks.parallel [--size 2048] [--threads 1 2 4 8 16]``.
+"""
+import argparse
+import time
+
+from ..simulation import FluidSimulator
+
+
+def time_step(n: int, threads: int, steps: int) -> float:
+    """Mean seconds per step of an n x n circle case on ``threads`` strips"""
+    with FluidSimulator(n, n, workspace=True, threads=threads) as sim:
+        sim.set_obstacle(sim.create_circle_obstacle(n // 4, n // 2, n // 10))
+        sim.step()  # allocate workspace buffers
+        start = time.perf_counter()
+        for _ in range(steps):
+            sim.step()
+        return (time.perf_counter() - start) / steps
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", type=int, default=2048)
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    parser.add_argument("--steps", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    n = args.size
+    print(f"{n}x{n}, {args.steps} steps")
+    print(f"{'threads':>8} {'ms/step':>9} {'speedup':>8} {'efficiency':>11}")
+    # Speedups are always against a measured serial run
+    base = time_step(n, 1, args.steps)
+    for threads in [1] + [t for t in args.threads if t != 1]:
+        elapsed = base if threads == 1 else time_step(n, threads, args.steps)
+        speedup = base / elapsed
+        print(f"{threads:>8} {elapsed * 1e3:>9.1f} {speedup:>8.2f} {speedup / threads:>11.2f}")
+
+if __name__ == "__main__":
+    main()
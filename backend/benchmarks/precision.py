@@ -0,0 +1,51 @@
+"""Memory footprint and step time in float64, float32 and mixed precision.
+
+Peak memory is what tracemalloc sees while building the simulator and
+taking the first steps, i.e. fields, advection buffers and solver scratch.
+Run with ``python -m backend.benchmarks.precision [--sizes 512 1024 2048]``.
+"""
+import argparse
+import time
+import tracemalloc
+
+import numpy as np
+
+from ..simulation import FluidSimulator
+
+MODES = {
+    "float64": {'dtype': np.float64},
+    "float32": {'dtype': np.float32},
+    "float32+p64": {'dtype': np.float32, 'pressure_dtype': np.float64},
+}
+
+
+def measure(n: int, steps: int, **kwargs) -> tuple[float, float]:
+    """(peak MiB, ms per step) for an n x n grid with a circular obstacle"""
+    tracemalloc.start()
+    sim = FluidSimulator(nx=n, ny=n, workspace=True, **kwargs)
+    sim.set_obstacle(sim.create_circle_obstacle(n // 4, n // 2, n // 8))
+    sim.step()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    start = time.perf_counter()
+    for _ in range(steps):
+        sim.step()
+    return peak / 2**20, (time.perf_counter() - start) / steps * 1e3
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[512, 1024, 2048])
+    parser.add_argument("--steps", type=int, default=5)
+    parser.add_argument("--solver", default="jacobi")
+    args = parser.parse_args(argv)
+
+    print(f"{'n':>5} {'mode':<12} {'peak [MiB]':>11} {'ms/step':>9}")
+    for n in args.sizes:
+        for name, kwargs in MODES.items():
+            peak, ms = measure(n, args.steps, pressure_solver=args.solver, **kwargs)
+            print(f"{n:>5} {name:<12} {peak:>11.1f} {ms:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""Time-to-tolerance of the pressure solvers across grid sizes.
+
+Run with ``python -m backend.benchmarks.pressure [--sizes 64 128 256 512]``.
+"""
+import argparse
+import time
+
+import numpy as np
+
+from ..solvers import PRESSURE_SOLVERS, JacobiSolver, make_pressure_solver
+
+
+def make_problem(n: int, seed: int = 0) -> tuple[np.ndarray, np.ndarray]:
+    """Divergence of a random velocity field around a circular obstacle"""
+    rng = np.random.default_rng(seed)
+    u = rng.standard_normal((n, n))
+    v = rng.standard_normal((n, n))
+    div = np.zeros((n, n))
+    div[1:-1, 1:-1] = ((u[1:-1, 2:] - u[1:-1, :-2]) + (v[2:, 1:-1] - v[:-2, 1:-1])) / 2
+    y, x = np.ogrid[:n, :n]
+    obstacle = (x - n // 4)**2 + (y - n // 2)**2 <= (n // 8)**2
+    return div, obstacle
+
+
+def time_solver(solver, div: np.ndarray, obstacle: np.ndarray, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        p = np.zeros_like(div)
+        start = time.perf_counter()
+        solver.solve(p, div, obstacle, 1.0)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[64, 128, 256, 512])
+    parser.add_argument("--tol", type=float, default=1e-6)
+    parser.add_argument("--jacobi-cap", type=int, default=20000,
+                        help="iteration cap for Jacobi run to tolerance")
+    parser.add_argument("--obstacle-free", action="store_true")
+    args = parser.parse_args(argv)
+
+    print(f"{'n':>5} {'solver':<16} {'time [ms]':>10} {'iters':>7} {'residual':>10} converged")
+    for n in args.sizes:
+        div, obstacle = make_problem(n)
+        if args.obstacle_free:
+            obstacle[:] = False
+        solvers = {
+            "jacobi-100": JacobiSolver(),  # the original project() loop
+            "jacobi": JacobiSolver(tol=args.tol, max_iter=args.jacobi_cap, criterion="residual"),
+        }
+        for name in PRESSURE_SOLVERS:
+            if name == "jacobi":
+                continue
+            try:
+                solvers[name] = make_pressure_solver(name, tol=args.tol)
+            except ImportError as exc:
+                print(f"{n:>5} {name:<16} skipped ({exc})")
+        for name, solver in solvers.items():
+            repeat = 1 if name == "jacobi" else 3
+            elapsed = time_solver(solver, div, obstacle, repeat)
+            print(f"{n:>5} {name:<16} {elapsed * 1e3:>10.1f} {solver.iterations:>7} "
+                  f"{solver.residual:>10.2e} {solver.converged}")
+
+
+if __name__ == "__main__":
+    main()
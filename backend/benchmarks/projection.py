@@ -0,0 +1,54 @@
+"""Projection policies: cost per step against the divergence left behind.
+
+Steps an inlet-driven channel with a cylinder under each policy and reports
+time per step, mean pressure iterations, the final relative residual and
+the RMS of ``get_divergence`` over the fluid.
+Run with ``python -m backend.benchmarks.projection [--nx 256 --ny 128] [--tol 1e-3]``.
+"""
+import argparse
+import time
+
+import numpy as np
+
+from ..simulation import FluidSimulator
+from ..solvers import JacobiSolver, SORSolver
+
+
+def policies(tol: float, check_every: int) -> dict:
+    """Name -> FluidSimulator keyword arguments"""
+    return {
+        "jacobi-100": {},  # the original fixed loop
+        "jacobi-residual": {'pressure_solver': JacobiSolver(tol=tol, max_iter=1000, criterion="residual",
+                                                            check_every=check_every)},
+        "sor": {'pressure_solver': SORSolver(tol=tol, check_every=check_every)},
+        "sor+extrapolate": {'pressure_solver': SORSolver(tol=tol, check_every=check_every),
+                            'pressure_extrapolation': True},
+    }
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--nx", type=int, default=256)
+    parser.add_argument("--ny", type=int, default=128)
+    parser.add_argument("--steps", type=int, default=100)
+    parser.add_argument("--tol", type=float, default=1e-3, help="relative residual tolerance")
+    parser.add_argument("--check-every", type=int, default=4)
+    args = parser.parse_args(argv)
+
+    print(f"{'policy':<16} {'ms/step':>8} {'iters':>7} {'residual':>10} {'div rms':>9}")
+    for name, kwargs in policies(args.tol, args.check_every).items():
+        sim = FluidSimulator(nx=args.nx, ny=args.ny, **kwargs)
+        sim.set_obstacle(sim.create_circle_obstacle(args.ny // 2, args.ny // 2, args.ny // 10))
+        iterations = []
+        start = time.perf_counter()
+        for _ in range(args.steps):
+            sim.step()
+            iterations.append(sim.pressure_iterations)
+        elapsed = time.perf_counter() - start
+        stats = sim.get_statistics()
+        print(f"{name:<16} {elapsed / args.steps * 1e3:>8.2f} {np.mean(iterations):>7.1f} "
+              f"{stats['pressure_residual']:>10.2e} {stats['divergence_rms']:>9.2e}")
+
+
+if __name__ == "__main__":
+    main()
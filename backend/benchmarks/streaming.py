@@ -0,0 +1,90 @@
+"""Frame streaming throughput: frames/s and bytes per frame per field and encoding.
+
+Records ``--record`` consecutive snapshots of the flow past a circle,
+then replays them into a StreamServer as fast as it takes them (server,
+``--clients`` local clients decoding everything and the replay share one
+event loop, so one core) for ``--seconds`` per case. Successive real
+steps keep the delta sizes realistic without the simulator capping the
+frame rate. Reports frames encoded per second, frames each client
+decoded per second, mean bytes per received frame (against the raw
+float32 size) and frames dropped under backpressure.
+
+Run with ``python -m backend.benchmarks.streaming [--n 256 --clients 4]``.
+"""
+import argparse
+import asyncio
+import dataclasses
+import time
+
+from ..background import Snapshot
+from ..simulation import FluidSimulator
+from ..streaming import StreamClient, StreamServer
+
+
+async def _consume(client: StreamClient, counts: list) -> None:
+    while True:
+        frame = await client.receive()
+        counts[0] += 1
+        counts[1] += frame.nbytes
+
+
+async def run_case(snapshots: list, field: str, dtype: str, clients: int, seconds: float) -> dict:
+    server = await StreamServer(field=field, dtype=dtype, max_clients=clients).start()
+    counts = [[0, 0] for _ in range(clients)]
+    conns = [await StreamClient.connect("127.0.0.1", server.port) for _ in range(clients)]
+    tasks = [asyncio.ensure_future(_consume(c, n)) for c, n in zip(conns, counts)]
+    start = time.perf_counter()
+    k = 0
+    while time.perf_counter() - start < seconds:
+        snap = snapshots[k % len(snapshots)]
+        server.publish(dataclasses.replace(snap, version=k), force=True)
+        k += 1
+        await asyncio.sleep(0)
+    elapsed = time.perf_counter() - start
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    for conn in conns:
+        await conn.close()
+    await server.close()
+    received = sum(n for n, _ in counts)
+    return {
+        'encoded_fps': server.frames / elapsed,
+        'client_fps': received / clients / elapsed,
+        'bytes_per_frame': sum(b for _, b in counts) / max(received, 1),
+        'dropped': server.dropped,
+    }
+
+
+def main(argv=None) -> dict:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--n", type=int, default=256)
+    parser.add_argument("--clients", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=3.0)
+    parser.add_argument("--record", type=int, default=40, help="consecutive steps replayed in a loop")
+    parser.add_argument("--fields", nargs="+", default=["speed", "vorticity"])
+    parser.add_argument("--dtypes", nargs="+", default=["uint8", "float16"])
+    args = parser.parse_args(argv)
+
+    sim = FluidSimulator(nx=args.n, ny=args.n // 2)
+    sim.set_obstacle(sim.create_circle_obstacle(args.n // 4, args.n // 4, args.n // 16))
+    for _ in range(50):
+        sim.step()
+    snapshots = []
+    for _ in range(args.record):
+        sim.step()
+        snapshots.append(Snapshot.capture(sim))
+    raw = sim.u.size * 4
+    results = {}
+    print(f"{'field':<10} {'dtype':<8} {'encoded/s':>10} {'client/s':>9} {'B/frame':>9} {'of raw':>7} {'dropped':>8}")
+    for field in args.fields:
+        for dtype in args.dtypes:
+            r = asyncio.run(run_case(snapshots, field, dtype, args.clients, args.seconds))
+            results[(field, dtype)] = r
+            print(f"{field:<10} {dtype:<8} {r['encoded_fps']:>10.1f} {r['client_fps']:>9.1f} "
+                  f"{r['bytes_per_frame']:>9.0f} {r['bytes_per_frame'] / raw:>7.1%} {r['dropped']:>8}")
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+"""Benchmark suite with a stored baseline: kernels, projection, full steps and drawing.
+
+Times ``laplacian``, ``advect``, ``diffuse``, ``project``, ``step`` and a
+headless ``FluidUI.draw_grid`` (SDL dummy driver; skipped without pygame)
+over grid sizes and obstacle fractions, reporting throughput in cells/s
+and the peak memory a call allocates. Kernels that ignore obstacles only
+run at 0%.
+
+    python -m backend.benchmarks.suite --quick --save-baseline benchmarks/baseline.json
+    python -m backend.benchmarks.suite --quick --baseline benchmarks/baseline.json
+
+With ``--baseline`` every case slower than the baseline by more than
+``--tolerance`` (or allocating more than ``--memory-tolerance`` above it)
+is listed and the run exits with status 1. Timings only compare on the
+same machine, so keep one baseline per machine (a warning is printed when
+the recorded machine differs).
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from typing import Callable
+
+import numpy as np
+
+from ..simulation import FluidSimulator, laplacian
+from .activecells import block_obstacle
+
+SIZES = [64, 128, 256, 512, 1024, 2048]
+QUICK_SIZES = [64, 256]
+FRACTIONS = [0.0, 0.25, 0.5]
+# Bytes a call may allocate above the baseline before it counts as a
+# regression, so tiny ufunc buffers do not trip the memory check
+MEMORY_SLACK = 64 * 1024
+
+
+def make_simulator(n: int, fraction: float, **kwargs) -> FluidSimulator:
+    """An n x n simulator with a square obstacle covering ``fraction``, a few steps in"""
+    sim = FluidSimulator(nx=n, ny=n, **kwargs)
+    if fraction > 0:
+        sim.set_obstacle(block_obstacle(n, fraction))
+    for _ in range(2):
+        sim.step()
+    return sim
+
+
+def _laplacian(sim: FluidSimulator) -> Callable[[], object]:
+    out = np.empty_like(sim.u)
+    return lambda: laplacian(sim.u, sim.dx, out=out)
+
+
+def _advect(sim: FluidSimulator) -> Callable[[], object]:
+    return lambda: sim.advect(sim.u, sim.u, sim.v)
+
+
+def _diffuse(sim: FluidSimulator) -> Callable[[], object]:
+    out = np.empty_like(sim.u)
+    return lambda: sim.diffuse(sim.u, out=out)
+
+
+def _project(sim: FluidSimulator) -> Callable[[], object]:
+    # Restore the input state first, otherwise every call after the first
+    # starts from a converged pressure
+    u, v, p = sim.u.copy(), sim.v.copy(), sim.p.copy()
+
+    def run():
+        np.copyto(sim.u, u)
+        np.copyto(sim.v, v)
+        np.copyto(sim.p, p)
+        sim.project()
+    return run
+
+
+def _step(sim: FluidSimulator) -> Callable[[], object]:
+    return sim.step
+
+
+def _draw_grid(sim: FluidSimulator) -> Callable[[], object]:
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    from frontend.python.ui import FluidUI  # ImportError without pygame
+    size = max(sim.nx, 512)
+    ui = FluidUI(sim, width=size, height=size)
+    ui.init_pygame()
+
+    def run():
+        ui._frame_key = None  # Time the render, not the cached redraw
+        ui.draw_grid()
+    return run
+
+
+# name -> (builds the timed callable from a simulator, whether obstacles matter)
+CASES = {
+    'laplacian': (_laplacian, False),
+    'advect': (_advect, True),
+    'diffuse': (_diffuse, False),
+    'project': (_project, True),
+    'step': (_step, True),
+    'draw_grid': (_draw_grid, True),
+}
+
+
+def time_call(fn: Callable[[], object], min_time: float, max_repeat: int, min_repeat: int = 5) -> float:
+    """Best seconds per call after one warm-up call"""
+    fn()
+    best = float("inf")
+    total = 0
+    for repeat in range(1, max_repeat + 1):
+        start = time.perf_counter_ns()
+        fn()
+        elapsed = time.perf_counter_ns() - start
+        best = min(best, elapsed)
+        total += elapsed
+        if repeat >= min_repeat and total >= min_time * 1e9:
+            break
+    return best * 1e-9
+
+
+def peak_allocation(fn: Callable[[], object]) -> int:
+    """Bytes allocated at the high-water mark of one call"""
+    tracemalloc.start()
+    base, _ = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return max(peak - base, 0)
+
+
+def run_suite(sizes=SIZES, fractions=FRACTIONS, cases=None, min_time: float = 0.5,
+              max_repeat: int = 1000, log=print, **sim_kwargs) -> dict:
+    """Results keyed ``"case/n/fraction"``; cases that cannot run here are left out"""
+    results = {}
+    skipped = set()
+    for n in sizes:
+        for fraction in fractions:
+            with make_simulator(n, fraction, **sim_kwargs) as sim:
+                for name in cases or CASES:
+                    build, uses_obstacle = CASES[name]
+                    if name in skipped or (fraction > 0 and not uses_obstacle):
+                        continue
+                    try:
+                        fn = build(sim)
+                    except ImportError as exc:
+                        log(f"{name:<10} skipped ({exc})")
+                        skipped.add(name)
+                        continue
+                    seconds = time_call(fn, min_time, max_repeat, min(5, max_repeat))
+                    key = f"{name}/{n}/{fraction:g}"
+                    results[key] = {
+                        'seconds': seconds,
+                        'cells_per_sec': n * n / seconds,
+                        'peak_bytes': peak_allocation(fn),
+                    }
+                    log(f"{name:<10} {n:>5} {fraction:>6.2f} {seconds * 1e3:>10.3f} "
+                        f"{n * n / seconds / 1e6:>12.2f} {results[key]['peak_bytes'] / 2**20:>10.2f}")
+    return results
+
+
+def compare(results: dict, baseline: dict, tolerance: float = 0.3,
+            memory_tolerance: float = 0.25) -> list:
+    """Descriptions of every case that regressed against ``baseline``"""
+    failures = []
+    for key, old in baseline.get('results', {}).items():
+        new = results.get(key)
+        if new is None:
+            continue
+        if new['cells_per_sec'] < old['cells_per_sec'] * (1 - tolerance):
+            failures.append(f"{key}: {new['cells_per_sec'] / 1e6:.2f} Mcells/s, baseline "
+                            f"{old['cells_per_sec'] / 1e6:.2f} ({new['cells_per_sec'] / old['cells_per_sec'] - 1:+.0%})")
+        if new['peak_bytes'] > old['peak_bytes'] * (1 + memory_tolerance) + MEMORY_SLACK:
+            failures.append(f"{key}: peak {new['peak_bytes']} bytes, baseline {old['peak_bytes']}")
+    return failures
+
+
+def machine() -> dict:
+    return {
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'machine': platform.machine(),
+        'processor': platform.processor(),
+        'cpus': os.cpu_count(),
+    }
+
+
+def main(argv=None) -> dict:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=None)
+    parser.add_argument("--quick", action="store_true", help="sizes " + " ".join(map(str, QUICK_SIZES)))
+    parser.add_argument("--fractions", type=float, nargs="+", default=FRACTIONS)
+    parser.add_argument("--cases", nargs="+", choices=list(CASES))
+    parser.add_argument("--min-time", type=float, default=0.5, help="seconds of repeats per case")
+    parser.add_argument("--solver", default="jacobi")
+    parser.add_argument("--kernels", default="numpy")
+    parser.add_argument("--baseline", help="fail on regressions against this results file")
+    parser.add_argument("--save-baseline", help="write the results to this file")
+    parser.add_argument("--tolerance", type=float, default=0.3, help="allowed throughput loss")
+    parser.add_argument("--memory-tolerance", type=float, default=0.25, help="allowed peak memory growth")
+    args = parser.parse_args(argv)
+    sizes = args.sizes or (QUICK_SIZES if args.quick else SIZES)
+
+    print(f"{'case':<10} {'n':>5} {'solid':>6} {'time [ms]':>10} {'Mcells/s':>12} {'peak [MiB]':>10}")
+    results = run_suite(sizes, args.fractions, args.cases, args.min_time,
+                        pressure_solver=args.solver, kernels=args.kernels)
+    report = {'machine': machine(), 'config': {'solver': args.solver, 'kernels': args.kernels},
+              'results': results}
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save_baseline)), exist_ok=True)
+        with open(args.save_baseline, "w") as f:
+            json.dump(report, f, indent=1, sort_keys=True)
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline.get('machine') != report['machine'] or baseline.get('config') != report['config']:
+            print(f"warning: {args.baseline} was recorded on another machine or configuration",
+                  file=sys.stderr)
+        failures = compare(results, baseline, args.tolerance, args.memory_tolerance)
+        if failures:
+            print(f"{len(failures)} regression(s) against {args.baseline}:", file=sys.stderr)
+            for failure in failures:
+                print(f"  {failure}", file=sys.stderr)
+            raise SystemExit(1)
+        print(f"no regressions against {args.baseline}")
+    return report
+
+
+if __name__ == "__main__":
+    main()
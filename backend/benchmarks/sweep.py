@@ -0,0 +1,36 @@
+"""Strong scaling of the process-pool sweep runner over worker counts.
+
+Run with ``python -m backend.benchmarks.sweep [--workers 1 2 4 8 16 32]``.
+"""
+import argparse
+import os
+
+from ..sweep import parameter_grid, run_sweep
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    cpus = os.cpu_count() or 1
+    parser.add_argument("--workers", type=int, nargs="+",
+                        default=[w for w in (1, 2, 4, 8, 16, 32) if w <= cpus])
+    parser.add_argument("--size", type=int, default=96)
+    parser.add_argument("--steps", type=int, default=50)
+    parser.add_argument("--cases", type=int, default=32, help="approximate number of cases")
+    args = parser.parse_args(argv)
+
+    n_nu = max(args.cases // 4, 1)
+    cases = parameter_grid([0.005 * (k + 1) for k in range(n_nu)], [0.5, 1.0],
+                           ['circle', 'rectangle'])
+    print(f"{len(cases)} cases, {args.size}x{args.size}, {args.steps} steps")
+    print(f"{'workers':>8} {'wall [s]':>9} {'speedup':>8} {'efficiency':>11}")
+    baseline = None
+    for workers in args.workers:
+        result = run_sweep(cases, args.size, args.size, args.steps, keep_fields=True,
+                           max_workers=workers, workspace=True)
+        baseline = baseline or result.wall_time * workers
+        speedup = baseline / result.wall_time
+        print(f"{workers:>8} {result.wall_time:>9.2f} {speedup:>8.2f} {speedup / workers:>11.2f}")
+
+
+if __name__ == "__main__":
+    main()
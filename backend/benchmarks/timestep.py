@@ -0,0 +1,43 @@
+"""Fixed versus CFL-adaptive time stepping on an inlet-driven channel with a cylinder.
+
+Reports simulated seconds per wall-clock second to reach the same end time.
+Run with ``python -m backend.benchmarks.timestep [--u-in 1 4] [--t-end 20]``.
+"""
+import argparse
+import time
+
+from ..simulation import FluidSimulator
+
+
+def run(n: int, u_in: float, t_end: float, **kwargs) -> tuple[int, float, float]:
+    """(steps, wall seconds, largest CFL number seen) to advance a fresh channel to ``t_end``"""
+    sim = FluidSimulator(nx=2 * n, ny=n, u_in=u_in, **kwargs)
+    sim.set_obstacle(sim.create_circle_obstacle(n // 2, n // 2, n // 8))
+    peak_cfl = 0.0
+    start = time.perf_counter()
+    while t_end - sim.time > 1e-9 * sim.dt:
+        sim.step(dt=t_end - sim.time)
+        peak_cfl = max(peak_cfl, sim.get_statistics()['max_speed'] * sim.dt / sim.dx)
+    return sim.step_count, time.perf_counter() - start, peak_cfl
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--n", type=int, default=96, help="channel height, width is 2n")
+    parser.add_argument("--u-in", type=float, nargs="+", default=[1.0, 2.0, 4.0])
+    parser.add_argument("--t-end", type=float, default=20.0)
+    parser.add_argument("--dt", type=float, default=0.1, help="fixed step, chosen by hand")
+    parser.add_argument("--cfl", type=float, default=1.0)
+    parser.add_argument("--viscosity", type=float, default=0.02)
+    args = parser.parse_args(argv)
+
+    print(f"{'u_in':>5} {'mode':>9} {'steps':>6} {'wall [s]':>9} {'sim s/s':>8} {'max CFL':>8}")
+    for u_in in args.u_in:
+        for mode, kwargs in (("fixed", {'dt': args.dt}),
+                             ("adaptive", {'adaptive': True, 'cfl': args.cfl})):
+            steps, wall, cfl = run(args.n, u_in, args.t_end, viscosity=args.viscosity, **kwargs)
+            print(f"{u_in:>5.1f} {mode:>9} {steps:>6} {wall:>9.2f} {args.t_end / wall:>8.1f} {cfl:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
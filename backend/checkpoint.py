@@ -0,0 +1,146 @@
+import json
+import os
+import tempfile
+import threading
+from typing import Optional
+
+import numpy as np
+
+# Checkpoint file layout:
+#   [0, 8)          magic
+#   [8, 16)         header length, little-endian uint64
+#   [16, 4096)      JSON header: grid, parameters, time, step count, dtype, offsets
+#   4096...         u, v, p as raw C-order arrays, then the bit-packed obstacle
+#                   mask, each starting on a 64-byte boundary
+# Raw arrays at known offsets can be memory-mapped on load.
+
+MAGIC = b"FLUIDCK1"
+HEADER_SIZE = 4096
+ALIGN = 64
+FIELDS = ('u', 'v', 'p')
+
+
+def _aligned(offset: int) -> int:
+    return -(-offset // ALIGN) * ALIGN
+
+
+def capture_state(sim, copy: bool = False) -> dict:
+    """Everything a checkpoint stores, optionally copied out of the simulator"""
+    take = np.copy if copy else (lambda a: a)
+    return {
+        'nx': sim.nx, 'ny': sim.ny, 'dx': sim.dx, 'dt': sim.dt, 'viscosity': sim.nu,
+        'u_in': sim.u_in, 'time': sim.time, 'step_count': sim.step_count,
+        'u': take(sim.u), 'v': take(sim.v), 'p': take(sim.p),
+        'obstacle': np.packbits(sim.obstacle),
+    }
+
+
+def write_state(path: str, state: dict, dtype=None) -> int:
+    """Write ``state`` to ``path`` atomically; returns the file size"""
+    dtype = np.dtype(dtype or np.result_type(*(state[name] for name in FIELDS)))
+    shape = state['u'].shape
+    offsets = {}
+    offset = HEADER_SIZE
+    for name in FIELDS:
+        offsets[name] = offset
+        offset = _aligned(offset + int(np.prod(shape)) * dtype.itemsize)
+    offsets['obstacle'] = offset
+    size = offset + state['obstacle'].nbytes
+
+    header = {k: state[k] for k in ('nx', 'ny', 'dx', 'dt', 'viscosity', 'u_in', 'time', 'step_count')}
+    header.update(dtype=dtype.str, shape=list(shape), offsets=offsets)
+    blob = json.dumps(header).encode()
+    if len(blob) > HEADER_SIZE - 16:
+        raise ValueError("checkpoint header too large")
+
+    # A unique temp file per write, so concurrent saves to one path (a
+    # manual save racing an auto checkpoint) never share a partial file
+    directory, base = os.path.split(os.path.abspath(path))
+    with tempfile.NamedTemporaryFile(dir=directory, prefix=base + ".", suffix=".tmp", delete=False) as f:
+        tmp = f.name
+        try:
+            f.write(MAGIC)
+            f.write(np.uint64(len(blob)).tobytes())
+            f.write(blob)
+            for name in FIELDS:
+                f.seek(offsets[name])
+                f.write(memoryview(np.ascontiguousarray(state[name], dtype=dtype)))
+            f.seek(offsets['obstacle'])
+            f.write(memoryview(state['obstacle']))
+            f.flush()
+            os.fsync(f.fileno())
+        except BaseException:
+            f.close()
+            os.remove(tmp)
+            raise
+    os.replace(tmp, path)
+    return size
+
+
+def read_header(path: str) -> dict:
+    with open(path, "rb") as f:
+        if f.read(8) != MAGIC:
+            raise ValueError(f"{path} is not a FluidSimulator checkpoint")
+        n = int(np.frombuffer(f.read(8), dtype=np.uint64)[0])
+        return json.loads(f.read(n))
+
+
+def read_state(path: str) -> dict:
+    """Header values plus u, v, p mapped copy-on-write and the unpacked obstacle"""
+    header = read_header(path)
+    shape = tuple(header['shape'])
+    state = dict(header)
+    for name in FIELDS:
+        # mode 'c': pages load lazily, writes stay private to this process
+        state[name] = np.memmap(path, dtype=np.dtype(header['dtype']), mode='c',
+                                offset=header['offsets'][name], shape=shape)
+    n_cells = int(np.prod(shape))
+    packed = np.memmap(path, dtype=np.uint8, mode='r', offset=header['offsets']['obstacle'],
+                       shape=((n_cells + 7) // 8,))
+    state['obstacle'] = np.unpackbits(packed, count=n_cells).reshape(shape).astype(bool)
+    return state
+
+
+class AutoCheckpoint:
+    """Checkpoint a simulator every ``every`` steps without stalling the step loop.
+
+    The step loop only copies the state; the file is written on a
+    background thread. A checkpoint that comes due while the previous one
+    is still being written is skipped (counted in ``skipped``) rather than
+    waited for.
+    """
+
+    def __init__(self, path: str, every: int, float32: bool = False):
+        self.path = path
+        self.every = every
+        self.dtype = np.float32 if float32 else None
+        self.written = 0
+        self.skipped = 0
+        self.error: Optional[BaseException] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def after_step(self, sim) -> None:
+        if self.error is not None:
+            raise self.error
+        if sim.step_count % self.every:
+            return
+        if self._thread is not None and self._thread.is_alive():
+            self.skipped += 1
+            return
+        state = capture_state(sim, copy=True)
+        self._thread = threading.Thread(target=self._write, args=(state,), name="checkpoint-writer", daemon=True)
+        self._thread.start()
+
+    def _write(self, state: dict) -> None:
+        try:
+            write_state(self.path, state, self.dtype)
+            self.written += 1
+        except BaseException as exc:  # re-raised on the next step or wait()
+            self.error = exc
+
+    def wait(self) -> None:
+        """Block until the checkpoint in flight is on disk"""
+        if self._thread is not None:
+            self._thread.join()
+        if self.error is not None:
+            raise self.error
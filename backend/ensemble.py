@@ -0,0 +1,252 @@
+import numpy as np
+import time
+from typing import Optional, Sequence, Union
+
+from .advection import SemiLagrangianAdvector
+from .simulation import FluidSimulator, laplacian
+from .solvers import JacobiSolver, PressureSolver
+from .workspace import Workspace
+
+Param = Union[float, Sequence[float], np.ndarray]
+
+
+def _jacobi_settings(solver: PressureSolver) -> Optional[tuple]:
+    if not isinstance(solver, JacobiSolver):
+        return None
+    return solver.tol, solver.max_iter, solver.criterion, solver.check_every
+
+
+class FluidEnsemble:
+    """N FluidSimulator cases stepped together as stacked (N, ny, nx) arrays.
+
+    Members share the grid (nx, ny, dx) and may differ in viscosity, inlet
+    speed, time step and obstacle mask. Scalars are broadcast to every
+    member. The fields are held in one ``dtype``. The pressure solve runs all members through one batched Jacobi
+    loop in which each member stops on its own convergence test, so every
+    member's result matches a standalone simulator with the same solver.
+    """
+
+    def __init__(self, n: int, nx: int, ny: int, dx: float=1.0, dt: Param=0.1,
+                 viscosity: Param=0.02, u_in: Param=1.0,
+                 pressure_solver: Optional[PressureSolver]=None, dtype=np.float64):
+        self.n = n
+        self.dtype = np.dtype(dtype)
+        self.nx, self.ny = nx, ny
+        self.dx = dx
+        self.dt = self._per_member(dt)
+        self.nu = self._per_member(viscosity)
+        self.u_in = self._per_member(u_in)
+        self.time = np.zeros(n)
+        self.step_count = 0
+
+        # Initialize stacked fields
+        shape = (n, ny, nx)
+        self.u = np.zeros(shape, dtype=self.dtype)
+        self.v = np.zeros(shape, dtype=self.dtype)
+        self.p = np.zeros(shape, dtype=self.dtype)
+        self.obstacle = np.zeros(shape, dtype=bool)
+
+        # Set inlet velocity
+        self.u[:, :, 0] = self.u_in[:, None]
+
+        self.advector = SemiLagrangianAdvector(ny, nx, dtype=self.dtype, batch=n)
+        self.pressure_solver = pressure_solver if pressure_solver is not None else JacobiSolver()
+        self.pressure_iterations = 0
+        self.pressure_residual = 0.0
+        self.member_iterations = None
+        self.workspace = Workspace()
+
+        # Performance tracking
+        self.last_step_time = 0.0
+        self.avg_step_time = 0.0
+
+    def _per_member(self, value: Param) -> np.ndarray:
+        return np.array(np.broadcast_to(np.asarray(value, dtype=float), (self.n,)))
+
+    def _buffer(self, name: str) -> np.ndarray:
+        return self.workspace.get(name, (self.n, self.ny, self.nx), self.dtype)
+
+    @classmethod
+    def from_simulators(cls, sims: Sequence[FluidSimulator]) -> "FluidEnsemble":
+        """Stack existing simulators that share one grid, step count, dtype and Jacobi solver settings"""
+        first = sims[0]
+        settings = {_jacobi_settings(s.pressure_solver) for s in sims}
+        if len(settings) != 1 or None in settings:
+            raise ValueError("members need JacobiSolvers with the same settings")
+        if len({(s.nx, s.ny, s.dx, s.step_count) for s in sims}) != 1:
+            raise ValueError("members need the same grid and step count")
+        if len({(s.dtype, s.pressure_dtype) for s in sims}) != 1 or first.dtype != first.pressure_dtype:
+            raise ValueError("members need one dtype shared by velocity and pressure")
+        tol, max_iter, criterion, check_every = settings.pop()
+        ens = cls(len(sims), first.nx, first.ny, first.dx,
+                  dt=[s.dt for s in sims], viscosity=[s.nu for s in sims],
+                  u_in=[s.u_in for s in sims],
+                  pressure_solver=JacobiSolver(tol, max_iter, criterion, check_every=check_every),
+                  dtype=first.dtype)
+        ens.step_count = first.step_count
+        for k, sim in enumerate(sims):
+            ens.u[k] = sim.u
+            ens.v[k] = sim.v
+            ens.p[k] = sim.p
+            ens.obstacle[k] = sim.obstacle
+            ens.time[k] = sim.time
+        return ens
+
+    def to_simulator(self, k: int) -> FluidSimulator:
+        """Copy member ``k`` into a standalone FluidSimulator with an equivalent solver and dtype"""
+        settings = _jacobi_settings(self.pressure_solver)
+        if settings is None:
+            solver = self.pressure_solver.name
+        else:
+            tol, max_iter, criterion, check_every = settings
+            solver = JacobiSolver(tol, max_iter, criterion, check_every=check_every)
+        sim = FluidSimulator(self.nx, self.ny, self.dx, float(self.dt[k]),
+                             float(self.nu[k]), float(self.u_in[k]),
+                             pressure_solver=solver, dtype=self.dtype)
+        sim.set_obstacle(self.obstacle[k])
+        sim.u[:] = self.u[k]
+        sim.v[:] = self.v[k]
+        sim.p[:] = self.p[k]
+        sim.time = float(self.time[k])
+        sim.step_count = self.step_count
+        return sim
+
+    def set_obstacle(self, mask: np.ndarray) -> None:
+        """Set (ny, nx) or (N, ny, nx) obstacle masks and reset fields inside them"""
+        self.obstacle = np.array(np.broadcast_to(mask, self.obstacle.shape))
+        np.copyto(self.u, 0, where=self.obstacle)
+        np.copyto(self.v, 0, where=self.obstacle)
+        np.copyto(self.p, 0, where=self.obstacle)
+
+    def set_member_obstacle(self, k: int, mask: np.ndarray) -> None:
+        """Set the obstacle mask of one member"""
+        self.obstacle[k] = mask
+        self.u[k][mask] = 0
+        self.v[k][mask] = 0
+        self.p[k][mask] = 0
+
+    def laplacian(self, field: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Laplacian of every member"""
+        return laplacian(field, self.dx, out=out)
+
+    def advect(self, field: np.ndarray, u0: np.ndarray, v0: np.ndarray) -> np.ndarray:
+        """Semi-Lagrangian advection of a stacked field"""
+        advected, = self.advector.advect([field], u0, v0, self._dt_dx(), obstacle=self.obstacle)
+        return advected
+
+    def _dt_dx(self) -> np.ndarray:
+        return (self.dt / self.dx)[:, None, None]
+
+    def diffuse(self, field: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Explicit diffusion with per-member viscosity and time step"""
+        lap = laplacian(field, self.dx, out=self._buffer('lap'))
+        lap *= (self.nu * self.dt)[:, None, None]
+        return np.add(field, lap, out=out)
+
+    def project(self) -> None:
+        """Pressure projection of every member"""
+        dx = self.dx
+
+        # Compute divergence
+        div = self._buffer('div')
+        tmp = self._buffer('tmp')[:, 1:-1, 1:-1]
+        inner = div[:, 1:-1, 1:-1]
+        np.subtract(self.u[:, 1:-1, 2:], self.u[:, 1:-1, :-2], out=inner)
+        np.subtract(self.v[:, 2:, 1:-1], self.v[:, :-2, 1:-1], out=tmp)
+        inner += tmp
+        inner /= 2*dx
+        div[:, 0, :] = 0
+        div[:, -1, :] = 0
+        div[:, :, 0] = 0
+        div[:, :, -1] = 0
+
+        solver = self.pressure_solver
+        solver.solve(self.p, div, self.obstacle, dx)
+        self.pressure_iterations = solver.iterations
+        self.pressure_residual = solver.residual
+        self.member_iterations = getattr(solver, 'member_iterations', None)
+
+        # Update velocity field
+        np.subtract(self.p[:, 1:-1, 2:], self.p[:, 1:-1, :-2], out=tmp)
+        tmp /= 2*dx
+        self.u[:, 1:-1, 1:-1] -= tmp
+        np.subtract(self.p[:, 2:, 1:-1], self.p[:, :-2, 1:-1], out=tmp)
+        tmp /= 2*dx
+        self.v[:, 1:-1, 1:-1] -= tmp
+
+        # Enforce boundary conditions
+        self.u[:, :, 0] = self.u_in[:, None]  # Inflow
+        self.u[:, :, -1] = self.u[:, :, -2]  # Outflow (Neumann)
+        self.v[:, :, 0] = 0
+        self.v[:, :, -1] = 0
+
+        # No-slip at top and bottom walls
+        self.u[:, 0, :] = 0
+        self.u[:, -1, :] = 0
+        self.v[:, 0, :] = 0
+        self.v[:, -1, :] = 0
+
+        # Zero velocity in obstacles
+        np.copyto(self.u, 0, where=self.obstacle)
+        np.copyto(self.v, 0, where=self.obstacle)
+
+    def step(self) -> None:
+        """Advance every member by its own time step"""
+        start_time = time.time()
+
+        # Ensure numerical stability per member
+        with np.errstate(divide='ignore'):
+            max_dt = self.dx**2 / (4 * self.nu)
+        unstable = self.dt > max_dt
+        self.dt[unstable] = max_dt[unstable] * 0.9
+
+        self.advector.advect([self.u, self.v], self.u, self.v, self._dt_dx(),
+                             out=[self.u, self.v], obstacle=self.obstacle)
+
+        self.u = self.diffuse(self.u, out=self.workspace.swap('u_back', self.u))
+        self.v = self.diffuse(self.v, out=self.workspace.swap('v_back', self.v))
+
+        self.project()
+
+        self.time += self.dt
+        self.step_count += 1
+
+        step_time = time.time() - start_time
+        if self.step_count == 1:
+            self.avg_step_time = step_time
+        else:
+            self.avg_step_time = 0.9 * self.avg_step_time + 0.1 * step_time
+        self.last_step_time = step_time
+
+    def get_velocity(self) -> tuple[np.ndarray, np.ndarray]:
+        """Get stacked velocity components"""
+        return self.u, self.v
+
+    def get_pressure(self) -> np.ndarray:
+        """Get stacked pressure fields"""
+        return self.p
+
+    def get_velocity_magnitude(self) -> np.ndarray:
+        """Get stacked velocity magnitudes"""
+        return np.sqrt(self.u**2 + self.v**2)
+
+    def get_statistics(self) -> dict:
+        """Per-member statistics, each entry an array of length N"""
+        speed = self.get_velocity_magnitude()
+        fluid = ~self.obstacle
+        n_fluid = np.maximum(fluid.sum(axis=(1, 2)), 1)
+        return {
+            'time': self.time.copy(),
+            'step_count': self.step_count,
+            'dt': self.dt.copy(),
+            'max_speed': speed.max(axis=(1, 2)),
+            'avg_speed': np.where(fluid, speed, 0).sum(axis=(1, 2)) / n_fluid,
+            'max_pressure': self.p.max(axis=(1, 2)),
+            'min_pressure': self.p.min(axis=(1, 2)),
+            'mass_flow_in': self.u[:, :, 0].sum(axis=1) * self.dx,
+            'mass_flow_out': self.u[:, :, -1].sum(axis=1) * self.dx,
+            'pressure_iterations': self.pressure_iterations,
+            'pressure_residual': self.pressure_residual,
+            'avg_step_time': self.avg_step_time,
+            'last_step_time': self.last_step_time
+        }
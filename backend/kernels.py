@@ -0,0 +1,96 @@
+import importlib.util
+import warnings
+from typing import Optional, Sequence
+
+import numpy as np
+
+
+def numba_available() -> bool:
+    """True if numba can be imported; checked without importing it"""
+    return importlib.util.find_spec("numba") is not None
+
+
+class NumbaKernels:
+    """Fused, compiled versions of the solver hot loops.
+
+    Covers the Laplacian (and a fused explicit diffusion), semi-Lagrangian
+    advection, the complete Jacobi pressure loop, the boundary conditions
+    and the field statistics. Kernels run over all cores through ``prange``.
+    """
+    name = "numba"
+
+    def __init__(self):
+        if not numba_available():
+            raise ImportError("numba is required for the 'numba' kernel backend")
+        # Imported here so that numba (slow to import) is only loaded when used
+        from . import jitkernels
+        self._jit = jitkernels
+        self._stage = None
+        self._result = None
+        self._jacobi_buf = None
+
+    def laplacian(self, field: np.ndarray, dx: float, out: Optional[np.ndarray] = None) -> np.ndarray:
+        return self._jit.laplacian(field, float(dx), np.empty_like(field) if out is None else out)
+
+    def diffuse(self, field: np.ndarray, coef: float, dx: float,
+                out: Optional[np.ndarray] = None) -> np.ndarray:
+        """field + coef * laplacian(field) in one pass; ``out`` must not alias ``field``"""
+        return self._jit.diffuse(field, float(coef), float(dx), np.empty_like(field) if out is None else out)
+
+    def advect(self, fields: Sequence[np.ndarray], u0: np.ndarray, v0: np.ndarray, dt_dx: float,
+               out: Optional[Sequence[np.ndarray]] = None,
+               obstacle: Optional[np.ndarray] = None) -> list:
+        """Advect several fields at once; ``out`` may alias the inputs"""
+        k = len(fields)
+        shape = (k,) + fields[0].shape
+        if self._stage is None or self._stage.shape != shape or self._stage.dtype != fields[0].dtype:
+            self._stage = np.empty(shape, dtype=fields[0].dtype)
+            self._result = np.empty(shape, dtype=fields[0].dtype)
+        for n, field in enumerate(fields):
+            self._stage[n] = field
+        if obstacle is None:
+            obstacle = np.zeros(fields[0].shape, dtype=bool)
+        self._jit.advect(self._stage, u0, v0, float(dt_dx), self._result, obstacle)
+        if out is None:
+            return [self._result[n].copy() for n in range(k)]
+        for n, target in enumerate(out):
+            np.copyto(target, self._result[n])
+        return list(out)
+
+    def jacobi(self, p: np.ndarray, rhs: np.ndarray, obstacle: np.ndarray, max_iter: int,
+               tol: float, check_every: int = 1) -> tuple[int, bool]:
+        """Jacobi loop on p in place, ``rhs`` is div * dx**2; returns (iterations, converged)"""
+        if self._jacobi_buf is None or self._jacobi_buf.shape != p.shape or self._jacobi_buf.dtype != p.dtype:
+            self._jacobi_buf = np.empty_like(p)
+        scalar = p.dtype.type
+        iterations, converged = self._jit.jacobi(p, self._jacobi_buf, rhs, obstacle, int(max_iter), float(tol),
+                                                 max(1, int(check_every)), scalar(0), scalar(0.25))
+        return int(iterations), bool(converged)
+
+    def enforce_boundaries(self, u: np.ndarray, v: np.ndarray, u_in: float, obstacle: np.ndarray) -> None:
+        self._jit.enforce_boundaries(u, v, float(u_in), obstacle)
+
+    def statistics(self, u: np.ndarray, v: np.ndarray, p: np.ndarray,
+                   obstacle: np.ndarray) -> tuple[float, float, float, float]:
+        """(max speed, mean fluid speed, max p, min p) in one fused pass"""
+        return tuple(float(x) for x in self._jit.statistics(u, v, p, obstacle))
+
+
+KERNEL_BACKENDS = ("numpy", "numba", "auto")
+
+
+def make_kernels(name: str = "numpy") -> Optional[NumbaKernels]:
+    """Compiled kernel backend, or None for the NumPy path.
+
+    ``"auto"`` and ``"numba"`` fall back to NumPy when numba is missing;
+    ``"numba"`` warns about it.
+    """
+    if name not in KERNEL_BACKENDS:
+        raise ValueError(f"Unknown kernel backend: {name}")
+    if name == "numpy":
+        return None
+    if not numba_available():
+        if name == "numba":
+            warnings.warn("numba is not installed, falling back to NumPy kernels", RuntimeWarning)
+        return None
+    return NumbaKernels()
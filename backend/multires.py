@@ -0,0 +1,168 @@
+import numpy as np
+
+from .simulation import FluidSimulator
+
+# Grid point (i, j) sits at x = j * dx, y = i * dx. A grid coarsened by
+# ``factor`` keeps every factor-th point, so coarse point (I, J) coincides
+# with fine point (factor * I, factor * J) and the two cover the same domain
+# exactly when (n - 1) is divisible by factor (otherwise the fine points
+# past the last coarse one are clamped to it).
+
+
+def coarse_shape(shape: tuple[int, int], factor: int) -> tuple[int, int]:
+    return tuple((n - 1) // factor + 1 for n in shape)
+
+
+def _restrict_axis(a: np.ndarray, n: int, factor: int, axis: int) -> np.ndarray:
+    a = np.moveaxis(a, axis, -1)
+    m = a.shape[-1]
+    out = np.zeros(a.shape[:-1] + (n,), dtype=a.dtype)
+    weights = np.zeros(n, dtype=a.dtype)
+    centers = np.arange(n) * factor
+    # Tent weights, the transpose of linear interpolation; renormalized
+    # where the tent hangs over the edge
+    for k in range(1 - factor, factor):
+        idx = centers + k
+        valid = (idx >= 0) & (idx < m)
+        w = (factor - abs(k)) / factor
+        out[..., valid] += w * a[..., idx[valid]]
+        weights[valid] += w
+    out /= weights
+    return np.moveaxis(out, -1, axis)
+
+
+def _prolong_axis(a: np.ndarray, m: int, factor: int, axis: int) -> np.ndarray:
+    a = np.moveaxis(a, axis, -1)
+    n = a.shape[-1]
+    pos = np.minimum(np.arange(m) / factor, n - 1)
+    i0 = np.minimum(pos.astype(int), max(n - 2, 0))
+    i1 = np.minimum(i0 + 1, n - 1)
+    w = (pos - i0).astype(a.dtype)
+    out = a[..., i0] * (1 - w) + a[..., i1] * w
+    return np.moveaxis(out, -1, axis)
+
+
+def restrict(field: np.ndarray, factor: int) -> np.ndarray:
+    """Tent-weighted average of ``field`` onto the grid coarsened by ``factor``"""
+    ny, nx = coarse_shape(field.shape, factor)
+    return _restrict_axis(_restrict_axis(field, ny, factor, 0), nx, factor, 1)
+
+
+def prolong(field: np.ndarray, shape: tuple[int, int], factor: int) -> np.ndarray:
+    """Bilinear interpolation of the coarse ``field`` onto the fine ``shape``"""
+    return _prolong_axis(_prolong_axis(field, shape[0], factor, 0), shape[1], factor, 1)
+
+
+def restrict_mask(mask: np.ndarray, factor: int, threshold: float = 0.5) -> np.ndarray:
+    """Coarse points whose tent-weighted solid fraction reaches ``threshold``"""
+    return restrict(mask.astype(np.float64), factor) >= threshold
+
+
+def _nearest(shape: tuple[int, int], coarse: tuple[int, int], factor: int) -> tuple[np.ndarray, np.ndarray]:
+    """Index grids of the coarse point nearest to every fine point"""
+    rows = np.minimum((np.arange(shape[0]) + factor // 2) // factor, coarse[0] - 1)
+    cols = np.minimum((np.arange(shape[1]) + factor // 2) // factor, coarse[1] - 1)
+    return rows[:, None], cols[None, :]
+
+
+def prolong_mask(mask: np.ndarray, shape: tuple[int, int], factor: int) -> np.ndarray:
+    """Fine mask taking each point from its nearest coarse point"""
+    rows, cols = _nearest(shape, mask.shape, factor)
+    return mask[rows, cols]
+
+
+class MultiResolution:
+    """A FluidSimulator paired with a ``factor`` times coarser copy of itself.
+
+    The coarse copy runs the same physics on the same domain with ``factor``
+    times the grid spacing and time step (and fresh solvers of the same
+    kinds, unless overridden through ``coarse_kwargs``), so it is roughly
+    factor**3 times cheaper per simulated second. Use it while obstacles are
+    edited or the flow spins up, then ``prolong`` onto the fine grid;
+    ``restrict`` goes back down. ``current`` is the simulator of the active
+    level.
+
+    The fine obstacle mask stays authoritative: only coarse points edited
+    since the last ``restrict`` overwrite the fine points nearest to them.
+    The pressure is the potential removed in one step, so it is rescaled by
+    the ratio of the time steps on the way up and down.
+    """
+
+    def __init__(self, fine: FluidSimulator, factor: int = 2, **coarse_kwargs):
+        if factor < 2:
+            raise ValueError(f"factor must be at least 2, got {factor}")
+        self.fine = fine
+        self.factor = factor
+        ny, nx = coarse_shape((fine.ny, fine.nx), factor)
+        kwargs = dict(
+            dx=fine.dx * factor, dt=fine.dt * factor, viscosity=fine.nu, u_in=fine.u_in,
+            pressure_solver=fine.pressure_solver.name, diffusion=fine.diffusion,
+            diffusion_solver=fine.diffusion_solver.name, adaptive=fine.adaptive, cfl=fine.cfl,
+            dt_max=None if fine.dt_max is None else fine.dt_max * factor,
+            pressure_extrapolation=fine.pressure_extrapolation,
+            dtype=fine.dtype, pressure_dtype=fine.pressure_dtype,
+        )
+        kwargs.update(coarse_kwargs)
+        self.coarse = FluidSimulator(nx, ny, **kwargs)
+        self.level = "fine"
+        self._restricted_mask = None
+
+    @property
+    def current(self) -> FluidSimulator:
+        return self.coarse if self.level == "coarse" else self.fine
+
+    def step(self, dt=None) -> None:
+        self.current.step(dt)
+
+    def restrict(self) -> FluidSimulator:
+        """Copy the fine state onto the coarse grid and make it current"""
+        fine, coarse, f = self.fine, self.coarse, self.factor
+        coarse.set_obstacle(restrict_mask(fine.obstacle, f))
+        self._restricted_mask = coarse.obstacle.copy()
+        coarse.u[:] = restrict(fine.u, f)
+        coarse.v[:] = restrict(fine.v, f)
+        coarse.p[:] = restrict(fine.p, f) * (coarse.dt / fine.dt)
+        self._sync(fine, coarse)
+        self.level = "coarse"
+        return coarse
+
+    def prolong(self) -> FluidSimulator:
+        """Interpolate the coarse state onto the fine grid, project, and make it current"""
+        fine, coarse, f = self.fine, self.coarse, self.factor
+        mask = fine.obstacle
+        if self._restricted_mask is not None:
+            edited = coarse.obstacle != self._restricted_mask
+            if edited.any():
+                rows, cols = _nearest(mask.shape, coarse.obstacle.shape, f)
+                mask = np.where(edited[rows, cols], coarse.obstacle[rows, cols], mask)
+        fine.set_obstacle(mask)
+        shape = (fine.ny, fine.nx)
+        fine.u[:] = prolong(coarse.u, shape, f)
+        fine.v[:] = prolong(coarse.v, shape, f)
+        fine.p[:] = prolong(coarse.p, shape, f) * (fine.dt / coarse.dt)
+        self._sync(coarse, fine)
+        # Interpolation breaks discrete incompressibility on the fine grid
+        fine.project()
+        fine.invalidate()
+        self.level = "fine"
+        return fine
+
+    def _sync(self, src: FluidSimulator, dst: FluidSimulator) -> None:
+        dst.active.zero(dst.p)
+        dst.time = src.time
+        dst.nu = src.nu
+        dst.u_in = src.u_in
+        dst.enforce_boundaries()
+        dst.invalidate()
+
+    def close(self) -> None:
+        self.fine.close()
+        self.coarse.close()
+
+    def spin_up(self, t_end: float) -> int:
+        """Advance to ``t_end`` on the coarse grid, then continue on the fine one; returns coarse steps"""
+        if self.level == "fine":
+            self.restrict()
+        steps = self.coarse.advance_to(t_end)
+        self.prolong()
+        return steps
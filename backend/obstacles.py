@@ -0,0 +1,247 @@
+import math
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Callable, Optional
+
+import numpy as np
+
+# Cell (i, j) sits at the point x = j, y = i, the convention of the original
+# create_*_obstacle builders. Every shape only evaluates the cells inside its
+# bounding box, so the cost scales with the shape and not with the grid.
+
+Bounds = tuple[float, float, float, float]  # x0, y0, x1, y1, inclusive
+
+
+class Shape:
+    """Obstacle geometry that can be rasterized onto a grid.
+
+    Subclasses give ``bounds`` and a vectorized ``contains(x, y)`` over
+    broadcasting coordinate arrays. ``a | b`` is the union and ``a - b``
+    the difference of two shapes.
+    """
+
+    def bounds(self) -> Bounds:
+        raise NotImplementedError
+
+    def contains(self, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+        raise NotImplementedError
+
+    def __or__(self, other: "Shape") -> "ShapeUnion":
+        return ShapeUnion((self, other))
+
+    def __sub__(self, other: "Shape") -> "Difference":
+        return Difference(self, other)
+
+
+@dataclass(frozen=True)
+class Circle(Shape):
+    cx: float
+    cy: float
+    radius: float
+
+    def bounds(self) -> Bounds:
+        r = self.radius
+        return self.cx - r, self.cy - r, self.cx + r, self.cy + r
+
+    def contains(self, x, y):
+        return np.sqrt((x - self.cx)**2 + (y - self.cy)**2) <= self.radius
+
+
+@dataclass(frozen=True)
+class Rectangle(Shape):
+    x1: float
+    y1: float
+    x2: float
+    y2: float
+
+    def bounds(self) -> Bounds:
+        return self.x1, self.y1, self.x2, self.y2
+
+    def contains(self, x, y):
+        return (x >= self.x1) & (x <= self.x2) & (y >= self.y1) & (y <= self.y2)
+
+
+@dataclass(frozen=True)
+class Semicircle(Shape):
+    """Upper half (y <= cy) of a circle"""
+    cx: float
+    cy: float
+    radius: float
+
+    def bounds(self) -> Bounds:
+        r = self.radius
+        return self.cx - r, self.cy - r, self.cx + r, self.cy
+
+    def contains(self, x, y):
+        return (np.sqrt((x - self.cx)**2 + (y - self.cy)**2) <= self.radius) & (y <= self.cy)
+
+
+@dataclass(frozen=True)
+class Triangle(Shape):
+    """Isosceles triangle of base and height ``size`` centred on (cx, cy).
+
+    The base is the top row (smallest y) and the width shrinks towards the
+    apex on the bottom row, so on screen it points down.
+    """
+    cx: float
+    cy: float
+    size: int
+
+    def bounds(self) -> Bounds:
+        half = self.size // 2
+        return self.cx - self.size / 2, self.cy - half, self.cx + self.size / 2, self.cy + half
+
+    def contains(self, x, y):
+        if self.size <= 0:
+            return np.zeros(np.broadcast(x, y).shape, dtype=bool)
+        top = self.cy - self.size // 2
+        base_width = self.size * (1 - (y - top) / self.size)  # Shrinks linearly towards the apex
+        return (y >= top) & (y <= self.cy + self.size // 2) & (np.abs(x - self.cx) <= base_width / 2)
+
+
+@dataclass(frozen=True)
+class Polygon(Shape):
+    """Simple polygon from ``((x, y), ...)`` vertices, even-odd fill rule"""
+    vertices: tuple
+
+    def __post_init__(self):
+        object.__setattr__(self, 'vertices', tuple((float(x), float(y)) for x, y in self.vertices))
+
+    def bounds(self) -> Bounds:
+        xs, ys = zip(*self.vertices)
+        return min(xs), min(ys), max(xs), max(ys)
+
+    def contains(self, x, y):
+        inside = np.zeros(np.broadcast(x, y).shape, dtype=bool)
+        n = len(self.vertices)
+        for k in range(n):
+            xa, ya = self.vertices[k]
+            xb, yb = self.vertices[(k + 1) % n]
+            if ya == yb:
+                continue  # Horizontal edges never cross a scanline
+            crosses = (ya > y) != (yb > y)
+            x_cross = xa + (y - ya) * ((xb - xa) / (yb - ya))
+            inside ^= crosses & (x < x_cross)
+        return inside
+
+
+@dataclass(frozen=True)
+class Capsule(Shape):
+    """Points within ``radius`` of the segment (x0, y0)-(x1, y1), one brush stroke"""
+    x0: float
+    y0: float
+    x1: float
+    y1: float
+    radius: float
+
+    def bounds(self) -> Bounds:
+        r = self.radius
+        return min(self.x0, self.x1) - r, min(self.y0, self.y1) - r, max(self.x0, self.x1) + r, max(self.y0, self.y1) + r
+
+    def contains(self, x, y):
+        dx, dy = self.x1 - self.x0, self.y1 - self.y0
+        length2 = dx * dx + dy * dy
+        t = 0.0 if length2 == 0 else np.clip(((x - self.x0) * dx + (y - self.y0) * dy) / length2, 0, 1)
+        return (x - self.x0 - t * dx)**2 + (y - self.y0 - t * dy)**2 <= self.radius**2
+
+
+@dataclass(frozen=True)
+class SDF(Shape):
+    """Shape given by a signed distance function, inside where ``fn(x, y) <= 0``.
+
+    ``fn`` must accept broadcasting arrays. Without ``bounds`` the whole grid
+    is evaluated. Pass the same function object each time to hit the cache.
+    """
+    fn: Callable[[np.ndarray, np.ndarray], np.ndarray]
+    extent: Optional[Bounds] = None
+
+    def bounds(self) -> Bounds:
+        if self.extent is None:
+            return -math.inf, -math.inf, math.inf, math.inf
+        return self.extent
+
+    def contains(self, x, y):
+        return np.asarray(self.fn(x, y)) <= 0
+
+
+@dataclass(frozen=True)
+class ShapeUnion(Shape):
+    shapes: tuple
+
+    def __or__(self, other: Shape) -> "ShapeUnion":
+        return ShapeUnion(self.shapes + (other,))
+
+    def bounds(self) -> Bounds:
+        boxes = [s.bounds() for s in self.shapes]
+        return (min(b[0] for b in boxes), min(b[1] for b in boxes),
+                max(b[2] for b in boxes), max(b[3] for b in boxes))
+
+    def contains(self, x, y):
+        inside = np.zeros(np.broadcast(x, y).shape, dtype=bool)
+        for shape in self.shapes:
+            inside |= shape.contains(x, y)
+        return inside
+
+
+@dataclass(frozen=True)
+class Difference(Shape):
+    shape: Shape
+    cut: Shape
+
+    def bounds(self) -> Bounds:
+        return self.shape.bounds()
+
+    def contains(self, x, y):
+        return self.shape.contains(x, y) & ~self.cut.contains(x, y)
+
+
+def _window(bounds: Bounds, ny: int, nx: int) -> tuple[int, int, int, int]:
+    """Grid rows [i0, i1) and columns [j0, j1) covered by ``bounds``"""
+    x0, y0, x1, y1 = bounds
+    j0 = max(0, math.ceil(x0)) if x0 > -math.inf else 0
+    i0 = max(0, math.ceil(y0)) if y0 > -math.inf else 0
+    j1 = min(nx, math.floor(x1) + 1) if x1 < math.inf else nx
+    i1 = min(ny, math.floor(y1) + 1) if y1 < math.inf else ny
+    return i0, max(i1, i0), j0, max(j1, j0)
+
+
+def cells(shape: Shape, grid_shape: tuple[int, int]) -> np.ndarray:
+    """Flat indices of the grid cells inside ``shape``, uncached"""
+    ny, nx = grid_shape
+    i0, i1, j0, j1 = _window(shape.bounds(), ny, nx)
+    y = np.arange(i0, i1)[:, None]
+    x = np.arange(j0, j1)[None, :]
+    i, j = np.nonzero(np.broadcast_to(shape.contains(x, y), (i1 - i0, j1 - j0)))
+    return (i + i0) * nx + (j + j0)
+
+
+@lru_cache(maxsize=256)
+def _patch(shape: Shape, ny: int, nx: int) -> tuple[int, int, np.ndarray]:
+    i0, i1, j0, j1 = _window(shape.bounds(), ny, nx)
+    y = np.arange(i0, i1)[:, None]
+    x = np.arange(j0, j1)[None, :]
+    patch = np.ascontiguousarray(np.broadcast_to(shape.contains(x, y), (i1 - i0, j1 - j0)))
+    patch.flags.writeable = False
+    return i0, j0, patch
+
+
+def rasterize(shape: Shape, grid_shape: tuple[int, int], out: Optional[np.ndarray] = None) -> np.ndarray:
+    """Boolean (ny, nx) mask of ``shape``; the bounding-box patch is LRU cached.
+
+    With ``out`` the shape is OR-ed into an existing mask instead.
+    """
+    ny, nx = grid_shape
+    i0, j0, patch = _patch(shape, ny, nx)
+    if out is None:
+        out = np.zeros((ny, nx), dtype=bool)
+    out[i0:i0 + patch.shape[0], j0:j0 + patch.shape[1]] |= patch
+    return out
+
+
+def cache_info():
+    """Hit/miss statistics of the patch cache"""
+    return _patch.cache_info()
+
+
+def clear_cache() -> None:
+    _patch.cache_clear()
@@ -0,0 +1,120 @@
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+
+class StripPool:
+    """Row-strip decomposition of a (ny, nx) grid run on a thread pool.
+
+    Strips partition the rows ``[0, ny)``; stencil kernels read one ghost
+    row above and below their strip straight from the shared input array.
+    ``run`` returns only after every strip has finished, which is the halo
+    exchange between stages. NumPy releases the GIL inside its loops, so
+    the strips execute concurrently.
+    """
+
+    def __init__(self, ny: int, threads: int, min_rows: int = 8):
+        n_strips = max(1, min(threads, ny // min_rows))
+        bounds = np.linspace(0, ny, n_strips + 1).astype(int)
+        self.ny = ny
+        self.threads = threads
+        self.strips = list(zip(bounds[:-1].tolist(), bounds[1:].tolist()))
+        self._executor = ThreadPoolExecutor(max_workers=n_strips) if n_strips > 1 else None
+
+    def run(self, fn: Callable, *args) -> list:
+        """Call ``fn(r0, r1, *args)`` for every strip and wait for all of them"""
+        if self._executor is None:
+            return [fn(r0, r1, *args) for r0, r1 in self.strips]
+        futures = [self._executor.submit(fn, r0, r1, *args) for r0, r1 in self.strips]
+        return [f.result() for f in futures]
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+
+def _interior(r0: int, r1: int, ny: int) -> tuple[int, int]:
+    return max(r0, 1), min(r1, ny - 1)
+
+
+def _laplacian_rows(r0, r1, field, dx, out):
+    ny = field.shape[0]
+    out[r0:r1, 0] = 0
+    out[r0:r1, -1] = 0
+    if r0 == 0:
+        out[0, :] = 0
+    if r1 == ny:
+        out[-1, :] = 0
+    a, b = _interior(r0, r1, ny)
+    if a >= b:
+        return
+    inner = out[a:b, 1:-1]
+    np.multiply(field[a:b, 1:-1], -4, out=inner)
+    inner += field[a-1:b-1, 1:-1]
+    inner += field[a+1:b+1, 1:-1]
+    inner += field[a:b, :-2]
+    inner += field[a:b, 2:]
+    inner /= dx**2
+
+
+def laplacian(field: np.ndarray, dx: float, out: np.ndarray, pool: StripPool) -> np.ndarray:
+    """Strip-parallel version of simulation.laplacian"""
+    pool.run(_laplacian_rows, field, dx, out)
+    return out
+
+
+def _divergence_rows(r0, r1, u, v, dx, out, tmp):
+    ny = u.shape[0]
+    out[r0:r1, 0] = 0
+    out[r0:r1, -1] = 0
+    if r0 == 0:
+        out[0, :] = 0
+    if r1 == ny:
+        out[-1, :] = 0
+    a, b = _interior(r0, r1, ny)
+    if a >= b:
+        return
+    inner = out[a:b, 1:-1]
+    t = tmp[a:b, 1:-1]
+    np.subtract(u[a:b, 2:], u[a:b, :-2], out=inner)
+    np.subtract(v[a+1:b+1, 1:-1], v[a-1:b-1, 1:-1], out=t)
+    inner += t
+    inner /= 2*dx
+
+
+def divergence(u: np.ndarray, v: np.ndarray, dx: float, out: np.ndarray, tmp: np.ndarray,
+               pool: StripPool) -> np.ndarray:
+    """Central-difference divergence, zero on the border"""
+    pool.run(_divergence_rows, u, v, dx, out, tmp)
+    return out
+
+
+def _jacobi_rows(r0, r1, src, dst, rhs, obstacle):
+    a, b = _interior(r0, r1, src.shape[0])
+    if a < b:
+        inner = dst[a:b, 1:-1]
+        np.add(src[a:b, 2:], src[a:b, :-2], out=inner)
+        inner += src[a+1:b+1, 1:-1]
+        inner += src[a-1:b-1, 1:-1]
+        inner -= rhs[a:b, 1:-1]
+        inner *= 0.25
+    np.copyto(dst[r0:r1], 0, where=obstacle[r0:r1])
+
+
+def jacobi_sweep(src: np.ndarray, dst: np.ndarray, rhs: np.ndarray, obstacle: np.ndarray,
+                 pool: StripPool) -> None:
+    """One Jacobi sweep of the pressure equation; ``rhs`` is div * dx**2"""
+    pool.run(_jacobi_rows, src, dst, rhs, obstacle)
+
+
+def _max_abs_diff_rows(r0, r1, a, b, scratch):
+    s = scratch[r0:r1]
+    np.subtract(a[r0:r1], b[r0:r1], out=s)
+    np.abs(s, out=s)
+    return s.max()
+
+
+def max_abs_diff(a: np.ndarray, b: np.ndarray, scratch: np.ndarray, pool: StripPool) -> float:
+    """max |a - b| reduced over strips"""
+    return max(pool.run(_max_abs_diff_rows, a, b, scratch))
@@ -0,0 +1,121 @@
+import json
+import time
+from typing import Callable, Optional
+
+import numpy as np
+
+# Phases of FluidSimulator.step in execution order; "other" is the rest of
+# the step (bookkeeping, statistics, auto-checkpointing)
+PHASES = ('timestep', 'advect', 'diffuse', 'divergence', 'pressure', 'gradient', 'boundaries', 'other')
+
+RECORD_DTYPE = np.dtype(
+    [('step_count', np.int64), ('time', np.float64), ('dt', np.float64), ('start_ns', np.int64),
+     ('total_ns', np.int64), ('pressure_iterations', np.int64), ('diffusion_iterations', np.int64),
+     ('diffusion_substeps', np.int64)] +
+    [(f'{phase}_ns', np.int64) for phase in PHASES]
+)
+
+
+class StepProfiler:
+    """Per-phase ``perf_counter_ns`` timings of FluidSimulator.step.
+
+    Each step becomes one record (phase durations, total, iteration
+    counts) in a preallocated ring buffer of ``capacity`` records, so a
+    long run keeps the most recent ones at a fixed memory cost.
+    Subscribers are called with each finished record as a dict, on the
+    thread that steps the simulator. Disabled profiling is the simulator's
+    ``profiler`` being None, which costs one attribute check per phase.
+    """
+
+    def __init__(self, capacity: int = 1024):
+        self.capacity = capacity
+        self.records = np.zeros(capacity, dtype=RECORD_DTYPE)
+        self.count = 0  # records written so far, including overwritten ones
+        self._subscribers: list = []
+        self._phase_ns = dict.fromkeys(PHASES, 0)
+        self._start = self._last = 0
+
+    def begin(self) -> None:
+        for phase in PHASES:
+            self._phase_ns[phase] = 0
+        self._start = self._last = time.perf_counter_ns()
+
+    def mark(self, phase: str) -> None:
+        """Charge the time since the previous mark to ``phase``"""
+        now = time.perf_counter_ns()
+        self._phase_ns[phase] += now - self._last
+        self._last = now
+
+    def end(self, sim) -> None:
+        self.mark('other')
+        slot = self.count % self.capacity
+        self.records[slot] = (sim.step_count, sim.time, sim.dt, self._start, self._last - self._start,
+                              sim.pressure_iterations, sim.diffusion_iterations, sim.diffusion_substeps,
+                              *self._phase_ns.values())
+        self.count += 1
+        if self._subscribers:
+            record = _as_dict(self.records[slot])
+            for callback in self._subscribers:
+                callback(record)
+
+    def subscribe(self, callback: Callable[[dict], None]) -> Callable[[dict], None]:
+        """Call ``callback(record)`` after every profiled step; returns it for unsubscribe"""
+        self._subscribers.append(callback)
+        return callback
+
+    def unsubscribe(self, callback: Callable[[dict], None]) -> None:
+        self._subscribers.remove(callback)
+
+    def __len__(self) -> int:
+        return min(self.count, self.capacity)
+
+    def recent(self, n: Optional[int] = None) -> np.ndarray:
+        """The last ``n`` records (all that are kept by default), oldest first"""
+        kept = len(self)
+        n = kept if n is None else min(n, kept)
+        idx = (np.arange(self.count - n, self.count)) % self.capacity
+        return self.records[idx]
+
+    def summary(self, n: int = 32) -> dict:
+        """Mean milliseconds per phase over the last ``n`` steps, keyed ``<phase>_ms``"""
+        recs = self.recent(n)
+        if recs.size == 0:
+            return {}
+        out = {f'{phase}_ms': float(recs[f'{phase}_ns'].mean()) * 1e-6 for phase in PHASES}
+        out['profiled_step_ms'] = float(recs['total_ns'].mean()) * 1e-6
+        return out
+
+    def to_json(self, path: Optional[str] = None) -> list:
+        """Kept records as a list of dicts, also written to ``path`` when given"""
+        data = [_as_dict(rec) for rec in self.recent()]
+        if path is not None:
+            with open(path, "w") as f:
+                json.dump(data, f)
+        return data
+
+    def to_chrome_trace(self, path: Optional[str] = None) -> dict:
+        """Kept records in Chrome trace event format (chrome://tracing, Perfetto)"""
+        events = []
+        for rec in self.recent():
+            start = int(rec['start_ns'])
+            events.append({'name': 'step', 'ph': 'X', 'pid': 0, 'tid': 0, 'ts': start / 1e3,
+                           'dur': int(rec['total_ns']) / 1e3,
+                           'args': {'step_count': int(rec['step_count']),
+                                    'pressure_iterations': int(rec['pressure_iterations']),
+                                    'diffusion_iterations': int(rec['diffusion_iterations'])}})
+            # Phases run back to back in PHASES order
+            for phase in PHASES:
+                dur = int(rec[f'{phase}_ns'])
+                if dur:
+                    events.append({'name': phase, 'ph': 'X', 'pid': 0, 'tid': 0,
+                                   'ts': start / 1e3, 'dur': dur / 1e3})
+                start += dur
+        trace = {'traceEvents': events, 'displayTimeUnit': 'ms'}
+        if path is not None:
+            with open(path, "w") as f:
+                json.dump(trace, f)
+        return trace
+
+
+def _as_dict(rec: np.ndarray) -> dict:
+    return {name: rec[name].item() for name in RECORD_DTYPE.names}
@@ -0,0 +1,53 @@
+"""Original FluidSimulator routines, the baseline of the benchmarks and the oracle of the parity tests"""
+import numpy as np
+
+
+def reference_advect(field: np.ndarray, u0: np.ndarray, v0: np.ndarray, dt_dx: float,
+                     obstacle: np.ndarray) -> np.ndarray:
+    """The original FluidSimulator.advect body"""
+    ny, nx = field.shape
+    i, j = np.meshgrid(np.arange(ny), np.arange(nx), indexing='ij')
+    x_back = np.clip(j - u0 * dt_dx, 0, nx - 1)
+    y_back = np.clip(i - v0 * dt_dx, 0, ny - 1)
+    x0 = np.floor(x_back).astype(int)
+    y0 = np.floor(y_back).astype(int)
+    x1 = np.clip(x0 + 1, 0, nx - 1)
+    y1 = np.clip(y0 + 1, 0, ny - 1)
+    sx = x_back - x0
+    sy = y_back - y0
+    advected = ((1-sx)*(1-sy)*field[y0, x0] + sx*(1-sy)*field[y0, x1] +
+                (1-sx)*sy*field[y1, x0] + sx*sy*field[y1, x1])
+    advected[obstacle] = 0
+    return advected
+
+
+def reference_circle(ny: int, nx: int, cx: int, cy: int, radius: int) -> np.ndarray:
+    """The original FluidSimulator.create_circle_obstacle body"""
+    mask = np.zeros((ny, nx), dtype=bool)
+    y, x = np.ogrid[:ny, :nx]
+    dist = np.sqrt((x - cx)**2 + (y - cy)**2)
+    mask[dist <= radius] = True
+    return mask
+
+
+def reference_semicircle(ny: int, nx: int, cx: int, cy: int, radius: int) -> np.ndarray:
+    """The original FluidSimulator.create_semicircle_obstacle body"""
+    mask = np.zeros((ny, nx), dtype=bool)
+    y, x = np.ogrid[:ny, :nx]
+    dist = np.sqrt((x - cx)**2 + (y - cy)**2)
+    mask[(dist <= radius) & (y <= cy)] = True
+    return mask
+
+
+def reference_triangle(ny: int, nx: int, cx: int, cy: int, size: int) -> np.ndarray:
+    """The original FluidSimulator.create_triangle_obstacle body"""
+    mask = np.zeros((ny, nx), dtype=bool)
+    height = size
+    base = size
+    for i in range(ny):
+        for j in range(nx):
+            if i >= cy - height // 2 and i <= cy + height // 2:
+                base_width = base * (1 - (i - (cy - height // 2)) / height)
+                if abs(j - cx) <= base_width / 2:
+                    mask[i, j] = True
+    return mask
@@ -0,0 +1,226 @@
+"""Headless batch run of one FluidSimulator case.
+
+Run with ``python -m backend.run --nx 256 --ny 128 --steps 2000 --obstacle circle:64,64,12 --out runs/a``.
+
+Statistics rows are appended to ``<out>/stats.csv`` and downsampled fields
+to the trajectory ``<out>/fields`` (read it with
+``backend.trajectory.TrajectoryReader``) as they are produced. Neither pygame
+nor scipy is imported (scipy only with ``--solver cg``).
+"""
+import time
+
+_START = time.perf_counter()
+
+import argparse
+import csv
+import json
+import os
+import shutil
+import sys
+from typing import Optional
+
+import numpy as np
+
+from . import obstacles
+from .kernels import KERNEL_BACKENDS
+from .simulation import DIFFUSION_THETA, FluidSimulator
+from .solvers import DIFFUSION_SOLVERS, PRESSURE_SOLVERS, make_pressure_solver
+from .sweep import OBSTACLE_PRESETS
+from .trajectory import FIELD_GETTERS, TrajectoryWriter
+
+SHAPES = {
+    'circle': obstacles.Circle,
+    'rect': obstacles.Rectangle,
+    'rectangle': obstacles.Rectangle,
+    'semicircle': obstacles.Semicircle,
+    'triangle': obstacles.Triangle,
+}
+
+
+def parse_obstacle(spec: str, sim: FluidSimulator) -> np.ndarray:
+    """Mask for ``spec``: a preset name, ``shape:a,b,c[,d]`` or ``polygon:x,y;x,y;...``"""
+    if spec in OBSTACLE_PRESETS:
+        mask = OBSTACLE_PRESETS[spec](sim)
+        return np.zeros((sim.ny, sim.nx), dtype=bool) if mask is None else mask
+    name, _, params = spec.partition(':')
+    if name == 'polygon':
+        vertices = [tuple(float(c) for c in point.split(',')) for point in params.split(';')]
+        return sim.create_obstacle(obstacles.Polygon(vertices))
+    if name not in SHAPES:
+        raise ValueError(f"Unknown obstacle: {spec}")
+    return sim.create_obstacle(SHAPES[name](*(float(c) for c in params.split(','))))
+
+
+def _row(stats: dict) -> dict:
+    return {k: (v.item() if isinstance(v, np.generic) else v) for k, v in stats.items()}
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    grid = parser.add_argument_group("grid and physics")
+    grid.add_argument("--nx", type=int, default=128)
+    grid.add_argument("--ny", type=int, default=64)
+    grid.add_argument("--dx", type=float, default=1.0)
+    grid.add_argument("--dt", type=float, default=0.1)
+    grid.add_argument("--adaptive", action="store_true", help="choose dt each step from the CFL number")
+    grid.add_argument("--cfl", type=float, default=1.0, help="target CFL number with --adaptive")
+    grid.add_argument("--dt-max", type=float, help="largest dt --adaptive may choose")
+    grid.add_argument("--viscosity", type=float, default=0.02)
+    grid.add_argument("--u-in", type=float, default=1.0)
+    grid.add_argument("--obstacle", action="append", default=[],
+                      help="preset (" + ", ".join(OBSTACLE_PRESETS) + "), circle:cx,cy,r, rect:x1,y1,x2,y2, "
+                           "semicircle:cx,cy,r, triangle:cx,cy,size or polygon:x,y;x,y;...; repeat to combine")
+    solver = parser.add_argument_group("solver")
+    solver.add_argument("--solver", choices=list(PRESSURE_SOLVERS), default="jacobi")
+    solver.add_argument("--pressure-tol", type=float,
+                        help="relative residual tolerance (Jacobi switches to the residual criterion)")
+    solver.add_argument("--pressure-max-iter", type=int)
+    solver.add_argument("--check-every", type=int, help="sweeps between convergence checks (jacobi, sor)")
+    solver.add_argument("--extrapolate-pressure", action="store_true",
+                        help="start each pressure solve from 2 p(n) - p(n-1)")
+    solver.add_argument("--diffusion", choices=list(DIFFUSION_THETA), default="explicit")
+    solver.add_argument("--diffusion-solver", choices=list(DIFFUSION_SOLVERS), default="jacobi",
+                        help="linear solver for implicit --diffusion")
+    solver.add_argument("--kernels", choices=KERNEL_BACKENDS, default="numpy")
+    solver.add_argument("--threads", type=int, default=1)
+    solver.add_argument("--workspace", action="store_true")
+    solver.add_argument("--dtype", choices=["float64", "float32"], default="float64",
+                        help="working precision (float32 also uses int32 gather indices)")
+    solver.add_argument("--pressure-dtype", choices=["float64", "float32"],
+                        help="pressure precision, defaults to --dtype")
+    run = parser.add_argument_group("run length and output")
+    run.add_argument("--steps", type=int, help="number of steps")
+    run.add_argument("--t-end", type=float, help="stop once the simulated time reaches this")
+    run.add_argument("--stats-every", type=int, default=1, help="steps between statistics rows")
+    run.add_argument("--fields-every", type=int, default=0, help="steps between field dumps (0: final only)")
+    run.add_argument("--downsample", type=int, default=1, help="keep every n-th cell of dumped fields")
+    run.add_argument("--fields", default="u,v,p", help="comma separated, from " + ", ".join(FIELD_GETTERS))
+    run.add_argument("--field-dtype", choices=["float64", "float32"], default="float64")
+    run.add_argument("--compress", action="store_true", help="compress trajectory chunks")
+    run.add_argument("--out", default="run_output")
+    run.add_argument("--profile", action="store_true",
+                     help="time the step phases, written to profile.json and trace.json")
+    run.add_argument("--stream", type=int, metavar="PORT",
+                     help="serve live frames on this local port (python -m backend.streaming HOST:PORT watches)")
+    run.add_argument("--stream-field", choices=["speed", "pressure", "vorticity"], default="speed")
+    run.add_argument("--stream-fps", type=float, default=30.0)
+    run.add_argument("--quiet", action="store_true")
+    return parser
+
+
+def build_pressure_solver(args: argparse.Namespace):
+    """The --solver instance with the tolerance and check options applied"""
+    kwargs = {}
+    if args.pressure_tol is not None:
+        kwargs['tol'] = args.pressure_tol
+        if args.solver == "jacobi":
+            kwargs['criterion'] = "residual"
+    if args.pressure_max_iter is not None:
+        kwargs['max_iter'] = args.pressure_max_iter
+    if args.check_every is not None:
+        if args.solver not in ("jacobi", "sor"):
+            raise SystemExit("--check-every applies to the jacobi and sor solvers only")
+        kwargs['check_every'] = args.check_every
+    return make_pressure_solver(args.solver, **kwargs)
+
+
+def main(argv: Optional[list] = None) -> dict:
+    args = build_parser().parse_args(argv)
+    if args.steps is None and args.t_end is None:
+        raise SystemExit("give --steps and/or --t-end")
+    log = (lambda *a: None) if args.quiet else (lambda *a: print(*a, file=sys.stderr))
+
+    sim = FluidSimulator(args.nx, args.ny, dx=args.dx, dt=args.dt, viscosity=args.viscosity,
+                         u_in=args.u_in, pressure_solver=build_pressure_solver(args), workspace=args.workspace,
+                         threads=args.threads, kernels=args.kernels,
+                         adaptive=args.adaptive, cfl=args.cfl, dt_max=args.dt_max,
+                         diffusion=args.diffusion, diffusion_solver=args.diffusion_solver,
+                         pressure_extrapolation=args.extrapolate_pressure,
+                         dtype=args.dtype, pressure_dtype=args.pressure_dtype)
+    if args.obstacle:
+        mask = np.zeros((sim.ny, sim.nx), dtype=bool)
+        for spec in args.obstacle:
+            mask |= parse_obstacle(spec, sim)
+        sim.set_obstacle(mask)
+    if args.profile:
+        sim.enable_profiling()
+
+    # A rerun into the same --out replaces the previous run's trajectory;
+    # anything else in the way is refused before a file is written
+    fields_dir = os.path.join(args.out, "fields")
+    if os.path.isdir(fields_dir) and os.path.isfile(os.path.join(fields_dir, "header.json")):
+        shutil.rmtree(fields_dir)
+    elif os.path.exists(fields_dir):
+        raise SystemExit(f"{fields_dir} exists and is not a trajectory")
+    os.makedirs(args.out, exist_ok=True)
+    with open(os.path.join(args.out, "run.json"), "w") as f:
+        json.dump(vars(args), f, indent=2)
+    s = max(args.downsample, 1)
+    np.save(os.path.join(args.out, "obstacle.npy"), sim.obstacle[::s, ::s])
+    trajectory = TrajectoryWriter(fields_dir, sim, fields=args.fields.split(','),
+                                  dtype=args.field_dtype, downsample=s, compress=args.compress)
+
+    # Wall time counts from this module's first line; process CPU time also
+    # covers interpreter start-up and the package imports before it
+    startup = time.perf_counter() - _START
+    startup_cpu = time.process_time()
+    log(f"startup {startup * 1e3:.1f} ms, process CPU {startup_cpu * 1e3:.1f} ms "
+        f"({args.nx}x{args.ny}, {args.solver}, {args.kernels})")
+
+    n_rows = n_dumps = 0
+    server = None
+    try:
+        if args.stream is not None:
+            from .streaming import StreamServer
+            server = StreamServer(port=args.stream, field=args.stream_field, fps=args.stream_fps).start_in_thread()
+        start = time.perf_counter()
+        with open(os.path.join(args.out, "stats.csv"), "w", newline="") as stats_file:
+            writer = None
+            while ((args.steps is None or sim.step_count < args.steps) and
+                   (args.t_end is None or sim.time < args.t_end)):
+                # The last step is shortened to land exactly on --t-end
+                sim.step(dt=None if args.t_end is None else args.t_end - sim.time)
+                if server is not None:
+                    server.publish(sim)
+                if sim.step_count % args.stats_every == 0:
+                    row = _row(sim.get_statistics())
+                    if writer is None:
+                        writer = csv.DictWriter(stats_file, fieldnames=list(row))
+                        writer.writeheader()
+                    writer.writerow(row)
+                    stats_file.flush()
+                    n_rows += 1
+                if args.fields_every and sim.step_count % args.fields_every == 0:
+                    trajectory.append(sim)
+                    n_dumps += 1
+        if not args.fields_every or sim.step_count % args.fields_every:
+            trajectory.append(sim)
+            n_dumps += 1
+    finally:
+        trajectory.close()
+        if server is not None:
+            server.stop()
+        sim.close()
+    elapsed = time.perf_counter() - start
+    if sim.profiler is not None:
+        sim.profiler.to_json(os.path.join(args.out, "profile.json"))
+        sim.profiler.to_chrome_trace(os.path.join(args.out, "trace.json"))
+
+    summary = {
+        'steps': sim.step_count,
+        'time': sim.time,
+        'wall_time': elapsed,
+        'steps_per_sec': sim.step_count / elapsed if elapsed > 0 else float('inf'),
+        'sim_time_per_sec': sim.time / elapsed if elapsed > 0 else float('inf'),
+        'startup_time': startup,
+        'startup_cpu': startup_cpu,
+        'stats_rows': n_rows,
+        'field_dumps': n_dumps,
+    }
+    log(f"{summary['steps']} steps in {elapsed:.2f} s, {summary['steps_per_sec']:.1f} steps/s, "
+        f"t = {sim.time:.3f}")
+    return summary
+
+
+if __name__ == "__main__":
+    main()
@@ -1,159 +1,373 @@
 import numpy as np
 import time
+import tracemalloc
+from typing import Optional, Union
 
-def laplacian(field: np.ndarray, dx: float) -> np.ndarray:
-    """Discrete Laplacian with zero-Neumann at boundaries"""
-    lap = np.zeros_like(field)
-    lap[1:-1,1:-1] = (
-        field[:-2,1:-1] + field[2:,1:-1] + 
-        field[1:-1,:-2] + field[1:-1,2:] - 
-        4 * field[1:-1,1:-1]
-    ) / (dx**2)
+from . import checkpoint, obstacles, parallel, profiling
+from .activecells import ActiveCells
+from .advection import SemiLagrangianAdvector
+from .kernels import make_kernels
+from .solvers import (DiffusionSolver, JacobiSolver, PressureSolver, make_diffusion_solver,
+                      make_pressure_solver)
+from .workspace import Workspace
+
+def laplacian(field: np.ndarray, dx: float, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """Discrete Laplacian with zero-Neumann at boundaries (over the last two axes)"""
+    lap = np.empty_like(field) if out is None else out
+    inner = lap[...,1:-1,1:-1]
+    np.multiply(field[...,1:-1,1:-1], -4, out=inner)
+    inner += field[...,:-2,1:-1]
+    inner += field[...,2:,1:-1]
+    inner += field[...,1:-1,:-2]
+    inner += field[...,1:-1,2:]
+    inner /= dx**2
+    lap[...,0, :] = 0
+    lap[...,-1, :] = 0
+    lap[...,:, 0] = 0
+    lap[...,:, -1] = 0
     return lap
 
+# Implicit weight of each diffusion scheme
+DIFFUSION_THETA = {"explicit": 0.0, "backward-euler": 1.0, "crank-nicolson": 0.5}
+
 class FluidSimulator:
     def __init__(self, nx: int, ny: int, dx: float=1.0, dt: float=0.1, 
-                 viscosity: float=0.02, u_in: float=1.0):
+                 viscosity: float=0.02, u_in: float=1.0,
+                 pressure_solver: Union[str, PressureSolver]="jacobi",
+                 workspace: bool=False, track_allocations: bool=False,
+                 threads: int=1, kernels: str="numpy",
+                 adaptive: bool=False, cfl: float=1.0, dt_max: Optional[float]=None,
+                 diffusion: str="explicit",
+                 diffusion_solver: Union[str, DiffusionSolver]="jacobi",
+                 pressure_extrapolation: bool=False,
+                 dtype=np.float64, pressure_dtype=None):
         self.nx, self.ny = nx, ny
+        
+        # Working precision; float32 halves the memory traffic and uses int32
+        # gather indices. The pressure may stay float64 (mixed precision)
+        self.dtype = np.dtype(dtype)
+        self.pressure_dtype = np.dtype(pressure_dtype if pressure_dtype is not None else dtype)
+        if self.dtype.kind != 'f' or self.pressure_dtype.kind != 'f':
+            raise ValueError(f"dtype must be a floating point type, got {self.dtype} / {self.pressure_dtype}")
         self.dx, self.dt = dx, dt
         self.nu = viscosity
         self.u_in = u_in
         self.time = 0.0
         self.step_count = 0
         
+        # Adaptive time stepping: dt follows the advective CFL number of the
+        # current state, capped by dt_max; diffusion is substepped when the
+        # explicit viscous limit is the tighter one
+        self.adaptive = adaptive
+        self.cfl = cfl
+        self.dt_max = dt_max
+        self.diffusion_substeps = 1
+        
+        # Diffusion scheme ("explicit", "backward-euler" or "crank-nicolson");
+        # the implicit ones have no viscous step limit and solve with
+        # diffusion_solver ("jacobi", "rbgs", "cg" or an instance), warm-started
+        # from the previous step's diffusive increment
+        if diffusion not in DIFFUSION_THETA:
+            raise ValueError(f"Unknown diffusion scheme: {diffusion}")
+        self.diffusion = diffusion
+        self.diffusion_solver = make_diffusion_solver(diffusion_solver)
+        self.diffusion_iterations = 0
+        self._increments = {}
+        
         # Initialize fields
         shape = (ny, nx)
-        self.u = np.zeros(shape)
-        self.v = np.zeros(shape)
-        self.p = np.zeros(shape)
+        self.u = np.zeros(shape, dtype=self.dtype)
+        self.v = np.zeros(shape, dtype=self.dtype)
+        self.p = np.zeros(shape, dtype=self.pressure_dtype)
         self.obstacle = np.zeros(shape, dtype=bool)
+        self.active = ActiveCells(self.obstacle)
         
         # Set inlet velocity
         self.u[:, 0] = u_in
         
+        # Advection engine with cached index grids and work buffers
+        small = self.dtype.itemsize <= 4 and ny * nx < 2**31
+        self.advector = SemiLagrangianAdvector(ny, nx, dtype=self.dtype,
+                                               index_dtype=np.int32 if small else np.intp)
+        
+        # Pressure solver ("jacobi", "sor", "multigrid", "fft", "cg" or an
+        # instance carrying its own tolerance and check interval)
+        self.pressure_solver = make_pressure_solver(pressure_solver)
+        self.pressure_iterations = 0
+        self.pressure_residual = 0.0
+        self.pressure_converged = False
+        
+        # Start each solve from 2 p(n) - p(n-1) instead of p(n)
+        self.pressure_extrapolation = pressure_extrapolation
+        self._p_prev = None
+        
+        # Row strips for multi-threaded stencils (laplacian, divergence, Jacobi)
+        self.tiles = parallel.StripPool(ny, threads) if threads > 1 else None
+        if self.tiles is not None and isinstance(self.pressure_solver, JacobiSolver):
+            self.pressure_solver.pool = self.tiles
+        
+        # Compiled kernels ("numba", "auto") replace the NumPy/strip path;
+        # None when "numpy" is selected or numba is unavailable
+        self.kernels = make_kernels(kernels)
+        if self.kernels is not None and isinstance(self.pressure_solver, JacobiSolver):
+            self.pressure_solver.kernels = self.kernels
+        if isinstance(self.pressure_solver, JacobiSolver):
+            self.pressure_solver.active = self.active
+        
+        # Buffer pool for in-place stepping. Without it step writes u, v and p
+        # into new arrays, so references from the getters keep the old state
+        self.workspace = Workspace() if workspace else None
+        
         # Performance tracking
         self.last_step_time = 0.0
         self.avg_step_time = 0.0
+        self.track_allocations = track_allocations
+        self.last_step_alloc_bytes = 0
+        
+        # Periodic checkpointing, see enable_auto_checkpoint
+        self.auto_checkpoint = None
+        
+        # Per-phase step timings, see enable_profiling; None costs one check per phase
+        self.profiler = None
+        
+        # Derived fields and statistics are cached per state version, which
+        # step, set_obstacle and reset bump
+        self.version = 0
+        self._derived = {}
+        
+    def _buffer(self, name: str, dtype=None) -> np.ndarray:
+        """Scratch array from the workspace, or a fresh one without it"""
+        dtype = self.dtype if dtype is None else dtype
+        if self.workspace is None:
+            return np.empty((self.ny, self.nx), dtype=dtype)
+        return self.workspace.get(name, (self.ny, self.nx), dtype)
+        
+    def _back_buffer(self, name: str, front: np.ndarray) -> np.ndarray:
+        """Ping-pong partner of ``front``, which takes its place in the pool"""
+        if self.workspace is None:
+            return np.empty_like(front)
+        return self.workspace.swap(name, front)
+        
+    def _solid(self, engine) -> Union[np.ndarray, ActiveCells]:
+        """Obstacle argument for ``engine``: the index form unless compiled kernels need the mask"""
+        return self.obstacle if engine is self.kernels else self.active
         
     def set_obstacle(self, mask: np.ndarray) -> None:
         """Set obstacle mask and reset velocities in obstacle regions"""
         self.obstacle = mask.copy()
-        self.u[mask] = 0
-        self.v[mask] = 0
-        self.p[mask] = 0
+        # Solid, surface and fluid-boundary indices used by BCs and the solver
+        self.active = ActiveCells(self.obstacle)
+        if isinstance(self.pressure_solver, JacobiSolver):
+            self.pressure_solver.active = self.active
+        self.active.zero(self.u)
+        self.active.zero(self.v)
+        self.active.zero(self.p)
+        self._p_prev = None
+        self.version += 1
+        
+    def set_viscosity(self, nu: float) -> None:
+        """Change the kinematic viscosity; bumps the version so snapshots and statistics refresh"""
+        self.nu = nu
+        self.version += 1
+        
+    def add_obstacle_cells(self, cells) -> None:
+        """Make the (i, j) ``cells`` solid, touching only them and their neighbours"""
+        self._edit_obstacle(self._flat_cells(cells), True)
+        
+    def remove_obstacle_cells(self, cells) -> None:
+        """Make the (i, j) ``cells`` fluid again"""
+        self._edit_obstacle(self._flat_cells(cells), False)
+        
+    def apply_obstacle_stroke(self, polyline, brush_radius: float, solid: bool = True) -> None:
+        """Paint (or with ``solid=False`` erase) a brush along ``((x, y), ...)`` grid points"""
+        points = [(float(x), float(y)) for x, y in polyline]
+        if not points:
+            return
+        # Every segment is rasterized over its own bounding box only
+        segments = list(zip(points, points[1:])) or [(points[0], points[0])]
+        flat = [obstacles.cells(obstacles.Capsule(x0, y0, x1, y1, brush_radius), (self.ny, self.nx))
+                for (x0, y0), (x1, y1) in segments]
+        self._edit_obstacle(np.concatenate(flat), solid)
+        
+    def _flat_cells(self, cells) -> np.ndarray:
+        """Flat indices of the in-grid (i, j) pairs in ``cells``"""
+        i, j = np.asarray(cells, dtype=np.intp).reshape(-1, 2).T
+        inside = (i >= 0) & (i < self.ny) & (j >= 0) & (j < self.nx)
+        return i[inside] * self.nx + j[inside]
+        
+    def _edit_obstacle(self, flat: np.ndarray, solid: bool) -> None:
+        """set_obstacle for a mask that differs at flat indices ``flat`` only"""
+        flat = np.unique(flat[self.obstacle.reshape(-1)[flat] != solid])
+        if flat.size == 0:
+            return
+        # Edit a copy, so masks handed out by get_obstacle keep their state
+        self.obstacle = self.obstacle.copy()
+        self.obstacle.reshape(-1)[flat] = solid
+        self.active = self.active.edited(self.obstacle, flat)
+        if isinstance(self.pressure_solver, JacobiSolver):
+            self.pressure_solver.active = self.active
+        if solid:
+            for a in (self.u, self.v, self.p):
+                a.flat[flat] = 0
+        self._p_prev = None
+        self.version += 1
+        
+    def create_obstacle(self, shape: obstacles.Shape) -> np.ndarray:
+        """Rasterize any shape from backend.obstacles into a new mask"""
+        return obstacles.rasterize(shape, (self.ny, self.nx))
         
     def create_circle_obstacle(self, cx: int, cy: int, radius: int) -> np.ndarray:
         """Create circular obstacle"""
-        mask = np.zeros((self.ny, self.nx), dtype=bool)
-        y, x = np.ogrid[:self.ny, :self.nx]
-        dist = np.sqrt((x - cx)**2 + (y - cy)**2)
-        mask[dist <= radius] = True
-        return mask
+        return self.create_obstacle(obstacles.Circle(cx, cy, radius))
         
     def create_rectangle_obstacle(self, x1: int, y1: int, x2: int, y2: int) -> np.ndarray:
         """Create rectangular obstacle"""
-        mask = np.zeros((self.ny, self.nx), dtype=bool)
-        mask[y1:y2+1, x1:x2+1] = True
-        return mask
+        return self.create_obstacle(obstacles.Rectangle(x1, y1, x2, y2))
         
     def create_semicircle_obstacle(self, cx: int, cy: int, radius: int) -> np.ndarray:
         """Create semicircle obstacle (upper half)"""
-        mask = np.zeros((self.ny, self.nx), dtype=bool)
-        y, x = np.ogrid[:self.ny, :self.nx]
-        dist = np.sqrt((x - cx)**2 + (y - cy)**2)
-        # Üst yarım daire için y <= cy koşulu
-        mask[(dist <= radius) & (y <= cy)] = True
-        return mask
+        return self.create_obstacle(obstacles.Semicircle(cx, cy, radius))
         
     def create_triangle_obstacle(self, cx: int, cy: int, size: int) -> np.ndarray:
-        """Create triangular obstacle (base at bottom)"""
-        mask = np.zeros((self.ny, self.nx), dtype=bool)
-        y, x = np.ogrid[:self.ny, :self.nx]
-        # Üçgenin tabanı cy + size/2, tepe noktası (cx, cy - size/2)
-        height = size
-        base = size
-        # Üçgenin sınırları içinde kalan pikselleri hesapla
-        for i in range(self.ny):
-            for j in range(self.nx):
-                if i >= cy - height // 2 and i <= cy + height // 2:  # Üçgenin yüksekliği içinde
-                    base_width = base * (1 - (i - (cy - height // 2)) / height)  # Taban genişliği lineer olarak azalır
-                    if abs(j - cx) <= base_width / 2:
-                        mask[i, j] = True
-        return mask
+        """Create triangular obstacle (base on the top row, pointing down)"""
+        return self.create_obstacle(obstacles.Triangle(cx, cy, size))
+        
+    def create_polygon_obstacle(self, vertices) -> np.ndarray:
+        """Create polygon obstacle from (x, y) grid-coordinate vertices"""
+        return self.create_obstacle(obstacles.Polygon(vertices))
         
     def advect(self, field: np.ndarray, u0: np.ndarray, v0: np.ndarray) -> np.ndarray:
         """Semi-Lagrangian advection"""
-        ny, nx = field.shape
-        dt_dx = self.dt / self.dx
-        
-        i, j = np.meshgrid(np.arange(ny), np.arange(nx), indexing='ij')
-        
-        # Backward trace
-        x_back = j - u0 * dt_dx
-        y_back = i - v0 * dt_dx
-        
-        # Clamp to domain
-        x_back = np.clip(x_back, 0, nx-1)
-        y_back = np.clip(y_back, 0, ny-1)
-        
-        # Bilinear interpolation
-        x0 = np.floor(x_back).astype(int)
-        y0 = np.floor(y_back).astype(int)
-        x1 = np.clip(x0 + 1, 0, nx-1)
-        y1 = np.clip(y0 + 1, 0, ny-1)
-        
-        sx = x_back - x0
-        sy = y_back - y0
-        
-        f00 = field[y0, x0]
-        f10 = field[y0, x1]
-        f01 = field[y1, x0]
-        f11 = field[y1, x1]
-        
-        advected = (1-sx)*(1-sy)*f00 + sx*(1-sy)*f10 + (1-sx)*sy*f01 + sx*sy*f11
-        advected[self.obstacle] = 0
-        
+        engine = self.kernels if self.kernels is not None else self.advector
+        advected, = engine.advect([field], u0, v0, self.dt / self.dx, obstacle=self._solid(engine))
         return advected
         
-    def diffuse(self, field: np.ndarray) -> np.ndarray:
-        """Apply diffusion using explicit method"""
-        return field + self.nu * self.dt * laplacian(field, self.dx)
+    def diffuse(self, field: np.ndarray, out: Optional[np.ndarray] = None,
+                dt: Optional[float] = None, name: Optional[str] = None) -> np.ndarray:
+        """Apply diffusion with the selected scheme; ``name`` keys the implicit warm start"""
+        dt = self.dt if dt is None else dt
+        if self.diffusion != "explicit":
+            return self._diffuse_implicit(field, out, dt, name)
+        if self.kernels is not None and out is not field:
+            return self.kernels.diffuse(field, self.nu * dt, self.dx, out)
+        if self.tiles is not None:
+            lap = parallel.laplacian(field, self.dx, self._buffer('lap'), self.tiles)
+        else:
+            lap = laplacian(field, self.dx, out=self._buffer('lap'))
+        lap *= self.nu * dt
+        return np.add(field, lap, out=out)
+        
+    def _diffuse_implicit(self, field: np.ndarray, out: Optional[np.ndarray], dt: float,
+                          name: Optional[str]) -> np.ndarray:
+        theta = DIFFUSION_THETA[self.diffusion]
+        if theta < 1:
+            # Crank-Nicolson: explicit half on the right-hand side
+            rhs = laplacian(field, self.dx, out=self._buffer('lap'))
+            rhs *= (1 - theta) * self.nu * dt
+            rhs += field
+        else:
+            rhs = field
+        x = np.empty_like(field) if out is None or out is field else out
+        increment = self._increments.get(name)
+        if increment is not None and increment.shape == field.shape:
+            np.add(field, increment, out=x)
+        else:
+            np.copyto(x, rhs)
+        np.copyto(x, field, where=self.obstacle)  # Solids and border stay fixed
+        x[0, :], x[-1, :], x[:, 0], x[:, -1] = field[0, :], field[-1, :], field[:, 0], field[:, -1]
+        
+        solver = self.diffusion_solver
+        solver.solve(x, rhs, self.obstacle, theta * self.nu * dt / self.dx**2)
+        self.diffusion_iterations += solver.iterations
+        if name is not None:
+            if increment is None or increment.shape != field.shape:
+                increment = self._increments[name] = np.empty_like(field)
+            np.subtract(x, field, out=increment)
+        if out is field:
+            np.copyto(out, x)
+            return out
+        return x
+        
+    def diffusion_limit(self, margin: float = 0.9) -> float:
+        """Largest stable explicit diffusion step dx**2 / (4 nu), times ``margin``"""
+        return self.dx**2 / (4 * self.nu) * margin if self.nu > 0 else np.inf
+        
+    def cfl_dt(self) -> float:
+        """Time step that puts the fastest cell at the target CFL number, capped by ``dt_max``"""
+        max_speed = self._derived_field('statistics', self._field_statistics)[0]
+        dt = self.cfl * self.dx / max_speed if max_speed > 0 else np.inf
+        if self.dt_max is not None:
+            dt = min(dt, self.dt_max)
+        # A fluid at rest with no cap keeps the previous step
+        return float(dt) if np.isfinite(dt) else self.dt
         
     def project(self) -> None:
         """Pressure projection to enforce incompressibility"""
         dx = self.dx
         
         # Compute divergence
-        div = np.zeros_like(self.u)
-        div[1:-1,1:-1] = (
-            (self.u[1:-1,2:] - self.u[1:-1,:-2]) + 
-            (self.v[2:,1:-1] - self.v[:-2,1:-1])
-        ) / (2*dx)
-        
-        # Solve Poisson equation using Jacobi iteration
-        p_new = self.p.copy()
-        for iteration in range(100):  # Max iterations
-            p_old = p_new.copy()
-            p_new[1:-1,1:-1] = (
-                p_new[1:-1,2:] + p_new[1:-1,:-2] + 
-                p_new[2:,1:-1] + p_new[:-2,1:-1] - 
-                div[1:-1,1:-1] * dx*dx
-            ) * 0.25
-            
-            # Apply boundary conditions
-            p_new[self.obstacle] = 0
-            
-            # Check convergence
-            if iteration > 0 and np.max(np.abs(p_new - p_old)) < 1e-6:
-                break
-                
-        self.p = p_new
+        div = self._buffer('div')
+        tmp_full = self._buffer('tmp')
+        tmp = tmp_full[1:-1,1:-1]
+        if self.tiles is not None:
+            parallel.divergence(self.u, self.v, dx, div, tmp_full, self.tiles)
+        else:
+            inner = div[1:-1,1:-1]
+            np.subtract(self.u[1:-1,2:], self.u[1:-1,:-2], out=inner)
+            np.subtract(self.v[2:,1:-1], self.v[:-2,1:-1], out=tmp)
+            inner += tmp
+            inner /= 2*dx
+            div[0, :] = 0
+            div[-1, :] = 0
+            div[:, 0] = 0
+            div[:, -1] = 0
+        prof = self.profiler
+        if prof is not None:
+            prof.mark('divergence')
+        
+        # Solve Poisson equation in place, warm-started from the previous
+        # pressure or its linear extrapolation
+        if self.workspace is None:
+            self.p = self.p.copy()
+        if self.pressure_extrapolation:
+            self._extrapolate_pressure(self._buffer('p_delta', self.p.dtype))
+        solver = self.pressure_solver
+        solver.solve(self.p, div, self.obstacle, dx)
+        self.pressure_iterations = solver.iterations
+        self.pressure_residual = solver.residual
+        self.pressure_converged = solver.converged
+        if prof is not None:
+            prof.mark('pressure')
         
         # Update velocity field
-        self.u[1:-1,1:-1] -= (self.p[1:-1,2:] - self.p[1:-1,:-2]) / (2*dx)
-        self.v[1:-1,1:-1] -= (self.p[2:,1:-1] - self.p[:-2,1:-1]) / (2*dx)
-        
-        # Enforce boundary conditions
+        np.subtract(self.p[1:-1,2:], self.p[1:-1,:-2], out=tmp)
+        tmp /= 2*dx
+        self.u[1:-1,1:-1] -= tmp
+        np.subtract(self.p[2:,1:-1], self.p[:-2,1:-1], out=tmp)
+        tmp /= 2*dx
+        self.v[1:-1,1:-1] -= tmp
+        if prof is not None:
+            prof.mark('gradient')
+        
+        self.enforce_boundaries()
+        if prof is not None:
+            prof.mark('boundaries')
+        
+    def _extrapolate_pressure(self, scratch: np.ndarray) -> None:
+        """Replace p with 2 p - p_prev and remember the current p"""
+        if self._p_prev is None:
+            self._p_prev = self.p.copy()
+            return
+        np.subtract(self.p, self._p_prev, out=scratch)
+        np.copyto(self._p_prev, self.p)
+        self.p += scratch
+        self.active.zero(self.p)
+        
+    def enforce_boundaries(self) -> None:
+        """Apply inflow/outflow, no-slip wall and obstacle conditions to u and v"""
+        if self.kernels is not None:
+            self.kernels.enforce_boundaries(self.u, self.v, self.u_in, self.obstacle)
+            return
         self.u[:, 0] = self.u_in  # Inflow
         self.u[:, -1] = self.u[:, -2]  # Outflow (Neumann)
         self.v[:, 0] = 0  # No vertical velocity at inflow
@@ -166,35 +380,65 @@ class FluidSimulator:
         self.v[-1, :] = 0
         
         # Zero velocity in obstacles
-        self.u[self.obstacle] = 0
-        self.v[self.obstacle] = 0
+        self.active.zero(self.u)
+        self.active.zero(self.v)
         
-    def step(self) -> None:
-        """Perform one simulation step"""
+    def step(self, dt: Optional[float] = None) -> None:
+        """Perform one simulation step; ``dt`` caps this step's length (see advance_to)"""
         start_time = time.time()
+        prof = self.profiler
+        if prof is not None:
+            prof.begin()
+        if self.track_allocations:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+            base_bytes, _ = tracemalloc.get_traced_memory()
         
         # Ensure numerical stability
-        max_dt = self.dx**2 / (4 * self.nu)
-        if self.dt > max_dt:
-            self.dt = max_dt * 0.9
+        if self.adaptive:
+            self.dt = self.cfl_dt()
+        elif self.diffusion == "explicit":
+            max_dt = self.dx**2 / (4 * self.nu)
+            if self.dt > max_dt:
+                self.dt = max_dt * 0.9
+        h = self.dt if dt is None else min(self.dt, dt)
+        if prof is not None:
+            prof.mark('timestep')
             
-        # Store current velocity field
-        u0, v0 = self.u.copy(), self.v.copy()
-        
-        # Advection step
-        self.u = self.advect(self.u, u0, v0)
-        self.v = self.advect(self.v, u0, v0)
-        
-        # Diffusion step
-        self.u = self.diffuse(self.u)
-        self.v = self.diffuse(self.v)
+        # Advection step: both components share one backtrace. With a
+        # workspace they are written back in place (the advector stages its
+        # own copy), otherwise into new arrays
+        engine = self.kernels if self.kernels is not None else self.advector
+        out = [self.u, self.v] if self.workspace is not None else None
+        self.u, self.v = engine.advect([self.u, self.v], self.u, self.v, h / self.dx,
+                                       out=out, obstacle=self._solid(engine))
+        if prof is not None:
+            prof.mark('advect')
+        
+        # Diffusion step into the ping-pong back buffers, split into equal
+        # substeps when h exceeds the explicit limit. A fixed dt was clamped
+        # against the bare limit above and keeps its single step; adaptive
+        # steps are split with the 10% margin
+        n = 1
+        if self.diffusion == "explicit":
+            limit = self.diffusion_limit() if self.adaptive else self.diffusion_limit(1.0)
+            n = max(1, int(np.ceil(h / limit)))
+        self.diffusion_substeps = n
+        self.diffusion_iterations = 0
+        for _ in range(n):
+            self.u = self.diffuse(self.u, out=self._back_buffer('u_back', self.u), dt=h / n, name='u')
+            self.v = self.diffuse(self.v, out=self._back_buffer('v_back', self.v), dt=h / n, name='v')
+        if prof is not None:
+            prof.mark('diffuse')
         
         # Projection step
         self.project()
         
         # Update time and step count
-        self.time += self.dt
+        self.time += h
         self.step_count += 1
+        self.version += 1
         
         # Performance tracking
         step_time = time.time() - start_time
@@ -203,59 +447,168 @@ class FluidSimulator:
         else:
             self.avg_step_time = 0.9 * self.avg_step_time + 0.1 * step_time
         self.last_step_time = step_time
+        if self.track_allocations:
+            _, peak_bytes = tracemalloc.get_traced_memory()
+            self.last_step_alloc_bytes = peak_bytes - base_bytes
+        
+        if self.auto_checkpoint is not None:
+            self.auto_checkpoint.after_step(self)
+        if prof is not None:
+            prof.end(self)
+        
+    def advance_to(self, t_end: float) -> int:
+        """Step until ``time`` reaches ``t_end``, shortening the last step to land on it; returns steps taken"""
+        steps = 0
+        while t_end - self.time > 1e-9 * self.dt:
+            self.step(dt=t_end - self.time)
+            steps += 1
+        return steps
+        
+    def save_checkpoint(self, path: str, float32: bool = False) -> int:
+        """Write the full state to ``path`` (atomic replace); returns the file size"""
+        return checkpoint.write_state(path, checkpoint.capture_state(self), np.float32 if float32 else None)
+        
+    def load_checkpoint(self, path: str) -> None:
+        """Restore the state saved by ``save_checkpoint``; fields are memory-mapped"""
+        state = checkpoint.read_state(path)
+        if (state['ny'], state['nx']) != (self.ny, self.nx):
+            raise ValueError(f"checkpoint grid {state['nx']}x{state['ny']} does not match {self.nx}x{self.ny}")
+        self.dx, self.dt = state['dx'], state['dt']
+        self.nu, self.u_in = state['viscosity'], state['u_in']
+        self.time, self.step_count = state['time'], state['step_count']
+        for name in checkpoint.FIELDS:
+            field = state[name]
+            if field.dtype == getattr(self, name).dtype:
+                setattr(self, name, field.view(np.ndarray))
+            else:
+                setattr(self, name, field.astype(getattr(self, name).dtype))
+        self.set_obstacle(state['obstacle'])
+        self._clear_warm_start()
+        
+    def enable_auto_checkpoint(self, path: str, every: int, float32: bool = False) -> checkpoint.AutoCheckpoint:
+        """Checkpoint to ``path`` every ``every`` steps from a background thread"""
+        self.auto_checkpoint = checkpoint.AutoCheckpoint(path, every, float32)
+        return self.auto_checkpoint
+        
+    def enable_profiling(self, capacity: int = 1024) -> profiling.StepProfiler:
+        """Record per-phase timings of every step; set ``profiler`` to None to stop"""
+        self.profiler = profiling.StepProfiler(capacity)
+        return self.profiler
+        
+    def close(self) -> None:
+        """Shut down the strip threads and wait for a pending auto checkpoint; stepping stays possible, serially"""
+        if self.tiles is not None:
+            self.tiles.close()
+        if self.auto_checkpoint is not None:
+            self.auto_checkpoint.wait()
+        
+    def __enter__(self) -> "FluidSimulator":
+        return self
+        
+    def __exit__(self, *exc) -> None:
+        self.close()
         
     def get_velocity(self) -> tuple[np.ndarray, np.ndarray]:
-        """Get velocity components"""
+        """Get velocity components; with a workspace they are overwritten by the next step"""
         return self.u, self.v
         
     def get_pressure(self) -> np.ndarray:
-        """Get pressure field"""
+        """Get pressure field; with a workspace it is overwritten by the next step"""
         return self.p
         
     def get_obstacle(self) -> np.ndarray:
         """Get obstacle mask"""
         return self.obstacle
         
+    def invalidate(self) -> None:
+        """Bump the state version; call after editing u, v, p or dx directly"""
+        self.version += 1
+        
+    def _derived_field(self, name: str, compute):
+        """``compute()`` at most once per state version, arrays returned read-only"""
+        hit = self._derived.get(name)
+        if hit is not None and hit[0] == self.version:
+            return hit[1]
+        value = compute()
+        if isinstance(value, np.ndarray):
+            value.flags.writeable = False
+        self._derived[name] = (self.version, value)
+        return value
+        
     def get_velocity_magnitude(self) -> np.ndarray:
         """Get velocity magnitude"""
-        return np.sqrt(self.u**2 + self.v**2)
+        return self._derived_field('speed', lambda: np.sqrt(self.u**2 + self.v**2))
         
     def get_vorticity(self) -> np.ndarray:
         """Compute vorticity field"""
-        vorticity = np.zeros_like(self.u)
-        vorticity[1:-1, 1:-1] = (
-            (self.v[1:-1, 2:] - self.v[1:-1, :-2]) - 
-            (self.u[2:, 1:-1] - self.u[:-2, 1:-1])
-        ) / (2 * self.dx)
-        return vorticity
+        def compute():
+            vorticity = np.zeros_like(self.u)
+            vorticity[1:-1, 1:-1] = (
+                (self.v[1:-1, 2:] - self.v[1:-1, :-2]) - 
+                (self.u[2:, 1:-1] - self.u[:-2, 1:-1])
+            ) / (2 * self.dx)
+            return vorticity
+        return self._derived_field('vorticity', compute)
         
     def get_divergence(self) -> np.ndarray:
         """Compute velocity divergence"""
-        div = np.zeros_like(self.u)
-        div[1:-1, 1:-1] = (
-            (self.u[1:-1, 2:] - self.u[1:-1, :-2]) + 
-            (self.v[2:, 1:-1] - self.v[:-2, 1:-1])
-        ) / (2 * self.dx)
-        return div
+        def compute():
+            div = np.zeros_like(self.u)
+            div[1:-1, 1:-1] = (
+                (self.u[1:-1, 2:] - self.u[1:-1, :-2]) + 
+                (self.v[2:, 1:-1] - self.v[:-2, 1:-1])
+            ) / (2 * self.dx)
+            return div
+        return self._derived_field('divergence', compute)
+        
+    def _field_statistics(self) -> tuple:
+        """(max_speed, avg_speed, max_pressure, min_pressure) of the current state"""
+        if self.kernels is not None:
+            # One fused pass, the speed field is never materialized
+            return tuple(map(float, self.kernels.statistics(self.u, self.v, self.p, self.obstacle)))
+        speed = self.get_velocity_magnitude()
+        n_fluid = self.obstacle.size - self.active.solid.size
+        if self.active.box is None:
+            fluid_sum = np.sum(speed)
+        else:
+            fluid_sum = np.sum(speed, where=~self.obstacle)
+        # Python floats, so float32 fields never leak into dt, time or JSON headers
+        return (float(np.max(speed)), float(fluid_sum / n_fluid) if n_fluid else np.nan,
+                float(np.max(self.p)), float(np.min(self.p)))
+        
+    def _divergence_rms(self) -> float:
+        """Root mean square of get_divergence over the fluid cells"""
+        fluid = self.get_divergence()[~self.obstacle]
+        return float(np.sqrt(np.mean(fluid**2))) if fluid.size else 0.0
         
     def get_statistics(self) -> dict:
         """Get simulation statistics"""
-        u, v = self.get_velocity()
-        speed = self.get_velocity_magnitude()
+        max_speed, avg_speed, max_pressure, min_pressure = self._derived_field(
+            'statistics', self._field_statistics)
         
         stats = {
             'time': self.time,
             'step_count': self.step_count,
             'dt': self.dt,
-            'max_speed': np.max(speed),
-            'avg_speed': np.mean(speed[~self.obstacle]),
-            'max_pressure': np.max(self.p),
-            'min_pressure': np.min(self.p),
+            'max_speed': max_speed,
+            'avg_speed': avg_speed,
+            'max_pressure': max_pressure,
+            'min_pressure': min_pressure,
             'mass_flow_in': np.sum(self.u[:, 0]) * self.dx,
             'mass_flow_out': np.sum(self.u[:, -1]) * self.dx,
+            'pressure_iterations': self.pressure_iterations,
+            'pressure_residual': self.pressure_residual,
+            'pressure_converged': self.pressure_converged,
+            'divergence_rms': self._derived_field('divergence_rms', self._divergence_rms),
+            'diffusion_substeps': self.diffusion_substeps,
+            'diffusion_iterations': self.diffusion_iterations,
             'avg_step_time': self.avg_step_time,
-            'last_step_time': self.last_step_time
+            'last_step_time': self.last_step_time,
+            'step_alloc_bytes': self.last_step_alloc_bytes
         }
+        if self.profiler is not None:
+            # Mean per-phase milliseconds over the recent steps
+            stats.update(self.profiler.summary())
         
         return stats
         
@@ -269,6 +622,13 @@ class FluidSimulator:
         self.step_count = 0
         
         # Reset velocities in obstacles
-        self.u[self.obstacle] = 0
-        self.v[self.obstacle] = 0
-        self.p[self.obstacle] = 0
\ No newline at end of file
+        self.active.zero(self.u)
+        self.active.zero(self.v)
+        self.active.zero(self.p)
+        self._clear_warm_start()
+        self.version += 1
+        
+    def _clear_warm_start(self) -> None:
+        """Forget the previous pressure and diffusion increments, which belong to the old run"""
+        self._p_prev = None
+        self._increments = {}
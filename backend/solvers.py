@@ -0,0 +1,850 @@
+import numpy as np
+from typing import Optional, Union
+
+from . import parallel
+from .activecells import ActiveCells
+
+
+def _load_sparse():
+    """scipy.sparse, imported on first use; None without scipy"""
+    try:
+        import scipy.sparse
+    except ImportError:  # scipy is optional, only the CG solver needs it
+        return None
+    return scipy.sparse
+
+
+def poisson_residual(p: np.ndarray, rhs: np.ndarray, obstacle: np.ndarray, dx: float,
+                     out: Optional[np.ndarray] = None) -> np.ndarray:
+    """Residual rhs - lap(p) on interior fluid cells, zero elsewhere"""
+    r = np.empty_like(p) if out is None else out
+    inner = r[..., 1:-1, 1:-1]
+    np.multiply(p[..., 1:-1, 1:-1], 4, out=inner)
+    inner -= p[..., :-2, 1:-1]
+    inner -= p[..., 2:, 1:-1]
+    inner -= p[..., 1:-1, :-2]
+    inner -= p[..., 1:-1, 2:]
+    inner /= dx**2
+    inner += rhs[..., 1:-1, 1:-1]
+    _zero_fixed(r, obstacle)
+    return r
+
+
+def _zero_fixed(a: np.ndarray, obstacle: np.ndarray) -> None:
+    a[..., 0, :] = 0
+    a[..., -1, :] = 0
+    a[..., :, 0] = 0
+    a[..., :, -1] = 0
+    np.copyto(a, 0, where=obstacle)
+
+
+def _red_black_colors(fixed: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Interior masks of the free cells with even and odd i + j, for red-black sweeps"""
+    ii, jj = np.indices(fixed.shape)
+    red = (ii + jj) % 2 == 0
+    free = ~fixed
+    return (free & red)[1:-1, 1:-1], (free & ~red)[1:-1, 1:-1]
+
+
+def _jacobi_sweep(src: np.ndarray, dst: np.ndarray, rhs: np.ndarray, scale: float, k: float = 1.0,
+                  fixed: Optional[np.ndarray] = None, fixed_value=0) -> None:
+    """Interior of ``dst`` = (k * neighbour sum of ``src`` - ``rhs``) * ``scale``.
+
+    ``rhs`` is interior-shaped. Cells in ``fixed`` are then set to
+    ``fixed_value`` (a scalar or an array such as ``src``).
+    """
+    inner = dst[..., 1:-1, 1:-1]
+    np.add(src[..., 1:-1, 2:], src[..., 1:-1, :-2], out=inner)
+    inner += src[..., 2:, 1:-1]
+    inner += src[..., :-2, 1:-1]
+    if k != 1.0:
+        inner *= k
+    inner -= rhs
+    inner *= scale
+    if fixed is not None:
+        np.copyto(dst, fixed_value, where=fixed)
+
+
+def residual_norm(p: np.ndarray, rhs: np.ndarray, obstacle: np.ndarray, dx: float,
+                  out: Optional[np.ndarray] = None) -> float:
+    """Relative L2 residual ||rhs - lap(p)|| / ||rhs|| over interior fluid cells"""
+    r = poisson_residual(p, rhs, obstacle, dx, out)
+    r_norm = np.linalg.norm(r)
+    np.copyto(r, rhs)
+    _zero_fixed(r, obstacle)
+    b_norm = np.linalg.norm(r)
+    return float(r_norm / (b_norm if b_norm > 0 else 1.0))
+
+
+class PressureSolver:
+    """Base class for solvers of lap(p) = div with p = 0 on walls and obstacles.
+
+    ``solve`` works in place on ``p`` (its contents are the initial guess)
+    and records ``iterations``, ``residual`` and ``converged`` for the
+    last call.
+    """
+    name = "base"
+
+    def __init__(self, tol: float = 1e-6, max_iter: int = 100):
+        self.tol = tol
+        self.max_iter = max_iter
+        self.iterations = 0
+        self.residual = 0.0
+        self.converged = False
+
+    def solve(self, p: np.ndarray, div: np.ndarray, obstacle: np.ndarray, dx: float) -> np.ndarray:
+        raise NotImplementedError
+
+
+def _jacobi_spans(src: np.ndarray, dst: np.ndarray, rhs: np.ndarray, active: ActiveCells) -> None:
+    """Jacobi sweep over the spans of ``active`` only; fully solid tiles stay zero"""
+    ny, nx = src.shape
+    for r0, r1, c0, c1 in active.spans:
+        a, b, c, d = max(r0, 1), min(r1, ny - 1), max(c0, 1), min(c1, nx - 1)
+        if a >= b or c >= d:
+            continue
+        inner = dst[a:b, c:d]
+        np.add(src[a:b, c+1:d+1], src[a:b, c-1:d-1], out=inner)
+        inner += src[a+1:b+1, c:d]
+        inner += src[a-1:b-1, c:d]
+        inner -= rhs[a:b, c:d]
+        inner *= 0.25
+    dst.reshape(-1)[active.span_solid] = 0
+
+
+def _max_change_spans(a: np.ndarray, b: np.ndarray, scratch: np.ndarray, active: ActiveCells) -> float:
+    change = 0.0
+    for r0, r1, c0, c1 in active.spans:
+        s = scratch[r0:r1, c0:c1]
+        np.subtract(a[r0:r1, c0:c1], b[r0:r1, c0:c1], out=s)
+        np.abs(s, out=s)
+        change = max(change, s.max())
+    return change
+
+
+class JacobiSolver(PressureSolver):
+    """Jacobi iteration, the original FluidSimulator.project loop.
+
+    With ``criterion="change"`` it stops once the max update falls below
+    ``tol``; with ``criterion="residual"`` it stops on the relative residual.
+    The test runs every ``check_every`` sweeps, since it costs about as much
+    as a sweep.
+    Stacked ``(N, ny, nx)`` problems are solved together, but the stopping
+    test is applied to each member on its own: a converged member leaves
+    the batch with the same result and iteration count as a separate 2D
+    solve (``member_iterations``), so it never depends on the rest of the
+    batch. ``residual`` is taken over the whole batch. Given a ``pool``
+    (parallel.StripPool) 2D sweeps run strip-parallel on its threads; given
+    compiled ``kernels`` (kernels.NumbaKernels) the whole 2D loop runs there.
+    Given ``active`` (activecells.ActiveCells for the same obstacle mask)
+    serial 2D sweeps skip fully solid tiles (when ``active.use_spans``) and
+    zero solids by index.
+    """
+    name = "jacobi"
+
+    def __init__(self, tol: float = 1e-6, max_iter: int = 100, criterion: str = "change",
+                 pool: Optional["parallel.StripPool"] = None, check_every: int = 1):
+        super().__init__(tol, max_iter)
+        if criterion not in ("change", "residual"):
+            raise ValueError(f"Unknown convergence criterion: {criterion}")
+        self.criterion = criterion
+        self.check_every = max(1, check_every)
+        self.pool = pool
+        self.kernels = None
+        self.active = None
+        self.member_iterations = None
+        self._buf = None
+        self._rhs = None
+        self._scratch = None
+
+    def solve(self, p, div, obstacle, dx):
+        if self._buf is None or self._buf.shape != p.shape or self._buf.dtype != p.dtype:
+            self._buf = np.empty_like(p)
+            self._rhs = np.empty_like(p)
+            self._scratch = np.empty_like(p)
+        src, dst, scratch = p, self._buf, self._scratch
+        active = self.active if p.ndim == 2 and self.pool is None else None
+        if active is not None and active.shape != p.shape:
+            active = None
+        spans = active is not None and active.use_spans
+        if spans:
+            active.zero(p)  # Skipped tiles keep their start value
+        # Border values are never updated, copy them into the spare buffer once
+        np.copyto(dst, src)
+        rhs = self._rhs[..., 1:-1, 1:-1]
+        np.multiply(div[..., 1:-1, 1:-1], dx * dx, out=rhs)
+        if self.kernels is not None and p.ndim == 2 and self.criterion == "change":
+            self.iterations, self.converged = self.kernels.jacobi(
+                p, self._rhs, obstacle, self.max_iter, self.tol, self.check_every)
+            self.residual = residual_norm(p, div, obstacle, dx, out=scratch)
+            return p
+        if p.ndim == 3:
+            return self._solve_batch(p, div, obstacle, dx)
+
+        pool = self.pool
+        self.converged = False
+        iteration = 0
+        for iteration in range(self.max_iter):
+            if pool is not None:
+                parallel.jacobi_sweep(src, dst, self._rhs, obstacle, pool)
+            elif spans:
+                _jacobi_spans(src, dst, self._rhs, active)
+            elif active is not None:
+                _jacobi_sweep(src, dst, rhs, 0.25)
+                active.zero(dst)
+            else:
+                _jacobi_sweep(src, dst, rhs, 0.25, fixed=obstacle)
+            src, dst = dst, src
+
+            if (iteration + 1) % self.check_every:
+                continue
+            if self.criterion == "change":
+                if iteration > 0:
+                    if pool is not None:
+                        change = parallel.max_abs_diff(src, dst, scratch, pool)
+                    elif spans:
+                        change = _max_change_spans(src, dst, scratch, active)
+                    else:
+                        np.subtract(src, dst, out=scratch)
+                        np.abs(scratch, out=scratch)
+                        change = scratch.max()
+                    if change < self.tol:
+                        self.converged = True
+                        break
+            elif residual_norm(src, div, obstacle, dx, out=scratch) < self.tol:
+                self.converged = True
+                break
+        if src is not p:
+            np.copyto(p, src)
+        self.iterations = iteration + 1
+        self.residual = residual_norm(p, div, obstacle, dx, out=scratch)
+        return p
+
+    def _solve_batch(self, p, div, obstacle, dx):
+        """Stacked solve; members that pass the stopping test are written to ``p`` and dropped"""
+        live = np.arange(p.shape[0])
+        iterations = np.zeros(p.shape[0], dtype=int)
+        converged = np.zeros(p.shape[0], dtype=bool)
+        src, dst, rhs, live_div, mask = p, self._buf, self._rhs, div, obstacle
+        iteration = 0
+        for iteration in range(self.max_iter):
+            _jacobi_sweep(src, dst, rhs[:, 1:-1, 1:-1], 0.25, fixed=mask)
+            src, dst = dst, src
+
+            if (iteration + 1) % self.check_every:
+                continue
+            if self.criterion == "change":
+                if iteration == 0:
+                    continue
+                scratch = self._scratch[:live.size]
+                np.subtract(src, dst, out=scratch)
+                np.abs(scratch, out=scratch)
+                change = scratch.max(axis=(1, 2))
+            else:
+                change = np.array([residual_norm(src[k], live_div[k], mask[k], dx)
+                                   for k in range(live.size)])
+            done = change < self.tol
+            if not done.any():
+                continue
+            p[live[done]] = src[done]
+            converged[live[done]] = True
+            iterations[live[done]] = iteration + 1
+            keep = ~done
+            live = live[keep]
+            if live.size == 0:
+                break
+            # The members left are gathered into new stacks, at most N times per solve
+            src, dst, rhs = src[keep], dst[keep], rhs[keep]
+            live_div, mask = live_div[keep], mask[keep]
+        if live.size:
+            iterations[live] = iteration + 1
+            if src is not p:
+                p[live] = src
+        self.member_iterations = iterations
+        self.iterations = int(iterations.max())
+        self.converged = bool(converged.all())
+        self.residual = residual_norm(p, div, obstacle, dx, out=self._scratch)
+        return p
+
+
+class SORSolver(PressureSolver):
+    """Red-black successive over-relaxation, stopped on the true relative residual.
+
+    ``omega="auto"`` takes the optimum for the obstacle-free rectangle,
+    2 / (1 + sqrt(1 - rho**2)) with rho the Jacobi spectral radius;
+    obstacles only speed convergence up, so it stays a good choice. The
+    residual is checked every ``check_every`` sweeps. 2D fields only.
+    """
+    name = "sor"
+
+    def __init__(self, tol: float = 1e-6, max_iter: int = 1000, omega: Union[str, float] = "auto",
+                 check_every: int = 4):
+        super().__init__(tol, max_iter)
+        if omega != "auto" and not 0 < omega < 2:
+            raise ValueError(f"omega must be 'auto' or in (0, 2), got {omega}")
+        self.omega = omega
+        self.check_every = max(1, check_every)
+        self._key = None
+        self._colors = None
+        self._rhs = None
+        self._upd = None
+        self._scratch = None
+
+    def relaxation(self, shape: tuple) -> float:
+        """Over-relaxation factor used for a grid of ``shape``"""
+        if self.omega != "auto":
+            return self.omega
+        ny, nx = shape
+        rho = 0.5 * (np.cos(np.pi / (nx - 1)) + np.cos(np.pi / (ny - 1)))
+        return 2 / (1 + np.sqrt(1 - rho**2))
+
+    def _build(self, p: np.ndarray, obstacle: np.ndarray) -> None:
+        key = (p.shape, np.packbits(obstacle).tobytes())
+        if key == self._key:
+            return
+        self._colors = _red_black_colors(obstacle)
+        self._rhs = np.empty_like(p[1:-1, 1:-1])
+        self._upd = np.empty_like(p[1:-1, 1:-1])
+        self._scratch = np.empty_like(p)
+        self._key = key
+
+    def solve(self, p, div, obstacle, dx):
+        self._build(p, obstacle)
+        omega = self.relaxation(p.shape)
+        rhs, upd, inner = self._rhs, self._upd, p[1:-1, 1:-1]
+        scaled = self._scratch[1:-1, 1:-1]
+        np.multiply(div[1:-1, 1:-1], dx * dx, out=rhs)
+        np.copyto(p, 0, where=obstacle)
+
+        self.converged = False
+        self.iterations = 0
+        while self.iterations < self.max_iter:
+            for color in self._colors:
+                # upd = (1 - omega) p + omega * (neighbour sum - dx^2 div) / 4
+                np.add(p[:-2, 1:-1], p[2:, 1:-1], out=upd)
+                upd += p[1:-1, :-2]
+                upd += p[1:-1, 2:]
+                upd -= rhs
+                np.multiply(inner, 4, out=scaled)
+                upd -= scaled
+                upd *= 0.25 * omega
+                upd += inner
+                np.copyto(inner, upd, where=color)
+            self.iterations += 1
+            if self.iterations % self.check_every == 0 or self.iterations == self.max_iter:
+                self.residual = residual_norm(p, div, obstacle, dx, out=self._scratch)
+                if self.residual < self.tol:
+                    self.converged = True
+                    break
+        return p
+
+
+class _Level:
+    """One grid of the multigrid hierarchy"""
+
+    def __init__(self, fixed: np.ndarray, h: float):
+        self.fixed = fixed
+        self.h = h
+        self.shape = fixed.shape
+        self.colors = _red_black_colors(fixed)
+        self.p = np.zeros(self.shape)
+        self.f = np.zeros(self.shape)
+        self.r = np.zeros(self.shape)
+
+
+class MultigridSolver(PressureSolver):
+    """Geometric multigrid V-cycles with red-black Gauss-Seidel smoothing.
+
+    The grid is padded with solid cells up to a size that can be halved
+    ``n_levels - 1`` times, which leaves the discrete problem unchanged.
+    """
+    name = "multigrid"
+
+    def __init__(self, tol: float = 1e-6, max_iter: int = 50, pre_smooth: int = 2,
+                 post_smooth: int = 2, min_size: int = 5):
+        super().__init__(tol, max_iter)
+        self.pre_smooth = pre_smooth
+        self.post_smooth = post_smooth
+        self.min_size = min_size
+        self._levels = None
+        self._key = None
+
+    def _build(self, obstacle: np.ndarray, dx: float) -> None:
+        key = (obstacle.shape, dx, np.packbits(obstacle).tobytes())
+        if key == self._key:
+            return
+        ny, nx = obstacle.shape
+        n_coarsen = 0
+        while (min(ny, nx) - 1) / 2**(n_coarsen + 1) >= self.min_size - 1:
+            n_coarsen += 1
+        step = 2**n_coarsen
+        pny = -(-(ny - 1) // step) * step + 1
+        pnx = -(-(nx - 1) // step) * step + 1
+
+        walls = np.ones((pny, pnx), dtype=bool)
+        walls[1:ny - 1, 1:nx - 1] = False
+        solid = np.zeros((pny, pnx), dtype=bool)
+        solid[:ny, :nx] = obstacle
+        levels = [_Level(walls | solid, dx)]
+        for _ in range(n_coarsen):
+            # A coarse cell is solid if any fine cell it covers is solid;
+            # walls are injected so the coarse domain does not shrink
+            grown = solid.copy()
+            grown[1:, :] |= solid[:-1, :]
+            grown[:-1, :] |= solid[1:, :]
+            dilated = grown.copy()
+            dilated[:, 1:] |= grown[:, :-1]
+            dilated[:, :-1] |= grown[:, 1:]
+            solid = dilated[::2, ::2].copy()
+            walls = walls[::2, ::2].copy()
+            levels.append(_Level(walls | solid, levels[-1].h * 2))
+        self._levels = levels
+        self._key = key
+
+    def _smooth(self, lvl: _Level, p: np.ndarray, f: np.ndarray, sweeps: int, reverse: bool) -> None:
+        h2 = lvl.h**2
+        colors = lvl.colors[::-1] if reverse else lvl.colors
+        for _ in range(sweeps):
+            for mask in colors:
+                upd = (p[:-2, 1:-1] + p[2:, 1:-1] + p[1:-1, :-2] + p[1:-1, 2:] - h2 * f[1:-1, 1:-1]) * 0.25
+                np.copyto(p[1:-1, 1:-1], upd, where=mask)
+
+    def _residual(self, lvl: _Level, p: np.ndarray, f: np.ndarray) -> np.ndarray:
+        return poisson_residual(p, f, lvl.fixed, lvl.h, out=lvl.r)
+
+    @staticmethod
+    def _restrict(r: np.ndarray, out: np.ndarray) -> None:
+        out.fill(0)
+        out[1:-1, 1:-1] = (
+            4 * r[2:-1:2, 2:-1:2] +
+            2 * (r[1:-2:2, 2:-1:2] + r[3::2, 2:-1:2] + r[2:-1:2, 1:-2:2] + r[2:-1:2, 3::2]) +
+            r[1:-2:2, 1:-2:2] + r[1:-2:2, 3::2] + r[3::2, 1:-2:2] + r[3::2, 3::2]
+        ) / 16
+
+    @staticmethod
+    def _prolong_add(e: np.ndarray, p: np.ndarray, fixed: np.ndarray) -> None:
+        fine = np.zeros_like(p)
+        fine[::2, ::2] = e
+        fine[1::2, ::2] = 0.5 * (e[:-1, :] + e[1:, :])
+        fine[::2, 1::2] = 0.5 * (e[:, :-1] + e[:, 1:])
+        fine[1::2, 1::2] = 0.25 * (e[:-1, :-1] + e[1:, :-1] + e[:-1, 1:] + e[1:, 1:])
+        fine[fixed] = 0
+        p += fine
+
+    def _vcycle(self, k: int, p: np.ndarray, f: np.ndarray) -> None:
+        lvl = self._levels[k]
+        if k == len(self._levels) - 1:
+            self._smooth(lvl, p, f, 2 * max(lvl.shape), reverse=False)
+            return
+        self._smooth(lvl, p, f, self.pre_smooth, reverse=False)
+        r = self._residual(lvl, p, f)
+        coarse = self._levels[k + 1]
+        self._restrict(r, coarse.f)
+        coarse.p.fill(0)
+        self._vcycle(k + 1, coarse.p, coarse.f)
+        self._prolong_add(coarse.p, p, lvl.fixed)
+        self._smooth(lvl, p, f, self.post_smooth, reverse=True)
+
+    def precondition(self, rhs: np.ndarray, obstacle: np.ndarray, dx: float) -> np.ndarray:
+        """Approximate lap^-1 rhs with one V-cycle from a zero guess"""
+        self._build(obstacle, dx)
+        ny, nx = obstacle.shape
+        top = self._levels[0]
+        top.p.fill(0)
+        top.f.fill(0)
+        top.f[:ny, :nx] = rhs
+        self._vcycle(0, top.p, top.f)
+        return top.p[:ny, :nx]
+
+    def solve(self, p, div, obstacle, dx):
+        self._build(obstacle, dx)
+        ny, nx = p.shape
+        top = self._levels[0]
+        top.p.fill(0)
+        top.p[1:ny - 1, 1:nx - 1] = p[1:-1, 1:-1]
+        top.p[top.fixed] = 0
+        top.f.fill(0)
+        top.f[:ny, :nx] = div
+
+        self.converged = False
+        self.iterations = 0
+        self.residual = residual_norm(top.p[:ny, :nx], div, obstacle, dx)
+        while self.residual > self.tol and self.iterations < self.max_iter:
+            self._vcycle(0, top.p, top.f)
+            self.iterations += 1
+            self.residual = residual_norm(top.p[:ny, :nx], div, obstacle, dx)
+        self.converged = self.residual <= self.tol
+
+        p[1:-1, 1:-1] = top.p[1:ny - 1, 1:nx - 1]
+        p[0, :] = 0
+        p[-1, :] = 0
+        p[:, 0] = 0
+        p[:, -1] = 0
+        return p
+
+
+def _dst1(x: np.ndarray, axis: int) -> np.ndarray:
+    """Unnormalized type-I discrete sine transform along one axis"""
+    n = x.shape[axis]
+    x = np.moveaxis(x, axis, -1)
+    ext = np.zeros(x.shape[:-1] + (2 * (n + 1),))
+    ext[..., 1:n + 1] = x
+    ext[..., n + 2:] = -x[..., ::-1]
+    y = -np.fft.rfft(ext, axis=-1).imag[..., 1:n + 1]
+    return np.moveaxis(y, -1, axis)
+
+
+class FFTSolver(PressureSolver):
+    """Direct spectral solver (type-I sine transform) for obstacle-free domains.
+
+    The sine basis matches the zero-pressure walls exactly. Domains with
+    obstacles are handed to ``fallback`` (multigrid by default).
+    """
+    name = "fft"
+
+    def __init__(self, tol: float = 1e-6, max_iter: int = 50,
+                 fallback: Optional[PressureSolver] = None):
+        super().__init__(tol, max_iter)
+        self.fallback = fallback if fallback is not None else MultigridSolver(tol, max_iter)
+        self._eig = None
+        self._key = None
+
+    def _eigenvalues(self, shape: tuple, dx: float) -> np.ndarray:
+        if self._key != (shape, dx):
+            m, n = shape[0] - 2, shape[1] - 2
+            ky = 2 * np.cos(np.pi * np.arange(1, m + 1) / (m + 1)) - 2
+            kx = 2 * np.cos(np.pi * np.arange(1, n + 1) / (n + 1)) - 2
+            self._eig = (ky[:, None] + kx[None, :]) / dx**2
+            self._key = (shape, dx)
+        return self._eig
+
+    def solve(self, p, div, obstacle, dx):
+        if obstacle.any():
+            self.fallback.solve(p, div, obstacle, dx)
+            self.iterations = self.fallback.iterations
+            self.residual = self.fallback.residual
+            self.converged = self.fallback.converged
+            return p
+
+        ny, nx = p.shape
+        eig = self._eigenvalues(p.shape, dx)
+        f = div[1:-1, 1:-1]
+        coef = _dst1(_dst1(f, 0), 1) / eig
+        p[1:-1, 1:-1] = _dst1(_dst1(coef, 0), 1) / (4 * (ny - 1) * (nx - 1))
+        p[0, :] = 0
+        p[-1, :] = 0
+        p[:, 0] = 0
+        p[:, -1] = 0
+        self.iterations = 1
+        self.residual = residual_norm(p, div, obstacle, dx)
+        self.converged = self.residual <= self.tol
+        return p
+
+
+class CGSolver(PressureSolver):
+    """Preconditioned conjugate gradient on a sparse Laplacian of the fluid cells.
+
+    The matrix is rebuilt only when the obstacle mask changes. The default
+    preconditioner is one multigrid V-cycle; pass ``preconditioner=None``
+    for plain CG. Requires scipy.
+    """
+    name = "cg"
+
+    def __init__(self, tol: float = 1e-6, max_iter: int = 500,
+                 preconditioner: Optional[str] = "multigrid"):
+        super().__init__(tol, max_iter)
+        self._sparse = _load_sparse()
+        if self._sparse is None:
+            raise ImportError("scipy is required for the 'cg' pressure solver")
+        if preconditioner not in (None, "multigrid"):
+            raise ValueError(f"Unknown preconditioner: {preconditioner}")
+        self._mg = MultigridSolver(pre_smooth=1, post_smooth=1) if preconditioner else None
+        self._key = None
+        self._matrix = None
+        self._cells = None
+
+    def _build(self, obstacle: np.ndarray, dx: float) -> None:
+        key = (obstacle.shape, dx, np.packbits(obstacle).tobytes())
+        if key == self._key:
+            return
+        ny, nx = obstacle.shape
+        free = np.zeros(obstacle.shape, dtype=bool)
+        free[1:-1, 1:-1] = ~obstacle[1:-1, 1:-1]
+        index = np.full(obstacle.shape, -1)
+        cells = np.flatnonzero(free)
+        index.flat[cells] = np.arange(cells.size)
+
+        # A = -lap * dx**2, symmetric positive definite on the fluid cells
+        rows = [np.arange(cells.size)]
+        cols = [np.arange(cells.size)]
+        vals = [np.full(cells.size, 4.0)]
+        ci, cj = np.unravel_index(cells, obstacle.shape)
+        for di, dj in ((-1, 0), (1, 0), (0, -1), (0, 1)):
+            nb = index[ci + di, cj + dj]
+            ok = nb >= 0
+            rows.append(np.flatnonzero(ok))
+            cols.append(nb[ok])
+            vals.append(np.full(ok.sum(), -1.0))
+        self._matrix = self._sparse.csr_matrix(
+            (np.concatenate(vals), (np.concatenate(rows), np.concatenate(cols))),
+            shape=(cells.size, cells.size),
+        )
+        self._cells = cells
+        self._key = key
+
+    def _apply_preconditioner(self, r: np.ndarray, shape: tuple, obstacle: np.ndarray, dx: float) -> np.ndarray:
+        if self._mg is None:
+            return r.copy()
+        grid = np.zeros(shape)
+        grid.flat[self._cells] = -r / dx**2
+        return self._mg.precondition(grid, obstacle, dx).ravel()[self._cells]
+
+    def solve(self, p, div, obstacle, dx):
+        self._build(obstacle, dx)
+        A, cells = self._matrix, self._cells
+        b = -div.ravel()[cells] * dx**2
+        x = p.ravel()[cells].astype(float)
+        b_norm = np.linalg.norm(b)
+        b_norm = b_norm if b_norm > 0 else 1.0
+
+        r = b - A @ x
+        z = self._apply_preconditioner(r, p.shape, obstacle, dx)
+        d = z.copy()
+        rz = r @ z
+        self.converged = False
+        self.iterations = 0
+        self.residual = np.linalg.norm(r) / b_norm
+        while self.residual > self.tol and self.iterations < self.max_iter:
+            Ad = A @ d
+            alpha = rz / (d @ Ad)
+            x += alpha * d
+            r -= alpha * Ad
+            self.iterations += 1
+            self.residual = np.linalg.norm(r) / b_norm
+            if self.residual <= self.tol:
+                break
+            z = self._apply_preconditioner(r, p.shape, obstacle, dx)
+            rz_new = r @ z
+            d *= rz_new / rz
+            d += z
+            rz = rz_new
+        self.converged = self.residual <= self.tol
+        self.residual = float(self.residual)
+
+        p.fill(0)
+        p.flat[cells] = x
+        return p
+
+
+PRESSURE_SOLVERS = {
+    JacobiSolver.name: JacobiSolver,
+    SORSolver.name: SORSolver,
+    MultigridSolver.name: MultigridSolver,
+    FFTSolver.name: FFTSolver,
+    CGSolver.name: CGSolver,
+}
+
+
+def make_pressure_solver(solver: Union[str, PressureSolver], **kwargs) -> PressureSolver:
+    """Build a pressure solver from its name, or pass an instance through"""
+    if isinstance(solver, PressureSolver):
+        return solver
+    try:
+        cls = PRESSURE_SOLVERS[solver]
+    except KeyError:
+        raise ValueError(f"Unknown pressure solver: {solver}") from None
+    return cls(**kwargs)
+
+
+def helmholtz_residual(x: np.ndarray, b: np.ndarray, fixed: np.ndarray, k: float,
+                       out: Optional[np.ndarray] = None) -> np.ndarray:
+    """Residual b - (x - k * dx**2 * lap(x)) on interior free cells, zero elsewhere"""
+    r = np.empty_like(x) if out is None else out
+    inner = r[1:-1, 1:-1]
+    np.add(x[1:-1, 2:], x[1:-1, :-2], out=inner)
+    inner += x[2:, 1:-1]
+    inner += x[:-2, 1:-1]
+    inner *= k
+    inner -= (1 + 4 * k) * x[1:-1, 1:-1]
+    inner += b[1:-1, 1:-1]
+    _zero_fixed(r, fixed)
+    return r
+
+
+class DiffusionSolver:
+    """Base class for solvers of the implicit diffusion system (1 - k * dx**2 * lap) x = b.
+
+    ``k`` is nu * dt / dx**2 (times theta for Crank-Nicolson). The border
+    and the ``fixed`` cells keep the values ``x`` comes in with; ``solve``
+    works in place with ``x`` as the initial guess and records
+    ``iterations``, ``residual`` (relative L2) and ``converged`` like
+    PressureSolver.
+    """
+    name = "base"
+
+    def __init__(self, tol: float = 1e-6, max_iter: int = 200):
+        self.tol = tol
+        self.max_iter = max_iter
+        self.iterations = 0
+        self.residual = 0.0
+        self.converged = False
+        self._r = None
+
+    def _buffers(self, x: np.ndarray) -> None:
+        if self._r is None or self._r.shape != x.shape:
+            self._r = np.empty_like(x)
+
+    def _b_norm(self, b: np.ndarray, fixed: np.ndarray) -> float:
+        np.copyto(self._r, b)
+        _zero_fixed(self._r, fixed)
+        norm = np.linalg.norm(self._r)
+        return norm if norm > 0 else 1.0
+
+    def solve(self, x: np.ndarray, b: np.ndarray, fixed: np.ndarray, k: float) -> np.ndarray:
+        raise NotImplementedError
+
+
+class JacobiDiffusionSolver(DiffusionSolver):
+    """Jacobi iteration; the system is diagonally dominant, so it always converges.
+
+    The residual comes for free: on free cells it is (1 + 4k) times the
+    change of the last sweep.
+    """
+    name = "jacobi"
+
+    def __init__(self, tol: float = 1e-6, max_iter: int = 200):
+        super().__init__(tol, max_iter)
+        self._buf = None
+        self._rhs = None
+
+    def solve(self, x, b, fixed, k):
+        self._buffers(x)
+        if self._buf is None or self._buf.shape != x.shape:
+            self._buf = np.empty_like(x)
+            self._rhs = np.empty_like(x[1:-1, 1:-1])
+        b_norm = self._b_norm(b, fixed)
+        src, dst, r = x, self._buf, self._r
+        np.copyto(dst, src)
+        np.negative(b[1:-1, 1:-1], out=self._rhs)
+        diag = 1 + 4 * k
+        self.converged = False
+        iteration = 0
+        for iteration in range(self.max_iter):
+            _jacobi_sweep(src, dst, self._rhs, 1 / diag, k, fixed, src)
+            src, dst = dst, src
+            np.subtract(src, dst, out=r)
+            self.residual = float(diag * np.linalg.norm(r) / b_norm)
+            if self.residual < self.tol:
+                self.converged = True
+                break
+        if src is not x:
+            np.copyto(x, src)
+        self.iterations = iteration + 1
+        return x
+
+
+class RedBlackDiffusionSolver(DiffusionSolver):
+    """Red-black Gauss-Seidel, about half the sweeps of Jacobi"""
+    name = "rbgs"
+
+    def __init__(self, tol: float = 1e-6, max_iter: int = 200):
+        super().__init__(tol, max_iter)
+        self._key = None
+        self._colors = None
+
+    def _build(self, fixed: np.ndarray) -> None:
+        key = (fixed.shape, np.packbits(fixed).tobytes())
+        if key != self._key:
+            self._colors = _red_black_colors(fixed)
+            self._key = key
+
+    def solve(self, x, b, fixed, k):
+        self._buffers(x)
+        self._build(fixed)
+        b_norm = self._b_norm(b, fixed)
+        diag = 1 + 4 * k
+        self.converged = False
+        self.iterations = 0
+        while self.iterations < self.max_iter:
+            for color in self._colors:
+                upd = (x[:-2, 1:-1] + x[2:, 1:-1] + x[1:-1, :-2] + x[1:-1, 2:]) * k
+                upd += b[1:-1, 1:-1]
+                upd /= diag
+                np.copyto(x[1:-1, 1:-1], upd, where=color)
+            self.iterations += 1
+            self.residual = float(np.linalg.norm(helmholtz_residual(x, b, fixed, k, out=self._r)) / b_norm)
+            if self.residual < self.tol:
+                self.converged = True
+                break
+        return x
+
+
+class CGDiffusionSolver(DiffusionSolver):
+    """Matrix-free conjugate gradient; the system is symmetric positive definite.
+
+    The diagonal is constant, so Jacobi preconditioning would not help.
+    Needs no scipy.
+    """
+    name = "cg"
+
+    def __init__(self, tol: float = 1e-6, max_iter: int = 200):
+        super().__init__(tol, max_iter)
+        self._d = None
+        self._ad = None
+
+    def _apply(self, d: np.ndarray, fixed: np.ndarray, k: float) -> np.ndarray:
+        """A d for a direction that is zero on the border and fixed cells"""
+        ad = self._ad
+        inner = ad[1:-1, 1:-1]
+        np.add(d[1:-1, 2:], d[1:-1, :-2], out=inner)
+        inner += d[2:, 1:-1]
+        inner += d[:-2, 1:-1]
+        inner *= -k
+        inner += (1 + 4 * k) * d[1:-1, 1:-1]
+        _zero_fixed(ad, fixed)
+        return ad
+
+    def solve(self, x, b, fixed, k):
+        self._buffers(x)
+        if self._d is None or self._d.shape != x.shape:
+            self._d = np.empty_like(x)
+            self._ad = np.empty_like(x)
+        b_norm = self._b_norm(b, fixed)
+        r = helmholtz_residual(x, b, fixed, k, out=self._r)
+        d = self._d
+        np.copyto(d, r)
+        rr = float(np.vdot(r, r))
+        self.converged = False
+        self.iterations = 0
+        self.residual = rr**0.5 / b_norm
+        while self.residual > self.tol and self.iterations < self.max_iter:
+            ad = self._apply(d, fixed, k)
+            alpha = rr / float(np.vdot(d, ad))
+            x += alpha * d
+            r -= alpha * ad
+            rr_new = float(np.vdot(r, r))
+            self.iterations += 1
+            self.residual = rr_new**0.5 / b_norm
+            d *= rr_new / rr
+            d += r
+            rr = rr_new
+        self.converged = self.residual <= self.tol
+        return x
+
+
+DIFFUSION_SOLVERS = {
+    JacobiDiffusionSolver.name: JacobiDiffusionSolver,
+    RedBlackDiffusionSolver.name: RedBlackDiffusionSolver,
+    CGDiffusionSolver.name: CGDiffusionSolver,
+}
+
+
+def make_diffusion_solver(solver: Union[str, DiffusionSolver], **kwargs) -> DiffusionSolver:
+    """Build an implicit diffusion solver from its name, or pass an instance through"""
+    if isinstance(solver, DiffusionSolver):
+        return solver
+    try:
+        cls = DIFFUSION_SOLVERS[solver]
+    except KeyError:
+        raise ValueError(f"Unknown diffusion solver: {solver}") from None
+    return cls(**kwargs)
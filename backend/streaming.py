@@ -0,0 +1,405 @@
+import argparse
+import asyncio
+import json
+import struct
+import threading
+import time
+import zlib
+from dataclasses import dataclass, field
+from typing import Optional
+
+import numpy as np
+
+from .background import Snapshot
+
+# Wire format: every message is
+#   [0, 8)      header and payload lengths, big-endian uint32 each
+#   header      UTF-8 JSON object with a "type" key
+#   payload     raw bytes, possibly empty
+# Message types:
+#   hello       {field, dtype, shape, fps}, first message on every connection
+#   obstacle    {shape}, payload zlib(packbits(mask)); on connect and on change
+#   frame       {seq, key, shape, step_count, time, low, high, stats}, payload
+#               zlib(codes) for key frames, zlib(codes XOR previous codes)
+#               otherwise. Codes are uint8 mapped linearly onto [low, high],
+#               or little-endian float16 bit patterns
+#   error       {reason}, the server closes the connection after it
+
+FIELDS = {
+    'speed': lambda view: view.get_velocity_magnitude(),
+    'pressure': lambda view: view.get_pressure(),
+    'vorticity': lambda view: view.get_vorticity(),
+}
+CODE_DTYPES = {'uint8': np.dtype(np.uint8), 'float16': np.dtype('<u2')}
+_LENGTHS = struct.Struct('>II')
+
+
+def encode_message(header: dict, payload: bytes = b"") -> bytes:
+    blob = json.dumps(header).encode()
+    return _LENGTHS.pack(len(blob), len(payload)) + blob + payload
+
+
+async def read_message(reader: asyncio.StreamReader) -> tuple[dict, bytes]:
+    n_header, n_payload = _LENGTHS.unpack(await reader.readexactly(_LENGTHS.size))
+    header = json.loads(await reader.readexactly(n_header))
+    return header, await reader.readexactly(n_payload)
+
+
+def _plain(stats: dict) -> dict:
+    return {k: (v.item() if isinstance(v, np.generic) else v) for k, v in stats.items()}
+
+
+class FrameEncoder:
+    """Quantizes one field per frame and XORs the codes with the previous frame's.
+
+    uint8 codes span a sticky [low, high] range that only changes when the
+    data leaves it or shrinks to under a quarter of it, so unchanged cells
+    keep their codes and XOR to zero. float16 codes need no range.
+    """
+
+    def __init__(self, dtype: str = "uint8"):
+        if dtype not in CODE_DTYPES:
+            raise ValueError(f"Unknown frame dtype: {dtype}")
+        self.dtype = dtype
+        self.low = self.high = None
+        self.codes: Optional[np.ndarray] = None
+
+    def quantize(self, data: np.ndarray) -> np.ndarray:
+        if self.dtype == "float16":
+            return data.astype(np.float16).view(np.uint16).astype(CODE_DTYPES['float16'])
+        lo, hi = float(data.min()), float(data.max())
+        if self.low is None or lo < self.low or hi > self.high or hi - lo < 0.25 * (self.high - self.low):
+            pad = 0.05 * (hi - lo) if hi > lo else 0.05 * max(abs(hi), 1.0)
+            self.low, self.high = lo - pad, hi + pad
+        scaled = (data - self.low) * (255 / (self.high - self.low))
+        return np.clip(np.rint(scaled), 0, 255).astype(np.uint8)
+
+    def encode(self, data: np.ndarray) -> tuple[np.ndarray, Optional[np.ndarray]]:
+        """New codes and their XOR with the previous ones (None for the first frame)"""
+        codes = self.quantize(data)
+        delta = None if self.codes is None else np.bitwise_xor(codes, self.codes)
+        self.codes = codes
+        return codes, delta
+
+
+def dequantize(codes: np.ndarray, dtype: str, low: Optional[float], high: Optional[float]) -> np.ndarray:
+    if dtype == "float16":
+        return codes.astype(np.uint16).view(np.float16).astype(np.float32)
+    return (low + codes.astype(np.float32) * ((high - low) / 255)).astype(np.float32)
+
+
+class _Frame:
+    """One encoded frame shared by every client; the key frame is built on first demand"""
+
+    def __init__(self, header: dict, codes: np.ndarray, delta: Optional[np.ndarray], level: int):
+        self.header = header
+        self.codes = codes
+        self.level = level
+        self.delta_message = None
+        if delta is not None:
+            self.delta_message = encode_message({**header, 'key': False}, zlib.compress(delta.tobytes(), level))
+        self._key_message = None
+
+    def key_message(self) -> bytes:
+        if self._key_message is None:
+            self._key_message = encode_message({**self.header, 'key': True},
+                                               zlib.compress(self.codes.tobytes(), self.level))
+        return self._key_message
+
+
+@dataclass(eq=False)
+class _Client:
+    writer: asyncio.StreamWriter
+    ready: asyncio.Event = field(default_factory=asyncio.Event)
+    pending: Optional[bytes] = None
+    needs_key: bool = True
+    obstacle: Optional[np.ndarray] = None  # Last mask queued for this client
+    sent: int = 0
+    dropped: int = 0
+
+
+class StreamServer:
+    """Streams quantized, delta-encoded frames of one field of a running simulation over TCP.
+
+    Frames come from polling ``source.latest()`` (a BackgroundSimulation)
+    at ``fps``, or from ``publish(view)`` calls in the step loop, which are
+    thread-safe, rate limited to ``fps`` and cost one Snapshot copy. Each
+    frame is encoded once, whatever the number of clients (at most
+    ``max_clients``). A client still writing its previous frame when the
+    next one arrives has the unsent frame replaced by a key frame, so slow
+    viewers skip frames instead of holding up the step loop or each other.
+    """
+
+    def __init__(self, source=None, host: str = "127.0.0.1", port: int = 0, field: str = "speed",
+                 dtype: str = "uint8", fps: float = 30.0, max_clients: int = 8, level: int = 1,
+                 write_buffer: int = 1 << 16):
+        if field not in FIELDS:
+            raise ValueError(f"Unknown stream field: {field}")
+        self.source = source
+        self.host, self.port = host, port
+        self.field = field
+        self.encoder = FrameEncoder(dtype)
+        self.fps = fps
+        self.max_clients = max_clients
+        self.level = level
+        self.write_buffer = write_buffer
+        self.frames = 0
+        self.frame_bytes = 0  # Compressed delta (or first key) payload bytes encoded so far
+        self.dropped = 0
+        self._clients: set = set()
+        self._frame: Optional[_Frame] = None
+        self._obstacle: Optional[np.ndarray] = None
+        self._obstacle_message = b""
+        self._version = None
+        self._last_publish = 0.0
+        self._server = None
+        self._tasks: set = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def clients(self) -> int:
+        return len(self._clients)
+
+    async def start(self) -> "StreamServer":
+        self._loop = asyncio.get_running_loop()
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        if self.source is not None:
+            self._spawn(self._poll())
+        return self
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+        for client in list(self._clients):
+            client.writer.close()
+            client.ready.set()
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        if self._server is not None:
+            await self._server.wait_closed()
+            self._server = None
+
+    def start_in_thread(self) -> "StreamServer":
+        """Run the server on its own event loop thread; returns once it listens"""
+        started = threading.Event()
+        errors = []
+
+        def run():
+            loop = asyncio.new_event_loop()
+            try:
+                loop.run_until_complete(self.start())
+            except BaseException as exc:  # re-raised by start_in_thread
+                errors.append(exc)
+                started.set()
+                loop.close()
+                return
+            started.set()
+            loop.run_forever()
+            loop.run_until_complete(self.close())
+            loop.close()
+
+        self._thread = threading.Thread(target=run, name="stream-server", daemon=True)
+        self._thread.start()
+        started.wait()
+        if errors:
+            raise errors[0]
+        return self
+
+    def stop(self) -> None:
+        """Stop a server started with start_in_thread"""
+        if self._thread is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._thread = None
+
+    def publish(self, view, force: bool = False) -> bool:
+        """Queue a frame of ``view`` (a simulator or Snapshot) from any thread; False when rate limited"""
+        now = time.perf_counter()
+        if self._loop is None or (not force and now - self._last_publish < 1 / self.fps):
+            return False
+        self._last_publish = now
+        if not isinstance(view, Snapshot):
+            view = Snapshot.capture(view)
+        self._loop.call_soon_threadsafe(self._on_snapshot, view)
+        return True
+
+    def _spawn(self, coro) -> asyncio.Task:
+        task = asyncio.ensure_future(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def _poll(self) -> None:
+        while True:
+            self._on_snapshot(self.source.latest())
+            await asyncio.sleep(1 / self.fps)
+
+    def _on_snapshot(self, view: Snapshot) -> None:
+        if view.version == self._version:
+            return  # Nothing new to show
+        self._version = view.version
+        if view.obstacle is not self._obstacle:
+            self._obstacle = view.obstacle
+            self._obstacle_message = encode_message(
+                {'type': 'obstacle', 'shape': list(view.obstacle.shape)},
+                zlib.compress(np.packbits(view.obstacle).tobytes(), self.level))
+
+        data = np.asarray(FIELDS[self.field](view))
+        codes, delta = self.encoder.encode(data)
+        header = {'type': 'frame', 'seq': self.frames, 'shape': list(codes.shape),
+                  'step_count': int(view.step_count),
+                  'time': float(view.time), 'low': self.encoder.low, 'high': self.encoder.high,
+                  'stats': _plain(view.get_statistics())}
+        self._frame = _Frame(header, codes, delta, self.level)
+        self.frames += 1
+        self.frame_bytes += len(self._frame.delta_message or self._frame.key_message())
+        for client in self._clients:
+            self._offer(client)
+
+    def _offer(self, client: _Client) -> None:
+        frame = self._frame
+        if client.pending is not None:
+            # The unsent frame leaves a gap in this client's delta chain
+            client.dropped += 1
+            self.dropped += 1
+            client.needs_key = True
+            client.obstacle = None
+        message = frame.key_message() if client.needs_key or frame.delta_message is None else frame.delta_message
+        if client.obstacle is not self._obstacle:
+            message = self._obstacle_message + message
+            client.obstacle = self._obstacle
+        client.pending = message
+        client.needs_key = False
+        client.ready.set()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        if len(self._clients) >= self.max_clients:
+            writer.write(encode_message({'type': 'error', 'reason': 'server full'}))
+            await writer.drain()
+            writer.close()
+            return
+        writer.transport.set_write_buffer_limits(high=self.write_buffer)
+        client = _Client(writer)
+        shape = None if self._frame is None else list(self._frame.codes.shape)
+        writer.write(encode_message({'type': 'hello', 'field': self.field, 'dtype': self.encoder.dtype,
+                                     'shape': shape, 'fps': self.fps}))
+        self._clients.add(client)
+        if self._frame is not None:
+            self._offer(client)
+        watcher = self._spawn(self._watch(reader, client))
+        try:
+            while not writer.is_closing():
+                await client.ready.wait()
+                client.ready.clear()
+                message, client.pending = client.pending, None
+                if message:
+                    writer.write(message)
+                    await writer.drain()
+                    client.sent += 1
+        except ConnectionError:
+            pass
+        finally:
+            self._clients.discard(client)
+            watcher.cancel()
+            writer.close()
+
+    async def _watch(self, reader: asyncio.StreamReader, client: _Client) -> None:
+        """Close the connection once the client hangs up; clients send nothing"""
+        await reader.read()
+        client.writer.close()
+        client.ready.set()
+
+
+@dataclass
+class Frame:
+    """A decoded frame as received by StreamClient"""
+    seq: int
+    key: bool
+    step_count: int
+    time: float
+    data: np.ndarray
+    stats: dict
+    nbytes: int  # Bytes on the wire, headers included
+
+
+class StreamClient:
+    """Asyncio client of a StreamServer, keeping the decoded field and obstacle mask"""
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, info: dict):
+        self.reader, self.writer = reader, writer
+        self.info = info
+        self.obstacle: Optional[np.ndarray] = None
+        self.bytes_received = 0
+        self._codes: Optional[np.ndarray] = None
+
+    @classmethod
+    async def connect(cls, host: str, port: int) -> "StreamClient":
+        reader, writer = await asyncio.open_connection(host, port)
+        header, _ = await read_message(reader)
+        if header['type'] == 'error':
+            writer.close()
+            raise ConnectionRefusedError(header['reason'])
+        return cls(reader, writer, header)
+
+    async def receive(self) -> Frame:
+        """The next frame; obstacle updates in between are applied to ``obstacle``"""
+        nbytes = 0
+        while True:
+            header, payload = await read_message(self.reader)
+            nbytes += _LENGTHS.size + len(json.dumps(header)) + len(payload)
+            if header['type'] == 'obstacle':
+                shape = tuple(header['shape'])
+                bits = np.frombuffer(zlib.decompress(payload), dtype=np.uint8)
+                self.obstacle = np.unpackbits(bits, count=shape[0] * shape[1]).reshape(shape).astype(bool)
+                continue
+            if header['type'] != 'frame':
+                raise ConnectionError(header.get('reason', f"unexpected {header['type']} message"))
+            break
+        self.bytes_received += nbytes
+        dtype = self.info['dtype']
+        codes = np.frombuffer(zlib.decompress(payload), dtype=CODE_DTYPES[dtype]).reshape(header['shape'])
+        if not header['key']:
+            if self._codes is None:
+                raise ConnectionError("delta frame before any key frame")
+            codes = np.bitwise_xor(codes, self._codes)
+        self._codes = codes
+        data = dequantize(self._codes, dtype, header['low'], header['high'])
+        return Frame(header['seq'], header['key'], header['step_count'], header['time'],
+                     data, header['stats'], nbytes)
+
+    async def close(self) -> None:
+        self.writer.close()
+        try:
+            await self.writer.wait_closed()
+        except ConnectionError:
+            pass
+
+
+async def _watch_stream(host: str, port: int, frames: int) -> None:
+    client = await StreamClient.connect(host, port)
+    print(f"connected: {client.info}")
+    try:
+        for _ in range(frames):
+            frame = await client.receive()
+            print(f"#{frame.seq:<6} step {frame.step_count:<7} t={frame.time:<9.3f} "
+                  f"{'key' if frame.key else 'delta':<5} {frame.nbytes:>9} B  "
+                  f"max {float(frame.data.max()):.3f}")
+    finally:
+        await client.close()
+
+
+def main(argv=None) -> None:
+    """Stand-in viewer: ``python -m backend.streaming HOST:PORT`` prints what arrives"""
+    parser = argparse.ArgumentParser(description="Print the frames of a StreamServer")
+    parser.add_argument("address", help="HOST:PORT")
+    parser.add_argument("--frames", type=int, default=100)
+    args = parser.parse_args(argv)
+    host, port = args.address.rsplit(":", 1)
+    asyncio.run(_watch_stream(host, int(port), args.frames))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+import itertools
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from multiprocessing import shared_memory
+from typing import Callable, Optional, Sequence
+
+import numpy as np
+
+from .simulation import FluidSimulator
+
+# Obstacle presets placed relative to the grid so they work at any resolution
+OBSTACLE_PRESETS: dict[str, Callable[[FluidSimulator], Optional[np.ndarray]]] = {
+    'none': lambda sim: None,
+    'circle': lambda sim: sim.create_circle_obstacle(sim.nx // 4, sim.ny // 2, max(sim.ny // 8, 1)),
+    'rectangle': lambda sim: sim.create_rectangle_obstacle(
+        sim.nx // 4, sim.ny // 2 - sim.ny // 10, sim.nx // 4 + sim.ny // 8, sim.ny // 2 + sim.ny // 10),
+    'semicircle': lambda sim: sim.create_semicircle_obstacle(sim.nx // 4, sim.ny // 2, max(sim.ny // 8, 1)),
+    'triangle': lambda sim: sim.create_triangle_obstacle(sim.nx // 4, sim.ny // 2, max(sim.ny // 4, 2)),
+}
+
+FIELDS = ('u', 'v', 'p')
+
+
+@dataclass(frozen=True)
+class SweepCase:
+    """One point of the parameter grid"""
+    viscosity: float
+    u_in: float
+    obstacle: str = 'none'
+
+
+@dataclass
+class SweepResult:
+    """Outcome of a sweep, ``stats[k]`` and ``fields[k]`` belong to ``cases[k]``"""
+    cases: list
+    stats: list
+    steps: list
+    fields: Optional[np.ndarray] = None  # (n_cases, 3, ny, nx) final u, v, p
+    wall_time: float = 0.0
+    workers: int = 1
+    case_times: list = field(default_factory=list)
+
+
+def parameter_grid(viscosities: Sequence[float], u_ins: Sequence[float],
+                   obstacles: Sequence[str] = ('none',)) -> list:
+    """Cartesian product viscosity x u_in x obstacle preset"""
+    for name in obstacles:
+        if name not in OBSTACLE_PRESETS:
+            raise ValueError(f"Unknown obstacle preset: {name}")
+    return [SweepCase(float(nu), float(u), name)
+            for nu, u, name in itertools.product(viscosities, u_ins, obstacles)]
+
+
+def run_case(case: SweepCase, nx: int, ny: int, steps: int, sim_kwargs: dict,
+             steady_tol: Optional[float] = None, check_every: int = 10,
+             stats_every: int = 1, shm_name: Optional[str] = None, slot: int = 0) -> tuple:
+    """Run one case; final fields go to shared memory block ``shm_name`` at ``slot``"""
+    start = time.perf_counter()
+    with FluidSimulator(nx, ny, viscosity=case.viscosity, u_in=case.u_in, **sim_kwargs) as sim:
+        mask = OBSTACLE_PRESETS[case.obstacle](sim)
+        if mask is not None:
+            sim.set_obstacle(mask)
+
+        series = []
+        u_prev = v_prev = None
+        for n in range(1, steps + 1):
+            sim.step()
+            if n % stats_every == 0:
+                series.append({k: (float(v) if isinstance(v, (np.floating, np.integer)) else v)
+                               for k, v in sim.get_statistics().items()})
+            if steady_tol is not None and n % check_every == 0:
+                if u_prev is not None:
+                    change = max(np.max(np.abs(sim.u - u_prev)), np.max(np.abs(sim.v - v_prev)))
+                    scale = max(float(np.max(np.abs(sim.u))), float(np.max(np.abs(sim.v))), 1e-12)
+                    if change / scale < steady_tol:
+                        break
+                u_prev, v_prev = sim.u.copy(), sim.v.copy()
+
+        if shm_name is not None:
+            shm = shared_memory.SharedMemory(name=shm_name)
+            try:
+                out = np.ndarray((len(FIELDS), ny, nx), dtype=np.float64, buffer=shm.buf,
+                                 offset=slot * len(FIELDS) * ny * nx * 8)
+                out[0] = sim.u
+                out[1] = sim.v
+                out[2] = sim.p
+                del out
+            finally:
+                shm.close()
+        return series, sim.step_count, time.perf_counter() - start
+
+
+def run_sweep(cases: Sequence[SweepCase], nx: int, ny: int, steps: int,
+              steady_tol: Optional[float] = None, check_every: int = 10,
+              stats_every: int = 1, keep_fields: bool = False,
+              max_workers: Optional[int] = None, **sim_kwargs) -> SweepResult:
+    """Run every case on a process pool for ``steps`` steps or until steady.
+
+    ``sim_kwargs`` are passed on to FluidSimulator (dt, dx, pressure_solver,
+    ...). With ``keep_fields`` workers write the final u, v and p straight
+    into one shared memory block instead of pickling them back.
+    """
+    cases = list(cases)
+    workers = max_workers or os.cpu_count() or 1
+    block = len(FIELDS) * ny * nx * 8
+    shm = shared_memory.SharedMemory(create=True, size=max(block * len(cases), 1)) if keep_fields else None
+
+    stats = [None] * len(cases)
+    counts = [0] * len(cases)
+    case_times = [0.0] * len(cases)
+    start = time.perf_counter()
+    try:
+        # spawn, not fork: forking a parent that already runs thread pools
+        # (strip threads, numba) can deadlock the workers
+        with ProcessPoolExecutor(max_workers=workers,
+                                 mp_context=multiprocessing.get_context('spawn')) as pool:
+            futures = {
+                pool.submit(run_case, case, nx, ny, steps, sim_kwargs, steady_tol, check_every,
+                            stats_every, shm.name if shm else None, k): k
+                for k, case in enumerate(cases)
+            }
+            for future in as_completed(futures):
+                k = futures[future]
+                stats[k], counts[k], case_times[k] = future.result()
+        fields = None
+        if shm is not None:
+            fields = np.ndarray((len(cases), len(FIELDS), ny, nx), dtype=np.float64, buffer=shm.buf).copy()
+    finally:
+        if shm is not None:
+            shm.close()
+            shm.unlink()
+    return SweepResult(cases, stats, counts, fields, time.perf_counter() - start, workers, case_times)
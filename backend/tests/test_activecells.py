@@ -0,0 +1,77 @@
+import numpy as np
+from backend.activecells import ActiveCells
+from backend.simulation import FluidSimulator
+from backend.solvers import JacobiSolver
+
+def _mask(ny=40, nx=56):
+    mask = np.zeros((ny, nx), dtype=bool)
+    mask[5:33, 10:34] = True
+    mask[2, 50] = True
+    return mask
+
+def test_index_sets():
+    mask = _mask()
+    active = ActiveCells(mask, block=8)
+    assert np.array_equal(active.solid, np.flatnonzero(mask))
+    surface = np.zeros_like(mask)
+    surface.flat[active.surface] = True
+    assert surface[5, 20] and surface[2, 50] and not surface[15, 20]
+    boundary = np.zeros_like(mask)
+    boundary.flat[active.fluid_boundary] = True
+    assert boundary[4, 20] and boundary[20, 34] and boundary[2, 49] and not boundary[20, 36]
+    assert not (boundary & mask).any()
+
+def test_spans_cover_every_fluid_cell():
+    mask = _mask()
+    active = ActiveCells(mask, block=8)
+    covered = np.zeros_like(mask)
+    for r0, r1, c0, c1 in active.spans:
+        covered[r0:r1, c0:c1] = True
+    assert not (~mask & ~covered).any()
+    assert active.skipped_fraction > 0
+    assert ActiveCells(np.zeros((16, 16), dtype=bool)).spans is None
+
+def test_spans_used_only_above_threshold():
+    mask = np.zeros((256, 256), dtype=bool)
+    mask[96:160, 96:160] = True
+    small = ActiveCells(mask, block=16)
+    assert small.spans is not None and small.skipped_fraction < small.min_skipped
+    assert not small.use_spans
+    mask[32:224, 32:224] = True
+    assert ActiveCells(mask, block=16).use_spans
+    assert not ActiveCells(mask[::2, ::2], block=8).use_spans
+
+def test_jacobi_with_active_cells_matches_dense_path():
+    mask = _mask()
+    div = np.random.default_rng(2).standard_normal(mask.shape)
+    dense, sparse = JacobiSolver(tol=1e-8, max_iter=60), JacobiSolver(tol=1e-8, max_iter=60)
+    sparse.active = ActiveCells(mask, block=8)
+    sparse.active.min_skipped, sparse.active.min_cells = 0.0, 0
+    p_dense = dense.solve(np.zeros(mask.shape), div, mask, 1.0)
+    p_sparse = sparse.solve(np.zeros(mask.shape), div, mask, 1.0)
+    assert np.array_equal(p_dense, p_sparse)
+    assert dense.iterations == sparse.iterations
+
+def test_simulator_keeps_solids_zero():
+    sim = FluidSimulator(nx=56, ny=40)
+    sim.set_obstacle(_mask())
+    for _ in range(3):
+        sim.step()
+    assert sim.pressure_solver.active is sim.active
+    assert not sim.u[sim.obstacle].any() and not sim.v[sim.obstacle].any()
+
+def test_edited_matches_rebuild():
+    rng = np.random.default_rng(4)
+    mask = _mask()
+    active = ActiveCells(mask, block=8)
+    for solid in (True, False, True, False):
+        cells = rng.choice(mask.size, 60, replace=False)
+        cells = np.concatenate((cells, np.ravel_multi_index((np.arange(8, 16), np.arange(8, 16)), mask.shape)))
+        mask = mask.copy()
+        mask.flat[cells] = solid
+        active = active.edited(mask, cells)
+        rebuilt = ActiveCells(mask, block=8)
+        for name in ('solid', 'surface', 'fluid_boundary', 'span_solid'):
+            assert np.array_equal(getattr(active, name), getattr(rebuilt, name)), name
+        assert active.spans == rebuilt.spans and active.box == rebuilt.box
+        assert active._by_index == rebuilt._by_index and not active.mask.flags.writeable
@@ -0,0 +1,50 @@
+import time
+import numpy as np
+import pytest
+from backend.background import BackgroundSimulation
+from backend.simulation import FluidSimulator
+
+def _wait_for(condition, timeout=5.0):
+    deadline = time.perf_counter() + timeout
+    while not condition():
+        if time.perf_counter() > deadline:
+            raise AssertionError("timed out")
+        time.sleep(0.005)
+
+def test_worker_publishes_read_only_snapshots():
+    bg = BackgroundSimulation(FluidSimulator(nx=24, ny=16), publish_interval=0.0, rate_window=0.01).start()
+    try:
+        _wait_for(lambda: bg.latest().step_count >= 5)
+        snap = bg.latest()
+        assert not snap.u.flags.writeable and not snap.obstacle.flags.writeable
+        assert snap.get_statistics()['step_count'] == snap.step_count
+        _wait_for(lambda: bg.latest().steps_per_sec > 0)
+    finally:
+        bg.stop()
+
+def test_commands_apply_while_paused():
+    sim = FluidSimulator(nx=24, ny=16)
+    bg = BackgroundSimulation(sim)
+    bg.paused = True
+    bg.start()
+    try:
+        mask = sim.create_circle_obstacle(8, 8, 3)
+        bg.set_obstacle(mask)
+        bg.set_viscosity(0.05)
+        _wait_for(lambda: bg.latest().obstacle.any())
+        assert np.array_equal(bg.latest().get_obstacle(), mask)
+        assert sim.nu == 0.05 and sim.step_count == 0
+        # A parameter change alone republishes the paused snapshot
+        version = bg.latest().version
+        bg.set_viscosity(0.01)
+        _wait_for(lambda: bg.latest().version > version)
+        assert sim.nu == 0.01 and bg.latest().step_count == 0
+    finally:
+        bg.stop()
+
+def test_stop_reraises_worker_errors():
+    bg = BackgroundSimulation(FluidSimulator(nx=8, ny=8)).start()
+    bg.submit(lambda sim: 1 / 0)
+    _wait_for(lambda: not bg.running)
+    with pytest.raises(ZeroDivisionError):
+        bg.stop()
@@ -0,0 +1,15 @@
+from backend.benchmarks.suite import compare, run_suite
+
+def test_suite_runs_and_flags_regressions():
+    results = run_suite(sizes=[16], fractions=[0.0, 0.25], cases=['laplacian', 'project', 'step'],
+                        min_time=0.0, max_repeat=2, log=lambda *a: None)
+    assert set(results) == {'laplacian/16/0', 'project/16/0', 'step/16/0', 'project/16/0.25', 'step/16/0.25'}
+    assert all(r['cells_per_sec'] > 0 and r['peak_bytes'] >= 0 for r in results.values())
+    assert compare(results, {'results': results}) == []
+
+    faster = {key: dict(r, cells_per_sec=r['cells_per_sec'] * 2) for key, r in results.items()}
+    assert len(compare(results, {'results': faster})) == len(results)
+    bloated = dict(results)
+    bloated['step/16/0'] = dict(results['step/16/0'], peak_bytes=results['step/16/0']['peak_bytes'] + 2**20)
+    failures = compare(bloated, {'results': results})
+    assert len(failures) == 1 and failures[0].startswith("step/16/0: peak")
@@ -0,0 +1,121 @@
+import os
+import threading
+import numpy as np
+import pytest
+from backend.checkpoint import read_header
+from backend.simulation import FluidSimulator
+
+def _running_sim(nx=30, ny=20, steps=5):
+    sim = FluidSimulator(nx=nx, ny=ny)
+    sim.set_obstacle(sim.create_triangle_obstacle(10, 10, 6))
+    for _ in range(steps):
+        sim.step()
+    return sim
+
+def test_restart_continues_bit_for_bit(tmp_path):
+    path = str(tmp_path / "state.ck")
+    sim = _running_sim()
+    sim.save_checkpoint(path)
+    assert os.listdir(tmp_path) == ["state.ck"]
+
+    restored = FluidSimulator(nx=30, ny=20, dt=0.5, viscosity=0.3)
+    restored.load_checkpoint(path)
+    assert restored.step_count == 5 and restored.time == sim.time and restored.nu == sim.nu
+    assert np.array_equal(restored.obstacle, sim.obstacle)
+    for _ in range(3):
+        sim.step()
+        restored.step()
+    assert np.array_equal(restored.u, sim.u)
+    assert np.array_equal(restored.p, sim.p)
+
+def test_load_clears_warm_start_state(tmp_path):
+    path = str(tmp_path / "state.ck")
+    kwargs = dict(nx=30, ny=20, diffusion="backward-euler", pressure_extrapolation=True)
+    sim = FluidSimulator(**kwargs)
+    sim.step()
+    sim.save_checkpoint(path)
+    sim.step()
+    # Steps after the load must not warm-start from the state it replaced
+    sim.load_checkpoint(path)
+    fresh = FluidSimulator(**kwargs)
+    fresh.load_checkpoint(path)
+    for _ in range(2):
+        sim.step()
+        fresh.step()
+    assert np.array_equal(sim.u, fresh.u)
+    assert np.array_equal(sim.p, fresh.p)
+
+def test_float32_checkpoint(tmp_path):
+    sim = _running_sim()
+    full = sim.save_checkpoint(str(tmp_path / "a.ck"))
+    half = sim.save_checkpoint(str(tmp_path / "b.ck"), float32=True)
+    assert half < full and read_header(str(tmp_path / "b.ck"))['dtype'] == '<f4'
+    restored = FluidSimulator(nx=30, ny=20)
+    restored.load_checkpoint(str(tmp_path / "b.ck"))
+    assert restored.u.dtype == np.float64
+    assert np.allclose(restored.u, sim.u, rtol=1e-6, atol=1e-7)
+
+def test_grid_mismatch_and_bad_file(tmp_path):
+    path = str(tmp_path / "state.ck")
+    _running_sim().save_checkpoint(path)
+    with pytest.raises(ValueError):
+        FluidSimulator(nx=31, ny=20).load_checkpoint(path)
+    (tmp_path / "junk").write_bytes(b"not a checkpoint")
+    with pytest.raises(ValueError):
+        FluidSimulator(nx=30, ny=20).load_checkpoint(str(tmp_path / "junk"))
+
+def test_auto_checkpoint(tmp_path):
+    path = str(tmp_path / "auto.ck")
+    sim = FluidSimulator(nx=16, ny=12)
+    auto = sim.enable_auto_checkpoint(path, every=4)
+    for _ in range(10):
+        sim.step()
+    auto.wait()
+    assert auto.written + auto.skipped == 2
+    assert read_header(path)['step_count'] in (4, 8)
+
+def test_mixed_precision_checkpoint(tmp_path):
+    path = str(tmp_path / "mixed.ck")
+    sim = FluidSimulator(nx=20, ny=12, dtype=np.float32, pressure_dtype=np.float64)
+    sim.step()
+    sim.save_checkpoint(path)
+    assert read_header(path)['dtype'] == '<f8'
+    restored = FluidSimulator(nx=20, ny=12, dtype=np.float32, pressure_dtype=np.float64)
+    restored.load_checkpoint(path)
+    assert restored.u.dtype == np.float32 and restored.p.dtype == np.float64
+    assert np.array_equal(restored.u, sim.u) and np.array_equal(restored.p, sim.p)
+
+def test_float32_adaptive_checkpoint(tmp_path):
+    path = str(tmp_path / "adaptive.ck")
+    sim = FluidSimulator(nx=40, ny=20, dtype=np.float32, adaptive=True)
+    for _ in range(5):
+        sim.step()
+    assert type(sim.dt) is float and type(sim.time) is float
+    sim.save_checkpoint(path)
+    restored = FluidSimulator(nx=40, ny=20, dtype=np.float32, adaptive=True)
+    restored.load_checkpoint(path)
+    assert restored.time == sim.time and restored.dt == sim.dt
+    assert np.array_equal(restored.u, sim.u)
+
+def test_concurrent_saves_to_one_path(tmp_path):
+    path = str(tmp_path / "state.ck")
+    sims = [_running_sim(steps=k) for k in (1, 2, 3, 4)]
+    errors = []
+
+    def save(sim):
+        try:
+            sim.save_checkpoint(path)
+        except Exception as exc:
+            errors.append(exc)
+    threads = [threading.Thread(target=save, args=(sim,)) for sim in sims for _ in range(5)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert not errors
+    # Every write was whole: the survivor is one of them, and no temp files remain
+    assert os.listdir(tmp_path) == ["state.ck"]
+    restored = FluidSimulator(nx=30, ny=20)
+    restored.load_checkpoint(path)
+    source = sims[restored.step_count - 1]
+    assert np.array_equal(restored.u, source.u) and np.array_equal(restored.p, source.p)
@@ -0,0 +1,105 @@
+import numpy as np
+import pytest
+from backend.ensemble import FluidEnsemble
+from backend.simulation import FluidSimulator
+from backend.solvers import JacobiSolver
+
+def _members(tol=0.0):
+    params = [(0.02, 1.0, 0.1), (0.05, 0.5, 0.2), (0.01, 2.0, 0.05)]
+    sims = []
+    for k, (nu, u_in, dt) in enumerate(params):
+        # tol=0 runs a fixed iteration count
+        sim = FluidSimulator(nx=14, ny=10, dt=dt, viscosity=nu, u_in=u_in,
+                             pressure_solver=JacobiSolver(tol=tol))
+        mask = np.zeros((10, 14), dtype=bool)
+        mask[3:6, 3 + 2 * k:6 + 2 * k] = True
+        sim.set_obstacle(mask)
+        sims.append(sim)
+    return sims
+
+def test_ensemble_matches_individual_simulators():
+    sims = _members()
+    ens = FluidEnsemble.from_simulators(sims)
+    for _ in range(4):
+        ens.step()
+        for sim in sims:
+            sim.step()
+    for k, sim in enumerate(sims):
+        assert np.allclose(ens.u[k], sim.u, atol=1e-12)
+        assert np.allclose(ens.v[k], sim.v, atol=1e-12)
+        assert np.allclose(ens.p[k], sim.p, atol=1e-12)
+        assert ens.time[k] == sim.time
+
+def test_ensemble_statistics_per_member():
+    sims = _members()
+    ens = FluidEnsemble.from_simulators(sims)
+    ens.step()
+    for sim in sims:
+        sim.step()
+    stats = ens.get_statistics()
+    for key in ('max_speed', 'avg_speed', 'max_pressure', 'mass_flow_in'):
+        assert stats[key].shape == (3,)
+        expected = [sim.get_statistics()[key] for sim in sims]
+        assert np.allclose(stats[key], expected)
+
+def test_broadcast_parameters_and_obstacles():
+    ens = FluidEnsemble(4, nx=12, ny=8, viscosity=[0.01, 0.02, 0.03, 0.04])
+    assert ens.u_in.shape == (4,)
+    mask = np.zeros((8, 12), dtype=bool)
+    mask[2:4, 2:4] = True
+    ens.set_obstacle(mask)
+    assert ens.obstacle.shape == (4, 8, 12)
+    assert ens.obstacle[3, 2, 2]
+    ens.step()
+    assert np.all(ens.u[ens.obstacle] == 0.0)
+    member = ens.to_simulator(2)
+    assert member.nu == 0.03 and np.array_equal(member.u, ens.u[2])
+
+def test_members_converge_independently():
+    sims = _members(tol=1e-4)
+    ens = FluidEnsemble.from_simulators(sims)
+    alone = FluidEnsemble.from_simulators(_members(tol=1e-4)[1:2])
+    for _ in range(3):
+        ens.step()
+        alone.step()
+        iterations = []
+        for sim in sims:
+            sim.step()
+            iterations.append(sim.pressure_iterations)
+        # Each member stops where its standalone solve stops
+        assert list(ens.member_iterations) == iterations
+    assert len(set(iterations)) > 1
+    for k, sim in enumerate(sims):
+        assert np.array_equal(ens.p[k], sim.p) and np.array_equal(ens.u[k], sim.u)
+    assert np.array_equal(alone.p[0], ens.p[1])
+
+def test_from_simulators_keeps_solver_and_step_count():
+    sims = _members(tol=1e-5)
+    for sim in sims:
+        sim.step()
+    ens = FluidEnsemble.from_simulators(sims)
+    assert ens.step_count == 1
+    assert ens.pressure_solver.tol == 1e-5 and ens.pressure_solver is not sims[0].pressure_solver
+    member = ens.to_simulator(0)
+    assert member.step_count == 1 and member.pressure_solver.tol == 1e-5
+    # A round trip keeps the solver, so the member can be stacked again
+    assert FluidEnsemble.from_simulators([member, sims[1]]).pressure_solver.tol == 1e-5
+    sims[1].step()
+    with pytest.raises(ValueError):
+        FluidEnsemble.from_simulators(sims)
+    sims = _members()
+    sims[2].pressure_solver = JacobiSolver(tol=1e-3)
+    with pytest.raises(ValueError):
+        FluidEnsemble.from_simulators(sims)
+
+def test_dtype_carries_through_and_must_match():
+    sims = [FluidSimulator(nx=14, ny=10, dtype=np.float32) for _ in range(2)]
+    ens = FluidEnsemble.from_simulators(sims)
+    ens.step()
+    assert ens.u.dtype == np.float32 and ens.p.dtype == np.float32
+    assert ens.to_simulator(1).u.dtype == np.float32
+    sims.append(FluidSimulator(nx=14, ny=10))
+    with pytest.raises(ValueError):
+        FluidEnsemble.from_simulators(sims)
+    with pytest.raises(ValueError):
+        FluidEnsemble.from_simulators([FluidSimulator(nx=14, ny=10, dtype=np.float32, pressure_dtype=np.float64)])
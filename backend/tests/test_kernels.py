@@ -0,0 +1,81 @@
+import numpy as np
+import pytest
+from backend import kernels
+from backend.advection import SemiLagrangianAdvector
+from backend.simulation import FluidSimulator, laplacian
+from backend.solvers import JacobiSolver
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        kernels.make_kernels("cuda")
+
+def test_falls_back_to_numpy_without_numba(monkeypatch):
+    monkeypatch.setattr(kernels, "numba_available", lambda: False)
+    with pytest.warns(RuntimeWarning):
+        assert kernels.make_kernels("numba") is None
+    assert kernels.make_kernels("auto") is None
+
+def _fields(shape=(23, 31)):
+    rng = np.random.default_rng(3)
+    u, v = rng.standard_normal(shape) * 2, rng.standard_normal(shape) * 2
+    obstacle = np.zeros(shape, dtype=bool)
+    obstacle[8:12, 9:14] = True
+    obstacle[0, 3:6] = True
+    return u, v, obstacle
+
+def test_kernel_parity_with_numpy():
+    pytest.importorskip("numba")
+    k = kernels.NumbaKernels()
+    u, v, obstacle = _fields()
+    assert np.array_equal(k.laplacian(u, 0.7), laplacian(u, 0.7))
+    assert np.array_equal(k.diffuse(u, 0.03, 0.7), u + 0.03 * laplacian(u, 0.7))
+
+    expected = SemiLagrangianAdvector(*u.shape).advect([u, v], u, v, 0.4, obstacle=obstacle)
+    got = k.advect([u, v], u, v, 0.4, obstacle=obstacle)
+    assert np.array_equal(got[0], expected[0])
+    assert np.array_equal(got[1], expected[1])
+
+    p_ref, p_jit = np.zeros_like(u), np.zeros_like(u)
+    JacobiSolver(max_iter=40).solve(p_ref, v, obstacle, 1.0)
+    solver = JacobiSolver(max_iter=40)
+    solver.kernels = k
+    solver.solve(p_jit, v, obstacle, 1.0)
+    assert np.array_equal(p_ref, p_jit)
+
+def test_jacobi_kernel_follows_dtype_and_check_every():
+    pytest.importorskip("numba")
+    u, v, obstacle = _fields()
+    v = v.astype(np.float32)
+    p_ref, p_jit = np.zeros_like(v), np.zeros_like(v)
+    ref = JacobiSolver(tol=1e-3, max_iter=500, check_every=7)
+    ref.solve(p_ref, v, obstacle, 1.0)
+    solver = JacobiSolver(tol=1e-3, max_iter=500, check_every=7)
+    solver.kernels = kernels.NumbaKernels()
+    solver.solve(p_jit, v, obstacle, 1.0)
+    assert p_jit.dtype == np.float32
+    assert ref.converged and solver.converged
+    assert solver.iterations == ref.iterations and solver.iterations % 7 == 0
+    assert np.array_equal(p_ref, p_jit)
+
+def test_fused_statistics_match_numpy():
+    pytest.importorskip("numba")
+    u, v, obstacle = _fields()
+    p = u - v
+    speed = np.sqrt(u**2 + v**2)
+    expected = (speed.max(), speed[~obstacle].mean(), p.max(), p.min())
+    assert np.allclose(kernels.NumbaKernels().statistics(u, v, p, obstacle), expected)
+
+def test_numba_simulator_matches_numpy():
+    pytest.importorskip("numba")
+    a = FluidSimulator(nx=30, ny=20)
+    b = FluidSimulator(nx=30, ny=20, kernels="numba", workspace=True)
+    assert b.kernels is not None
+    mask = a.create_circle_obstacle(8, 10, 4)
+    a.set_obstacle(mask)
+    b.set_obstacle(mask)
+    for _ in range(5):
+        a.step()
+        b.step()
+    assert np.array_equal(a.u, b.u)
+    assert np.array_equal(a.v, b.v)
+    assert np.array_equal(a.p, b.p)
@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+from backend.multires import MultiResolution, coarse_shape, prolong, prolong_mask, restrict, restrict_mask
+from backend.obstacles import Circle, rasterize
+from backend.simulation import FluidSimulator
+
+def test_transfers_keep_linear_fields_and_masks():
+    assert coarse_shape((33, 65), 4) == (9, 17)
+    y, x = np.mgrid[:33, :65]
+    fine = 2.0 * x - 3.0 * y
+    coarse = restrict(fine, 2)
+    cy, cx = np.mgrid[:17, :33]
+    assert np.allclose(coarse[1:-1, 1:-1], (2.0 * 2 * cx - 3.0 * 2 * cy)[1:-1, 1:-1])
+    assert np.allclose(prolong(2.0 * cx - 3.0 * cy, (33, 65), 2), fine / 2)
+    mask = np.zeros((33, 65), dtype=bool)
+    mask[8:20, 10:30] = True
+    small = restrict_mask(mask, 2)
+    assert small[7, 10] and not small[2, 2]
+    back = prolong_mask(small, mask.shape, 2)
+    assert back[9:19, 11:29].all() and not back[:7].any() and not back[:, 31:].any()
+
+def test_spin_up_continues_on_fine_grid():
+    sim = FluidSimulator(nx=65, ny=33)
+    sim.set_obstacle(sim.create_circle_obstacle(16, 16, 4))
+    mask = sim.obstacle.copy()
+    multires = MultiResolution(sim, 4)
+    assert multires.coarse.nx == 17 and multires.coarse.dt == pytest.approx(0.4)
+    steps = multires.spin_up(8.0)
+    assert steps == 20 and multires.current is sim and sim.time == pytest.approx(8.0)
+    assert np.array_equal(sim.obstacle, mask)
+    assert not sim.u[mask].any() and sim.get_statistics()['max_speed'] > 0.5
+    sim.step()
+    assert np.isfinite(sim.u).all()
+
+def test_coarse_edits_carry_over_to_fine_mask():
+    circle = rasterize(Circle(10, 10, 3), (21, 41))
+    sim = FluidSimulator(nx=41, ny=21)
+    sim.set_obstacle(circle)
+    multires = MultiResolution(sim, 2)
+    coarse = multires.restrict()
+    expected_coarse = restrict_mask(circle, 2)
+    assert np.array_equal(coarse.obstacle, expected_coarse)
+    coarse.add_obstacle_cells([(5, 15)])
+    expected_coarse[5, 15] = True
+    assert np.array_equal(coarse.obstacle, expected_coarse)
+    coarse.nu = 0.05
+    multires.prolong()
+    # The fine circle is kept as is; only the fine points nearest to the
+    # edited coarse point turn solid
+    expected = circle.copy()
+    expected[9:11, 29:31] = True
+    assert np.array_equal(sim.obstacle, expected) and sim.nu == 0.05
+    with pytest.raises(ValueError):
+        MultiResolution(sim, 1)
@@ -0,0 +1,42 @@
+import numpy as np
+from backend import obstacles
+from backend.reference import reference_circle, reference_semicircle, reference_triangle
+from backend.simulation import FluidSimulator
+
+# Centres inside, near and outside the edges of a 23 x 31 grid
+PLACEMENTS = [(15, 11, 5), (1, 2, 4), (29, 21, 7), (-3, 5, 6), (10, 30, 4), (7, 7, 1), (12, 9, 0)]
+
+def test_builders_match_original_masks():
+    sim = FluidSimulator(nx=31, ny=23)
+    for cx, cy, r in PLACEMENTS:
+        assert np.array_equal(sim.create_circle_obstacle(cx, cy, r), reference_circle(23, 31, cx, cy, r))
+        assert np.array_equal(sim.create_semicircle_obstacle(cx, cy, r), reference_semicircle(23, 31, cx, cy, r))
+        if r > 0:
+            assert np.array_equal(sim.create_triangle_obstacle(cx, cy, r), reference_triangle(23, 31, cx, cy, r))
+    expected = np.zeros((23, 31), dtype=bool)
+    expected[4:10, 3:12] = True
+    assert np.array_equal(sim.create_rectangle_obstacle(3, 4, 11, 9), expected)
+
+def test_polygon_and_sdf():
+    square = obstacles.Polygon(((2.5, 2.5), (8.5, 2.5), (8.5, 6.5), (2.5, 6.5)))
+    rect = obstacles.Rectangle(3, 3, 8, 6)
+    assert np.array_equal(obstacles.rasterize(square, (10, 12)), obstacles.rasterize(rect, (10, 12)))
+    disc = obstacles.SDF(lambda x, y: np.hypot(x - 5, y - 4) - 3, extent=(2, 1, 8, 7))
+    assert np.array_equal(obstacles.rasterize(disc, (10, 12)),
+                          obstacles.rasterize(obstacles.Circle(5, 4, 3), (10, 12)))
+
+def test_union_and_difference():
+    a, b = obstacles.Circle(6, 6, 4), obstacles.Rectangle(5, 0, 14, 3)
+    ma, mb = obstacles.rasterize(a, (12, 16)), obstacles.rasterize(b, (12, 16))
+    assert np.array_equal(obstacles.rasterize(a | b, (12, 16)), ma | mb)
+    assert np.array_equal(obstacles.rasterize(a - b, (12, 16)), ma & ~mb)
+
+def test_patches_are_cached_and_masks_independent():
+    obstacles.clear_cache()
+    shape = obstacles.Triangle(40, 40, 9)
+    first = obstacles.rasterize(shape, (80, 80))
+    first[:] = False
+    second = obstacles.rasterize(obstacles.Triangle(40, 40, 9), (80, 80))
+    assert second.any()
+    info = obstacles.cache_info()
+    assert info.hits == 1 and info.misses == 1
@@ -0,0 +1,39 @@
+import threading
+import numpy as np
+import pytest
+from backend import parallel
+from backend.simulation import FluidSimulator, laplacian
+
+@pytest.mark.parametrize("threads", [2, 4])
+def test_threaded_step_matches_serial(threads):
+    serial = FluidSimulator(nx=40, ny=37)
+    tiled = FluidSimulator(nx=40, ny=37, threads=threads)
+    mask = serial.create_circle_obstacle(10, 18, 5)
+    mask[0, 4:8] = True  # obstacle touching the strip-edge rows
+    serial.set_obstacle(mask)
+    tiled.set_obstacle(mask)
+    for _ in range(5):
+        serial.step()
+        tiled.step()
+    assert len(tiled.tiles.strips) == threads
+    assert np.array_equal(serial.u, tiled.u)
+    assert np.array_equal(serial.v, tiled.v)
+    assert np.array_equal(serial.p, tiled.p)
+    tiled.close()
+
+def test_strip_laplacian_matches_serial():
+    field = np.random.default_rng(0).standard_normal((33, 21))
+    pool = parallel.StripPool(33, 3)
+    out = parallel.laplacian(field, 0.5, np.full_like(field, np.nan), pool)
+    pool.close()
+    assert np.array_equal(out, laplacian(field, 0.5))
+
+def test_close_shuts_down_strip_threads():
+    before = set(threading.enumerate())
+    with FluidSimulator(nx=40, ny=37, threads=2) as sim:
+        sim.step()
+        assert set(threading.enumerate()) - before
+    # The strip workers have exited
+    assert not set(threading.enumerate()) - before
+    sim.step()  # Falls back to serial strips
+    assert np.isfinite(sim.u).all()
@@ -0,0 +1,40 @@
+import json
+import numpy as np
+from backend.profiling import PHASES
+from backend.simulation import FluidSimulator
+
+def _profiled(steps=6, capacity=4):
+    sim = FluidSimulator(nx=24, ny=16)
+    sim.set_obstacle(sim.create_circle_obstacle(8, 8, 3))
+    profiler = sim.enable_profiling(capacity)
+    seen = []
+    profiler.subscribe(seen.append)
+    for _ in range(steps):
+        sim.step()
+    return sim, profiler, seen
+
+def test_phases_ring_buffer_and_subscribers():
+    sim, profiler, seen = _profiled()
+    assert len(profiler) == 4 and profiler.count == 6
+    recs = profiler.recent()
+    assert list(recs['step_count']) == [3, 4, 5, 6]
+    phase_sum = sum(recs[f'{phase}_ns'] for phase in PHASES)
+    assert np.array_equal(phase_sum, recs['total_ns'])
+    assert (recs['pressure_ns'] > 0).all() and (recs['pressure_iterations'] > 0).all()
+    assert [r['step_count'] for r in seen] == list(range(1, 7))
+    profiler.unsubscribe(seen.append)
+    sim.step()
+    assert len(seen) == 6
+
+def test_statistics_and_exports(tmp_path):
+    sim, profiler, _ = _profiled()
+    stats = sim.get_statistics()
+    assert stats['pressure_ms'] > 0 and stats['profiled_step_ms'] >= stats['pressure_ms']
+    records = profiler.to_json(str(tmp_path / "steps.json"))
+    assert json.loads((tmp_path / "steps.json").read_text()) == records and len(records) == 4
+    trace = profiler.to_chrome_trace(str(tmp_path / "trace.json"))
+    steps = [e for e in trace['traceEvents'] if e['name'] == 'step']
+    assert len(steps) == 4 and all(e['ph'] == 'X' for e in trace['traceEvents'])
+    sim.profiler = None
+    sim.step()
+    assert 'pressure_ms' not in sim.get_statistics()
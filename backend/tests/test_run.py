@@ -0,0 +1,45 @@
+import csv
+import os
+import subprocess
+import sys
+import numpy as np
+import pytest
+from backend.run import main, parse_obstacle
+from backend.simulation import FluidSimulator
+from backend.trajectory import TrajectoryReader
+
+def test_streams_stats_and_fields(tmp_path):
+    out = tmp_path / "run"
+    summary = main(["--nx", "24", "--ny", "16", "--steps", "6", "--stats-every", "2",
+                    "--fields-every", "3", "--downsample", "2", "--obstacle", "circle:8,8,3",
+                    "--obstacle", "rect:14,2,16,4", "--profile", "--out", str(out), "--quiet"])
+    assert summary['steps'] == 6 and summary['steps_per_sec'] > 0
+    with open(out / "stats.csv") as f:
+        rows = list(csv.DictReader(f))
+    assert [int(r['step_count']) for r in rows] == [2, 4, 6]
+    fields = TrajectoryReader(str(out / "fields"))
+    assert list(fields.steps) == [3, 6]
+    assert fields.field('u', 1).shape == (8, 12)
+    obstacle = np.load(out / "obstacle.npy")
+    assert obstacle[4, 4] and obstacle[1, 7]
+    assert 'pressure_ms' in rows[0] and (out / "trace.json").exists() and (out / "profile.json").exists()
+    # A rerun into the same directory replaces the previous trajectory
+    summary = main(["--nx", "24", "--ny", "16", "--steps", "2", "--out", str(out), "--quiet"])
+    assert list(TrajectoryReader(str(out / "fields")).steps) == [2]
+
+def test_end_time_and_obstacle_specs(tmp_path):
+    summary = main(["--nx", "16", "--ny", "12", "--t-end", "0.35", "--out", str(tmp_path), "--quiet"])
+    assert summary['steps'] == 4 and summary['time'] == pytest.approx(0.35)
+    summary = main(["--nx", "16", "--ny", "12", "--t-end", "3", "--adaptive", "--out", str(tmp_path / "adaptive"), "--quiet"])
+    assert summary['steps'] == 3 and summary['time'] == pytest.approx(3.0)
+    sim = FluidSimulator(nx=20, ny=20)
+    assert parse_obstacle("polygon:2,2;10,2;2,10", sim)[3, 3]
+    assert parse_obstacle("triangle", sim).any()
+    with pytest.raises(ValueError):
+        parse_obstacle("hexagon:1,2", sim)
+
+def test_does_not_import_gui_or_scipy():
+    code = "import sys, backend.run; print(sorted(m for m in ('pygame', 'scipy') if m in sys.modules))"
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True,
+                            cwd=os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+    assert result.stdout.strip() == "[]"
@@ -1,6 +1,7 @@
 import numpy as np
 import pytest
 from backend.simulation import FluidSimulator
+from backend.sweep import OBSTACLE_PRESETS
 
 def test_initial_state_is_empty():
     sim = FluidSimulator(nx=10, ny=10)
@@ -88,4 +89,148 @@ def test_custom_obstacle_mask():
     # fields zeroed inside
     assert np.all(sim.p[mask] == 0.0)
     assert np.all(sim.u[mask] == 0.0)
-    assert np.all(sim.v[mask] == 0.0)
\ No newline at end of file
+    assert np.all(sim.v[mask] == 0.0)
+
+def test_workspace_mode_matches_default():
+    mask = np.zeros((12, 16), dtype=bool)
+    mask[4:7, 5:8] = True
+    a = FluidSimulator(nx=16, ny=12)
+    b = FluidSimulator(nx=16, ny=12, workspace=True)
+    a.set_obstacle(mask)
+    b.set_obstacle(mask)
+    for _ in range(5):
+        a.step()
+        b.step()
+    u, v = b.get_velocity()
+    assert np.array_equal(a.u, u)
+    assert np.array_equal(a.v, v)
+    assert np.array_equal(a.p, b.get_pressure())
+
+def test_workspace_mode_reuses_buffers():
+    sim = FluidSimulator(nx=300, ny=300, workspace=True, track_allocations=True)
+    sim.step()
+    pooled = sim.workspace.bytes_allocated
+    sim.step()
+    sim.step()
+    assert sim.workspace.bytes_allocated == pooled
+    # Only small fixed-size ufunc buffers remain, well below one field
+    assert sim.get_statistics()['step_alloc_bytes'] < sim.u.nbytes
+
+def test_getters_keep_previous_state_without_workspace():
+    sim = FluidSimulator(nx=16, ny=12)
+    sim.step()
+    u, v = sim.get_velocity()
+    p = sim.get_pressure()
+    saved = u.copy(), v.copy(), p.copy()
+    sim.step()
+    assert sim.u is not u and sim.p is not p
+    for held, copy in zip((u, v, p), saved):
+        assert np.array_equal(held, copy)
+
+def test_derived_fields_cached_per_version():
+    sim = FluidSimulator(nx=16, ny=12)
+    sim.step()
+    speed = sim.get_velocity_magnitude()
+    assert sim.get_velocity_magnitude() is speed and not speed.flags.writeable
+    assert sim.get_statistics()['max_speed'] == speed.max()
+    sim.u[5, 5], sim.v[5, 5] = 9.0, 0.0
+    sim.invalidate()
+    assert sim.get_velocity_magnitude()[5, 5] == 9.0
+    assert sim.get_statistics()['max_speed'] == 9.0
+    vorticity = sim.get_vorticity()
+    sim.step()
+    assert sim.get_vorticity() is not vorticity
+
+def test_statistics_average_over_fluid_only():
+    sim = FluidSimulator(nx=10, ny=10)
+    mask = np.zeros((10, 10), dtype=bool)
+    mask[:, 5:] = True
+    sim.set_obstacle(mask)
+    sim.u[:, :5] = 2.0
+    sim.invalidate()
+    assert sim.get_statistics()['avg_speed'] == pytest.approx(2.0)
+
+def test_adaptive_dt_follows_cfl():
+    sim = FluidSimulator(nx=20, ny=12, u_in=2.0, adaptive=True, cfl=0.5)
+    sim.step()
+    # The inlet is the fastest cell of the initial state
+    assert sim.dt == 0.25 and sim.time == 0.25
+    capped = FluidSimulator(nx=20, ny=12, adaptive=True, dt_max=0.2)
+    capped.step()
+    assert capped.dt == 0.2
+
+def test_advance_to_lands_on_end_time():
+    sim = FluidSimulator(nx=16, ny=10, adaptive=True)
+    assert sim.advance_to(2.5) == 3
+    assert sim.time == pytest.approx(2.5, abs=1e-12)
+    assert sim.advance_to(2.5) == 0
+
+def test_viscous_limit_substeps_diffusion():
+    sim = FluidSimulator(nx=16, ny=10, viscosity=1.0, adaptive=True)
+    for _ in range(5):
+        sim.step()
+    assert sim.dt == 1.0 and sim.get_statistics()['diffusion_substeps'] == 5
+    assert np.isfinite(sim.u).all() and np.abs(sim.u).max() <= 1.0 + 1e-9
+
+def test_fixed_dt_near_viscous_limit_takes_one_diffusion_step():
+    # Within 10% of the limit dx**2 / (4 nu) = 0.25, so not clamped or split
+    sim = FluidSimulator(nx=16, ny=10, viscosity=1.0, dt=0.24)
+    sim.step()
+    assert sim.dt == 0.24 and sim.get_statistics()['diffusion_substeps'] == 1
+
+@pytest.mark.parametrize("obstacle", list(OBSTACLE_PRESETS))
+def test_float32_tracks_float64(obstacle):
+    runs = []
+    for kwargs in ({}, {'dtype': np.float32}, {'dtype': np.float32, 'pressure_dtype': np.float64}):
+        sim = FluidSimulator(nx=48, ny=24, **kwargs)
+        mask = OBSTACLE_PRESETS[obstacle](sim)
+        if mask is not None:
+            sim.set_obstacle(mask)
+        for _ in range(30):
+            sim.step()
+        runs.append(sim)
+    ref = runs[0]
+    for sim in runs[1:]:
+        assert sim.u.dtype == sim.v.dtype == np.float32
+        assert sim.advector._index.dtype == np.int32
+        assert np.allclose(sim.u, ref.u, rtol=0, atol=1e-5 * np.abs(ref.u).max())
+        assert np.allclose(sim.p, ref.p, rtol=0, atol=1e-4 * np.abs(ref.p).max())
+    assert runs[1].p.dtype == np.float32 and runs[2].p.dtype == np.float64
+    with pytest.raises(ValueError):
+        FluidSimulator(nx=8, ny=8, dtype=np.int32)
+
+def test_incremental_obstacle_edits_match_set_obstacle():
+    sim = FluidSimulator(nx=40, ny=30)
+    ref = FluidSimulator(nx=40, ny=30)
+    for s in (sim, ref):
+        for _ in range(3):
+            s.step()
+    version = sim.version
+    sim.add_obstacle_cells([(5, 5), (5, 6), (-1, 3), (2, 99)])
+    sim.apply_obstacle_stroke([(10, 10), (20, 15), (20, 25)], brush_radius=1.5)
+    ref.set_obstacle(sim.obstacle)
+    sim.remove_obstacle_cells([(15, 20)])
+    assert sim.version > version and sim.obstacle[5, 5] and not sim.obstacle[15, 20]
+    assert sim.obstacle[12, 15] and sim.obstacle[25, 20] and not sim.obstacle[25, 10]
+    assert not sim.u[sim.obstacle].any() and not sim.p[sim.obstacle].any()
+
+    ref.set_obstacle(sim.obstacle)
+    assert np.array_equal(sim.active.surface, ref.active.surface)
+    assert np.array_equal(sim.active.fluid_boundary, ref.active.fluid_boundary)
+    assert np.array_equal(sim.u, ref.u) and np.array_equal(sim.p, ref.p)
+    version = sim.version
+    sim.add_obstacle_cells([(5, 5)])  # Already solid, nothing changes
+    assert sim.version == version
+    sim.step()
+    ref.step()
+    assert np.array_equal(sim.u, ref.u)
+
+def test_obstacle_edits_leave_held_masks_alone():
+    sim = FluidSimulator(nx=20, ny=16)
+    held = sim.get_obstacle()
+    sim.add_obstacle_cells([(5, 5), (6, 5)])
+    assert not held.any()
+    assert sim.get_obstacle()[5, 5] and sim.get_obstacle() is not held
+    held = sim.get_obstacle()
+    sim.remove_obstacle_cells([(5, 5)])
+    assert held[5, 5] and not sim.obstacle[5, 5]
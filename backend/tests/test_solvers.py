@@ -0,0 +1,128 @@
+import numpy as np
+import pytest
+from backend.simulation import FluidSimulator
+from backend.solvers import (
+    JacobiSolver, MultigridSolver, FFTSolver, SORSolver, make_pressure_solver, residual_norm,
+    DIFFUSION_SOLVERS, helmholtz_residual, make_diffusion_solver
+)
+
+def _problem(ny=33, nx=41, obstacle=True):
+    rng = np.random.default_rng(0)
+    div = rng.standard_normal((ny, nx))
+    mask = np.zeros((ny, nx), dtype=bool)
+    if obstacle:
+        mask[10:18, 12:20] = True
+    return div, mask
+
+@pytest.mark.parametrize("solver", [MultigridSolver, FFTSolver, SORSolver])
+def test_solver_reaches_tolerance(solver):
+    div, mask = _problem()
+    s = solver(tol=1e-8)
+    p = np.zeros_like(div)
+    s.solve(p, div, mask, 1.0)
+    assert s.converged
+    assert s.residual < 1e-8
+    assert residual_norm(p, div, mask, 1.0) == pytest.approx(s.residual)
+    assert np.all(p[mask] == 0.0)
+
+def test_cg_reaches_tolerance():
+    pytest.importorskip("scipy")
+    from backend.solvers import CGSolver
+    div, mask = _problem()
+    for preconditioner in ("multigrid", None):
+        s = CGSolver(tol=1e-8, preconditioner=preconditioner)
+        p = np.zeros_like(div)
+        s.solve(p, div, mask, 1.0)
+        assert s.converged
+        assert np.all(p[mask] == 0.0)
+
+def test_fft_matches_multigrid_without_obstacles():
+    div, mask = _problem(obstacle=False)
+    p_fft = FFTSolver().solve(np.zeros_like(div), div, mask, 0.5)
+    p_mg = MultigridSolver(tol=1e-10).solve(np.zeros_like(div), div, mask, 0.5)
+    assert np.allclose(p_fft, p_mg, atol=1e-6)
+
+def test_jacobi_reports_iterations():
+    div, mask = _problem()
+    s = JacobiSolver(max_iter=7)
+    s.solve(np.zeros_like(div), div, mask, 1.0)
+    assert s.iterations == 7
+    assert not s.converged
+    assert s.residual > 0
+
+def test_convergence_checked_every_k_sweeps():
+    div, mask = _problem()
+    s = JacobiSolver(tol=1e-3, max_iter=5000, criterion="residual", check_every=5)
+    s.solve(np.zeros_like(div), div, mask, 1.0)
+    assert s.converged and s.iterations % 5 == 0
+    sor = SORSolver(tol=1e-3, check_every=5)
+    sor.solve(np.zeros_like(div), div, mask, 1.0)
+    assert sor.converged and sor.iterations % 5 == 0
+    assert sor.iterations < s.iterations / 4
+    assert 1.5 < sor.relaxation(div.shape) < 2.0
+    with pytest.raises(ValueError):
+        SORSolver(omega=2.5)
+
+def test_unknown_solver_name():
+    with pytest.raises(ValueError):
+        make_pressure_solver("sor-magic")
+
+@pytest.mark.parametrize("name", ["multigrid", "fft"])
+def test_simulator_pressure_solver_option(name):
+    sim = FluidSimulator(nx=20, ny=16, pressure_solver=name)
+    mask = np.zeros((16, 20), dtype=bool)
+    mask[6:10, 6:10] = True
+    sim.set_obstacle(mask)
+    sim.step()
+    stats = sim.get_statistics()
+    assert stats['pressure_iterations'] > 0
+    assert stats['pressure_residual'] <= sim.pressure_solver.tol
+    assert np.all(sim.p[mask] == 0.0)
+
+@pytest.mark.parametrize("name", list(DIFFUSION_SOLVERS))
+def test_diffusion_solvers_reach_tolerance(name):
+    b, mask = _problem()
+    x = b.copy()
+    x[mask] = 0.0
+    s = make_diffusion_solver(name, tol=1e-9, max_iter=500)
+    s.solve(x, b, mask, 2.5)
+    assert s.converged and s.residual < 1e-9
+    assert np.all(x[mask] == 0.0) and np.array_equal(x[0], b[0])
+    r = helmholtz_residual(x, b, mask, 2.5)
+    assert np.abs(r).max() < 1e-7
+
+def test_implicit_diffusion_matches_explicit_for_small_steps():
+    explicit = FluidSimulator(nx=24, ny=16, viscosity=0.5)
+    implicit = FluidSimulator(nx=24, ny=16, viscosity=0.5, diffusion="crank-nicolson", diffusion_solver="cg")
+    field = np.outer(np.sin(np.linspace(0, np.pi, 16)), np.sin(np.linspace(0, 2 * np.pi, 24)))
+    a = b = field
+    for _ in range(20):
+        a = explicit.diffuse(a, dt=0.01)
+        b = implicit.diffuse(b, dt=0.01, name='u')
+    assert np.allclose(a, b, atol=1e-4)
+
+def test_implicit_diffusion_lifts_viscous_limit():
+    with pytest.raises(ValueError):
+        FluidSimulator(nx=8, ny=8, diffusion="implicit")
+    sim = FluidSimulator(nx=24, ny=16, dt=0.5, viscosity=2.0, diffusion="backward-euler")
+    for _ in range(5):
+        sim.step()
+    stats = sim.get_statistics()
+    assert sim.dt == 0.5 and stats['diffusion_substeps'] == 1 and stats['diffusion_iterations'] > 0
+    assert np.isfinite(sim.u).all() and np.abs(sim.u).max() <= 1.0 + 1e-9
+
+def test_extrapolated_pressure_guess():
+    runs = []
+    for extrapolate in (False, True):
+        sim = FluidSimulator(nx=64, ny=32, pressure_solver=SORSolver(tol=1e-6, check_every=1),
+                             pressure_extrapolation=extrapolate)
+        sim.set_obstacle(sim.create_circle_obstacle(16, 16, 4))
+        total = 0
+        for _ in range(30):
+            sim.step()
+            total += sim.get_statistics()['pressure_iterations']
+        stats = sim.get_statistics()
+        assert stats['pressure_converged'] and stats['divergence_rms'] > 0
+        assert np.all(sim.p[sim.obstacle] == 0.0)
+        runs.append(total)
+    assert runs[1] < runs[0]
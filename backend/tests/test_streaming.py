@@ -0,0 +1,95 @@
+import asyncio
+import numpy as np
+import pytest
+from backend.background import BackgroundSimulation, Snapshot
+from backend.simulation import FluidSimulator
+from backend.streaming import FrameEncoder, StreamClient, StreamServer, dequantize
+
+def _snapshot(rng, k, n=128):
+    u = rng.standard_normal((n, n))
+    obstacle = np.zeros((n, n), dtype=bool)
+    return Snapshot(k, k * 0.1, u, np.zeros_like(u), np.zeros_like(u), obstacle, {'step_count': k}, version=k)
+
+def test_quantization_and_deltas():
+    data = np.linspace(-1, 3, 400).reshape(20, 20)
+    encoder = FrameEncoder("uint8")
+    codes, delta = encoder.encode(data)
+    assert delta is None
+    assert np.abs(dequantize(codes, "uint8", encoder.low, encoder.high) - data).max() <= (encoder.high - encoder.low) / 255
+    changed = data.copy()
+    changed[3, 4] += 0.5
+    codes2, delta = encoder.encode(changed)
+    assert np.count_nonzero(delta) == 1 and np.array_equal(codes2 ^ codes, delta)
+    half = FrameEncoder("float16")
+    codes, _ = half.encode(data)
+    assert np.array_equal(dequantize(codes, "float16", None, None), data.astype(np.float16))
+    with pytest.raises(ValueError):
+        FrameEncoder("int4")
+
+def test_clients_receive_frames_from_background_simulation():
+    sim = FluidSimulator(nx=48, ny=24)
+    sim.set_obstacle(sim.create_circle_obstacle(12, 12, 4))
+    bg = BackgroundSimulation(sim, publish_interval=0.0).start()
+
+    async def run():
+        server = await StreamServer(bg, field="vorticity", dtype="float16", fps=200, max_clients=2).start()
+        try:
+            clients = [await StreamClient.connect("127.0.0.1", server.port) for _ in range(2)]
+            with pytest.raises(ConnectionRefusedError):
+                await StreamClient.connect("127.0.0.1", server.port)
+            for client in clients:
+                frames = [await client.receive() for _ in range(5)]
+                assert frames[0].key and [f.seq for f in frames] == sorted({f.seq for f in frames})
+                assert frames[-1].data.shape == (24, 48) and frames[-1].stats['step_count'] == frames[-1].step_count
+                assert np.array_equal(client.obstacle, sim.active.mask)
+                await client.close()
+        finally:
+            await server.close()
+    try:
+        asyncio.run(run())
+    finally:
+        bg.stop()
+
+def test_slow_client_gets_key_frame_instead_of_stalling():
+    rng = np.random.default_rng(0)
+
+    async def run():
+        server = await StreamServer(fps=1e6, write_buffer=1024).start()
+        try:
+            client = await StreamClient.connect("127.0.0.1", server.port)
+            # Incompressible frames, far more than the socket buffers hold
+            for k in range(300):
+                server._on_snapshot(_snapshot(rng, k))
+                await asyncio.sleep(0)
+            assert server.frames == 300 and server.dropped > 0
+            last = server.encoder.codes
+            while True:
+                frame = await client.receive()
+                if frame.seq == 299:
+                    break
+            assert np.array_equal(dequantize(last, "uint8", server.encoder.low, server.encoder.high), frame.data)
+            await client.close()
+        finally:
+            await server.close()
+    asyncio.run(run())
+
+def test_publish_from_step_loop_thread():
+    sim = FluidSimulator(nx=32, ny=16)
+    server = StreamServer(fps=1000).start_in_thread()
+    try:
+        async def watch():
+            client = await StreamClient.connect("127.0.0.1", server.port)
+            frame = await client.receive()
+            await client.close()
+            return frame
+        loop = asyncio.new_event_loop()
+        task = loop.create_task(watch())
+        loop.run_until_complete(asyncio.sleep(0.05))
+        for _ in range(3):
+            sim.step()
+            server.publish(sim, force=True)
+        frame = loop.run_until_complete(asyncio.wait_for(task, 5))
+        loop.close()
+        assert frame.key and frame.step_count >= 1
+    finally:
+        server.stop()
@@ -0,0 +1,34 @@
+import numpy as np
+import pytest
+from backend.simulation import FluidSimulator
+from backend.sweep import OBSTACLE_PRESETS, parameter_grid, run_sweep
+
+def test_parameter_grid():
+    cases = parameter_grid([0.01, 0.02], [1.0, 2.0, 3.0], ['none', 'circle'])
+    assert len(cases) == 12
+    assert cases[0].viscosity == 0.01 and cases[0].obstacle == 'none'
+    with pytest.raises(ValueError):
+        parameter_grid([0.01], [1.0], ['hexagon'])
+
+def test_sweep_collects_stats_and_shared_fields():
+    cases = parameter_grid([0.01, 0.03], [1.0], ['none', 'circle'])
+    result = run_sweep(cases, nx=16, ny=12, steps=3, keep_fields=True, max_workers=2)
+    assert result.fields.shape == (4, 3, 12, 16)
+    for k, case in enumerate(cases):
+        assert len(result.stats[k]) == 3
+        assert result.steps[k] == 3
+        sim = FluidSimulator(16, 12, viscosity=case.viscosity, u_in=case.u_in)
+        mask = OBSTACLE_PRESETS[case.obstacle](sim)
+        if mask is not None:
+            sim.set_obstacle(mask)
+        for _ in range(3):
+            sim.step()
+        assert np.array_equal(result.fields[k, 0], sim.u)
+        assert np.array_equal(result.fields[k, 2], sim.p)
+        assert result.stats[k][-1]['max_speed'] == pytest.approx(sim.get_statistics()['max_speed'])
+
+def test_sweep_stops_at_steady_state():
+    cases = parameter_grid([0.02], [0.0])
+    result = run_sweep(cases, nx=10, ny=8, steps=100, steady_tol=1e-3, check_every=2, max_workers=1)
+    assert result.steps[0] < 100
+    assert result.fields is None
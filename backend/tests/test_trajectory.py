@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+from backend.simulation import FluidSimulator
+from backend.trajectory import TrajectoryReader, TrajectoryWriter
+
+def _record(path, steps=7, **kwargs):
+    sim = FluidSimulator(nx=20, ny=12)
+    sim.set_obstacle(sim.create_circle_obstacle(6, 6, 2))
+    expected = []
+    with TrajectoryWriter(str(path), sim, chunk_frames=3, **kwargs) as writer:
+        for _ in range(steps):
+            sim.step()
+            writer.append(sim)
+            expected.append((sim.u.copy(), sim.get_vorticity()))
+    return expected
+
+def test_round_trip_across_chunks(tmp_path):
+    expected = _record(tmp_path / "traj")
+    reader = TrajectoryReader(str(tmp_path / "traj"))
+    assert len(reader) == 7
+    assert list(reader.steps) == list(range(1, 8))
+    assert reader.header['grid']['nx'] == 20
+    for k, (u, vort) in enumerate(expected):
+        assert np.array_equal(reader.field('u', k), u)
+        assert np.array_equal(reader.field('vorticity', k), vort)
+    frame = reader[4]
+    assert isinstance(frame.base, np.memmap) and not frame.flags.writeable
+    assert list(reader.time_range(0.25, 0.55)) == [2, 3, 4]
+    assert reader.series('p', 1, 7, 2).shape == (3, 12, 20)
+    with pytest.raises(IndexError):
+        reader[7]
+
+def test_compressed_float32_downsampled(tmp_path):
+    expected = _record(tmp_path / "traj", fields=('u',), dtype=np.float32, downsample=2, compress=True)
+    reader = TrajectoryReader(str(tmp_path / "traj"))
+    assert len(reader) == 7 and reader[0].shape == (1, 6, 10)
+    assert np.array_equal(reader.field('u', 6), expected[6][0][::2, ::2].astype(np.float32))
+
+def test_unknown_field(tmp_path):
+    with pytest.raises(ValueError):
+        TrajectoryWriter(str(tmp_path / "traj"), FluidSimulator(nx=8, ny=8), fields=('density',))
@@ -0,0 +1,251 @@
+import json
+import os
+import queue
+import threading
+from functools import lru_cache
+from typing import Callable, Iterator, Optional, Sequence
+
+import numpy as np
+
+from .simulation import FluidSimulator
+
+# A trajectory is a directory:
+#   header.json          grid, parameters, fields, dtype, chunk size (written atomically)
+#   index.bin            append-only (step, time) record per stored frame
+#   chunk_000000.npy     (chunk_frames, n_fields, ny, nx) frames, memory-mapped
+#   chunk_000000.npz     the same, compressed, when written with compress=True
+# A frame counts as stored once its index record exists, so a killed run
+# leaves a readable prefix.
+
+FORMAT_VERSION = 1
+INDEX_DTYPE = np.dtype([('step', '<i8'), ('time', '<f8')])
+
+FIELD_GETTERS: dict[str, Callable[[FluidSimulator], np.ndarray]] = {
+    'u': lambda sim: sim.u,
+    'v': lambda sim: sim.v,
+    'p': lambda sim: sim.p,
+    'vorticity': FluidSimulator.get_vorticity,
+    'divergence': FluidSimulator.get_divergence,
+    'speed': FluidSimulator.get_velocity_magnitude,
+}
+
+
+def _chunk_path(path: str, k: int, compressed: bool) -> str:
+    return os.path.join(path, f"chunk_{k:06d}.{'npz' if compressed else 'npy'}")
+
+
+def _write_json(path: str, data: dict) -> None:
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp, path)
+
+
+class TrajectoryWriter:
+    """Append-only recorder of simulator fields, written on a background thread.
+
+    ``append(sim)`` copies the selected fields (downsampled and cast to
+    ``dtype``) into one of ``queue_size`` recycled frame buffers and returns;
+    the writer thread moves frames into fixed-size chunk files. When every
+    buffer is in flight ``append`` blocks, which bounds memory use.
+    """
+
+    def __init__(self, path: str, sim: FluidSimulator, fields: Sequence[str] = ('u', 'v', 'p', 'vorticity'),
+                 dtype=np.float64, downsample: int = 1, chunk_frames: int = 64,
+                 compress: bool = False, queue_size: int = 4):
+        for name in fields:
+            if name not in FIELD_GETTERS:
+                raise ValueError(f"Unknown field: {name}")
+        os.makedirs(path)
+        self.path = path
+        self.fields = tuple(fields)
+        self.dtype = np.dtype(dtype)
+        self.downsample = max(int(downsample), 1)
+        self.chunk_frames = chunk_frames
+        self.compress = compress
+        s = self.downsample
+        ny, nx = sim.u[::s, ::s].shape
+        self.frame_shape = (len(self.fields), ny, nx)
+        self.frames = 0
+        self.error: Optional[BaseException] = None
+        self.header = {
+            'format_version': FORMAT_VERSION,
+            'fields': list(self.fields),
+            'dtype': self.dtype.str,
+            'frame_shape': list(self.frame_shape),
+            'chunk_frames': chunk_frames,
+            'compress': compress,
+            'downsample': s,
+            'grid': {'nx': sim.nx, 'ny': sim.ny, 'dx': sim.dx},
+            'parameters': {'dt': sim.dt, 'viscosity': sim.nu, 'u_in': sim.u_in},
+            'frames': 0,
+        }
+        _write_json(os.path.join(path, "header.json"), self.header)
+        self._index = open(os.path.join(path, "index.bin"), "ab")
+
+        self._free: "queue.Queue[np.ndarray]" = queue.Queue()
+        for _ in range(queue_size):
+            self._free.put(np.empty(self.frame_shape, dtype=self.dtype))
+        self._pending: "queue.Queue[Optional[tuple]]" = queue.Queue()
+        self._chunk = None
+        self._chunk_id = -1
+        self._chunk_records = []
+        self._thread = threading.Thread(target=self._run, name="trajectory-writer", daemon=True)
+        self._thread.start()
+
+    def __enter__(self) -> "TrajectoryWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def append(self, sim: FluidSimulator) -> None:
+        """Queue the current fields of ``sim`` as the next frame"""
+        if self.error is not None:
+            raise self.error
+        frame = self._free.get()
+        s = self.downsample
+        for k, name in enumerate(self.fields):
+            np.copyto(frame[k], FIELD_GETTERS[name](sim)[::s, ::s], casting='same_kind')
+        self._pending.put((frame, sim.step_count, sim.time))
+
+    def close(self) -> None:
+        """Write out every queued frame and finalize the header"""
+        if self._thread is None:
+            return
+        self._pending.put(None)
+        self._thread.join()
+        self._thread = None
+        self._index.close()
+        if self.error is not None:
+            raise self.error
+
+    def _open_chunk(self) -> None:
+        self._chunk_id += 1
+        shape = (self.chunk_frames,) + self.frame_shape
+        if self.compress:
+            self._chunk = np.empty(shape, dtype=self.dtype)
+        else:
+            self._chunk = np.lib.format.open_memmap(
+                _chunk_path(self.path, self._chunk_id, False), mode='w+', dtype=self.dtype, shape=shape)
+
+    def _commit(self, records: list) -> None:
+        """Append index records; from here on the frames are visible to readers"""
+        self._index.write(np.array(records, dtype=INDEX_DTYPE).tobytes())
+        self._index.flush()
+        self.frames += len(records)
+
+    def _finish_chunk(self) -> None:
+        if self.compress:
+            if self._chunk_records:
+                used = len(self._chunk_records)
+                tmp = _chunk_path(self.path, self._chunk_id, True) + ".tmp.npz"
+                np.savez_compressed(tmp, frames=self._chunk[:used])
+                os.replace(tmp, _chunk_path(self.path, self._chunk_id, True))
+                self._commit(self._chunk_records)
+        else:
+            self._chunk.flush()
+        self._chunk_records = []
+        self.header['frames'] = self.frames
+        _write_json(os.path.join(self.path, "header.json"), self.header)
+
+    def _run(self) -> None:
+        try:
+            while True:
+                item = self._pending.get()
+                if item is None:
+                    break
+                frame, step, time = item
+                if self._chunk is None or len(self._chunk_records) == self.chunk_frames:
+                    if self._chunk is not None:
+                        self._finish_chunk()
+                    self._open_chunk()
+                self._chunk[len(self._chunk_records)] = frame
+                self._chunk_records.append((step, time))
+                self._free.put(frame)
+                if not self.compress:
+                    # Memory-mapped frames are readable at once, commit them one by one
+                    self._commit(self._chunk_records[-1:])
+            if self._chunk is not None:
+                self._finish_chunk()
+                self._chunk = None
+        except BaseException as exc:  # re-raised by append/close
+            self.error = exc
+            # Hand queued buffers back so a blocked append can see the error
+            item = self._pending.get()
+            while item is not None:
+                self._free.put(item[0])
+                item = self._pending.get()
+
+
+class TrajectoryReader:
+    """Lazy, zero-copy view of a trajectory written by TrajectoryWriter.
+
+    Frames of uncompressed trajectories are read-only views into memory
+    mapped chunk files, so random access and time slicing touch only the
+    pages they need. Compressed chunks are decompressed on first access
+    (the most recent few are cached).
+    """
+
+    def __init__(self, path: str, cached_chunks: int = 2):
+        self.path = path
+        with open(os.path.join(path, "header.json")) as f:
+            self.header = json.load(f)
+        self.fields = tuple(self.header['fields'])
+        self.dtype = np.dtype(self.header['dtype'])
+        self.frame_shape = tuple(self.header['frame_shape'])
+        self.chunk_frames = self.header['chunk_frames']
+        self.compress = self.header['compress']
+        index_path = os.path.join(path, "index.bin")
+        n = os.path.getsize(index_path) // INDEX_DTYPE.itemsize
+        self.index = (np.memmap(index_path, dtype=INDEX_DTYPE, mode='r', shape=(n,)) if n
+                      else np.zeros(0, dtype=INDEX_DTYPE))
+        self._load_chunk = lru_cache(maxsize=cached_chunks)(self._open_chunk)
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    @property
+    def steps(self) -> np.ndarray:
+        return self.index['step']
+
+    @property
+    def times(self) -> np.ndarray:
+        return self.index['time']
+
+    def _open_chunk(self, k: int) -> np.ndarray:
+        if self.compress:
+            with np.load(_chunk_path(self.path, k, True)) as data:
+                frames = data['frames']
+            frames.flags.writeable = False
+            return frames
+        return np.load(_chunk_path(self.path, k, False), mmap_mode='r')
+
+    def __getitem__(self, k: int) -> np.ndarray:
+        """Frame ``k`` as an (n_fields, ny, nx) array"""
+        n = len(self)
+        if k < 0:
+            k += n
+        if not 0 <= k < n:
+            raise IndexError(f"frame {k} out of range for {n} frames")
+        return self._load_chunk(k // self.chunk_frames)[k % self.chunk_frames]
+
+    def field(self, name: str, k: int) -> np.ndarray:
+        """One field of frame ``k``"""
+        return self[k][self.fields.index(name)]
+
+    def frames(self, start: int = 0, stop: Optional[int] = None, step: int = 1) -> Iterator[np.ndarray]:
+        """Iterate over frames ``start:stop:step`` without loading the rest"""
+        for k in range(*slice(start, stop, step).indices(len(self))):
+            yield self[k]
+
+    def time_range(self, t0: float, t1: float) -> range:
+        """Frame indices with t0 <= time <= t1"""
+        times = self.times
+        return range(int(np.searchsorted(times, t0, 'left')), int(np.searchsorted(times, t1, 'right')))
+
+    def series(self, name: str, start: int = 0, stop: Optional[int] = None, step: int = 1) -> np.ndarray:
+        """Copy of one field over frames ``start:stop:step`` as a (T, ny, nx) array"""
+        i = self.fields.index(name)
+        frames = [frame[i] for frame in self.frames(start, stop, step)]
+        return np.stack(frames) if frames else np.empty((0,) + self.frame_shape[1:], dtype=self.dtype)
@@ -0,0 +1,29 @@
+import numpy as np
+
+
+class Workspace:
+    """Pool of named work arrays that are allocated once and reused every step"""
+
+    def __init__(self):
+        self._buffers = {}
+        self.bytes_allocated = 0
+
+    def get(self, name: str, shape: tuple, dtype=np.float64) -> np.ndarray:
+        """Return the buffer called ``name``, allocating it on first use"""
+        buf = self._buffers.get(name)
+        if buf is None or buf.shape != shape or buf.dtype != dtype:
+            buf = np.empty(shape, dtype=dtype)
+            self._buffers[name] = buf
+            self.bytes_allocated += buf.nbytes
+        return buf
+
+    def swap(self, name: str, array: np.ndarray) -> np.ndarray:
+        """Ping-pong: hand out the pooled back buffer and keep ``array`` in its place"""
+        back = self.get(name, array.shape, array.dtype)
+        self._buffers[name] = array
+        return back
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes currently held by the pool"""
+        return sum(buf.nbytes for buf in self._buffers.values())
@@ -0,0 +1,36 @@
+import numpy as np
+
+Color = tuple[int, int, int]
+
+
+class FieldRenderer:
+    """Builds the RGB frame of a (ny, nx) field as one uint8 array.
+
+    The image uses the ``pygame.surfarray`` layout ``(nx, ny, 3)`` so it can
+    be blitted onto an nx x ny surface directly and scaled to the window in
+    one call. Colors match the original per-cell ``draw_grid`` loop exactly.
+    """
+
+    def __init__(self, nx: int, ny: int):
+        self.nx, self.ny = nx, ny
+        self.image = np.zeros((nx, ny, 3), dtype=np.uint8)
+        self._t = np.empty((nx, ny))
+        self._lo = np.empty((nx, ny))
+        self._hi = np.empty((nx, ny))
+
+    def render(self, field: np.ndarray, scale: float, low: Color, high: Color,
+               obstacle: np.ndarray, obstacle_color: Color) -> np.ndarray:
+        """Color |field| / scale from ``low`` to ``high``, solids in ``obstacle_color``"""
+        t, lo, hi = self._t, self._lo, self._hi
+        np.abs(field.T, out=t)
+        t /= scale
+        np.clip(t, 0, 1, out=t)
+        for k in range(3):
+            # low * (1 - t) + high * t, truncated like int()
+            np.subtract(1, t, out=lo)
+            lo *= low[k]
+            np.multiply(t, high[k], out=hi)
+            lo += hi
+            np.copyto(self.image[..., k], lo, casting='unsafe')
+        np.copyto(self.image, np.asarray(obstacle_color, dtype=np.uint8), where=obstacle.T[..., None])
+        return self.image
@@ -2,20 +2,55 @@ import pygame
 import numpy as np
 from scipy.ndimage import gaussian_filter
 
+from backend.background import BackgroundSimulation
+
+from .render import FieldRenderer
+
+
+def _paint_stroke(sim, points, radius, solid):
+    sim.apply_obstacle_stroke(points, radius, solid)
+
+
+def _toggle_profiling(sim):
+    sim.profiler = None if sim.profiler is not None else sim.enable_profiling()
+
+
+# Stats overlay labels of the per-phase timings get_statistics adds while
+# profiling is on
+PHASE_LABELS = [
+    ('advect_ms', "Adveksiyon"), ('diffuse_ms', "Difüzyon"), ('divergence_ms', "Diverjans"),
+    ('pressure_ms', "Basınç"), ('gradient_ms', "Gradyan"), ('boundaries_ms', "Sınırlar"),
+]
+
+
 class FluidUI:
-    def __init__(self, simulator, width=1000, height=1000):
+    def __init__(self, simulator, width=1000, height=1000, threaded=False, multires=None):
         self.sim = simulator
+        # multires: a backend.multires.MultiResolution whose current level is
+        # ``simulator``; M switches between its coarse preview and fine grid
+        self.multires = multires
+        # threaded: the simulator steps on its own thread, the UI renders the
+        # latest snapshot and sends edits back as queued commands
+        self.background = BackgroundSimulation(simulator) if threaded else None
+        self.fps = 0.0
         self.width = width
         self.height = height
         self.cell_size_x = width // simulator.nx
         self.cell_size_y = height // simulator.ny
         self.screen = None
+        self.renderer = FieldRenderer(simulator.nx, simulator.ny)
+        self._frame_key = None
         self.font = None
         self.running = True
         self.paused = True
         self.show_pressure = False
         self.drawing_obstacle = False
         self.clearing_obstacle = False
+        # Cells dragged over this frame, sent as one stroke edit per frame;
+        # 0.75 paints a single cell per point and 4-connected diagonals
+        self.brush_radius = 0.75
+        self._stroke = []
+        self._stroke_end = None
         self.show_stats = False
         self.active_mode = None
         self.circle_radius = int(4 * 1.5)
@@ -46,45 +81,97 @@ class FluidUI:
         self.screen = pygame.display.set_mode((self.width, self.height))
         pygame.display.set_caption("2D Fluid Simulation (Admin Panel)")
         self.font = pygame.font.SysFont("arial", 14)
+        self._make_surfaces()
 
-    def draw_grid(self):
-        u, v = self.sim.get_velocity()
-        p = self.sim.get_pressure()
-        obstacle = self.sim.get_obstacle()
-        speed = np.sqrt(u**2 + v**2)
-        speed_smooth = gaussian_filter(speed, sigma=1.0)
-        max_speed = np.max(speed_smooth) if np.max(speed_smooth) > 0 else 1
-        max_pressure = np.max(np.abs(p)) if np.max(np.abs(p)) > 0 else 1
+    def _make_surfaces(self):
+        self.field_surface = pygame.Surface((self.sim.nx, self.sim.ny))
+        self.scaled_surface = pygame.Surface((self.sim.nx * self.cell_size_x, self.sim.ny * self.cell_size_y))
+
+    def toggle_resolution(self):
+        """Switch between the coarse preview and the fine grid, carrying the flow over"""
+        if self.multires is None:
+            return
+        if self.background is not None:
+            self.background.stop()  # The worker must not step while the state moves
+        if self.multires.level == "coarse":
+            self.multires.prolong()
+        else:
+            self.multires.restrict()
+        self.sim = self.multires.current
+        self.cell_size_x = self.width // self.sim.nx
+        self.cell_size_y = self.height // self.sim.ny
+        self.renderer = FieldRenderer(self.sim.nx, self.sim.ny)
+        self._frame_key = None
+        self._stroke, self._stroke_end = [], None
+        self._make_surfaces()
+        if self.background is not None:
+            self.background = BackgroundSimulation(self.sim)
+            self.background.paused = self.paused
+            self.background.start()
 
+    @property
+    def view(self):
+        """What to draw: the latest snapshot in threaded mode, else the simulator"""
+        return self.background.latest() if self.background is not None else self.sim
 
+    def edit(self, fn, *args):
+        """Run ``fn(sim, *args)`` now, or queue it for the simulation thread"""
+        if self.background is not None:
+            self.background.submit(fn, *args)
+        else:
+            fn(self.sim, *args)
+
+    def set_obstacle(self, mask):
+        self.edit(lambda sim, mask: sim.set_obstacle(mask), mask)
+
+    def set_viscosity(self, nu):
+        self.edit(lambda sim, nu: sim.set_viscosity(nu), nu)
+
+    def _extend_stroke(self, x, y):
+        j = x // self.cell_size_x
+        i = y // self.cell_size_y
+        if 0 <= i < self.sim.ny and 0 <= j < self.sim.nx:
+            if not self._stroke and self._stroke_end is not None:
+                self._stroke.append(self._stroke_end)  # Continue from the last frame's stroke
+            self._stroke.append((j, i))
+
+    def _flush_stroke(self):
+        """Send the cells dragged over since the last flush as a single obstacle edit"""
+        if self._stroke:
+            self.edit(_paint_stroke, self._stroke, self.brush_radius, self.drawing_obstacle)
+            self._stroke_end = self._stroke[-1]
+            self._stroke = []
+
+    def draw_grid(self):
+        view = self.view
+        key = (view.version, self.show_pressure, self.AIR_COLOR)
+        if key != self._frame_key:
+            self._render_frame(view)
+            self._frame_key = key
         self.screen.fill(self.BG_COLOR)  # (0, 0, 0)
+        self.screen.blit(self.scaled_surface, (0, 0))
+
+    def _render_frame(self, view):
+        """Rebuild the scaled field image; only needed when the state or colors change"""
+        obstacle = view.get_obstacle()
+        if self.show_pressure:
+            # Basınç görselleştirme
+            field = view.get_pressure()
+            low, high = self.PRESSURE_COLORS
+        else:
+            # Hava hücreleri için seçilen AIR_COLOR kullanılıyor, yoğunluk hız ile ölçekleniyor
+            field = gaussian_filter(view.get_velocity_magnitude(), sigma=1.0)
+            low, high = (0, 0, 0), self.AIR_COLOR
+        peak = np.max(np.abs(field))
+        scale = peak if peak > 0 else 1
 
-        for i in range(self.sim.ny):
-            for j in range(self.sim.nx):
-                rect = (j * self.cell_size_x, i * self.cell_size_y,
-                        self.cell_size_x, self.cell_size_y)
-
-                if obstacle[i, j]:
-                    color = self.OBSTACLE_COLOR  # Engeller beyaz
-                elif self.show_pressure:
-                    # Basınç görselleştirme
-                    p_norm = np.clip(np.abs(p[i, j]) / max_pressure, 0, 1)
-                    r = int(self.PRESSURE_COLORS[0][0] * (1 - p_norm) + self.PRESSURE_COLORS[1][0] * p_norm)
-                    g = int(self.PRESSURE_COLORS[0][1] * (1 - p_norm) + self.PRESSURE_COLORS[1][1] * p_norm)
-                    b = int(self.PRESSURE_COLORS[0][2] * (1 - p_norm) + self.PRESSURE_COLORS[1][2] * p_norm)
-                    color = (r, g, b)
-                else:
-                    # Hava hücreleri için seçilen AIR_COLOR kullanılıyor, yoğunluk hız ile ölçekleniyor
-                    s_norm = np.clip(speed_smooth[i, j] / max_speed, 0, 1)
-                    r = int(self.AIR_COLOR[0] * s_norm)
-                    g = int(self.AIR_COLOR[1] * s_norm)
-                    b = int(self.AIR_COLOR[2] * s_norm)
-                    color = (r, g, b)
-
-                pygame.draw.rect(self.screen, color, rect)
+        # Whole field as one RGB array, one blit and one scale to the window
+        image = self.renderer.render(field, scale, low, high, obstacle, self.OBSTACLE_COLOR)
+        pygame.surfarray.blit_array(self.field_surface, image)
+        pygame.transform.scale(self.field_surface, self.scaled_surface.get_size(), self.scaled_surface)
 
     def draw_stats(self):
-        stats = self.sim.get_statistics()
+        stats = self.view.get_statistics()
         stats_text = [
             f"Zaman: {stats['time']:.2f}s",
             f"Adım: {stats['step_count']}",
@@ -92,8 +179,16 @@ class FluidUI:
             f"Ort Hız: {stats['avg_speed']:.2f}",
             f"Max Basınç: {stats['max_pressure']:.2f}",
             f"Min Basınç: {stats['min_pressure']:.2f}",
-            f"Adım Süresi: {stats['avg_step_time']*1000:.1f}ms"
+            f"Adım Süresi: {stats['avg_step_time']*1000:.1f}ms",
+            f"FPS: {self.fps:.0f}"
         ]
+        if self.multires is not None:
+            stats_text.append(f"Izgara: {self.sim.nx}x{self.sim.ny}")
+        if 'steps_per_sec' in stats:
+            stats_text.append(f"Adım/s: {stats['steps_per_sec']:.0f}")
+        for key, label in PHASE_LABELS:
+            if key in stats:
+                stats_text.append(f"{label}: {stats[key]:.2f}ms")
 
         for i, text in enumerate(stats_text):
             label = self.font.render(text, True, (255, 255, 255))
@@ -115,7 +210,7 @@ class FluidUI:
         guide_text = [
             "SPACE: Başlat/Durdur", "R: Sıfırla",
             "S: İstatistik", "C: Daire", "X: Dikdörtgen", "H: Yarım Daire", "T: Üçgen", 
-            "Sol Tık: Ekle", "Sağ Tık: Sil", "Q: Çık"
+            "P: Profil", "M: Çözünürlük", "Sol Tık: Ekle", "Sağ Tık: Sil", "Q: Çık"
         ]
 
         for i, text in enumerate(guide_text):
@@ -139,8 +234,10 @@ class FluidUI:
             elif event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_SPACE:
                     self.paused = not self.paused
+                    if self.background is not None:
+                        self.background.paused = self.paused
                 elif event.key == pygame.K_r:
-                    self.sim.reset()
+                    self.edit(lambda sim: sim.reset())
                 elif event.key == pygame.K_s:
                     self.show_stats = not self.show_stats
                 elif event.key == pygame.K_c:
@@ -151,6 +248,10 @@ class FluidUI:
                     self.active_mode = "semicircle"
                 elif event.key == pygame.K_t:
                     self.active_mode = "triangle"
+                elif event.key == pygame.K_m:
+                    self.toggle_resolution()
+                elif event.key == pygame.K_p:
+                    self.edit(_toggle_profiling)
                 elif event.key == pygame.K_q:
                     self.running = False
             elif event.type == pygame.MOUSEBUTTONDOWN:
@@ -164,13 +265,13 @@ class FluidUI:
                     self.slider_knob_pos = min(max(x, self.viscosity_slider_rect.left), 
                                               self.viscosity_slider_rect.right)
                     self.viscosity_slider_value = (self.slider_knob_pos - self.viscosity_slider_rect.left) / self.viscosity_slider_rect.width
-                    self.sim.nu = self.viscosity_slider_value * 0.1
+                    self.set_viscosity(self.viscosity_slider_value * 0.1)
                 elif event.button == 1:
                     j = x // self.cell_size_x
                     i = y // self.cell_size_y
                     if 0 <= i < self.sim.ny and 0 <= j < self.sim.nx:
                         if self.active_mode == "circle":
-                            self.sim.set_obstacle(self.sim.create_circle_obstacle(j, i, int(self.circle_radius)))
+                            self.set_obstacle(self.sim.create_circle_obstacle(j, i, int(self.circle_radius)))
                             self.active_mode = None
                         elif self.active_mode == "rect":
                             self.rect_coords[0] = j
@@ -181,19 +282,27 @@ class FluidUI:
                                 self.rect_coords[0], self.rect_coords[1],
                                 self.rect_coords[2], self.rect_coords[3]
                             )
-                            self.sim.set_obstacle(mask)
+                            self.set_obstacle(mask)
                             self.active_mode = None
                         elif self.active_mode == "semicircle":
-                            self.sim.set_obstacle(self.sim.create_semicircle_obstacle(j, i, int(self.circle_radius)))
+                            self.set_obstacle(self.sim.create_semicircle_obstacle(j, i, int(self.circle_radius)))
                             self.active_mode = None
                         elif self.active_mode == "triangle":
-                            self.sim.set_obstacle(self.sim.create_triangle_obstacle(j, i, int(self.circle_radius)))
+                            self.set_obstacle(self.sim.create_triangle_obstacle(j, i, int(self.circle_radius)))
                             self.active_mode = None
                         else:
+                            self._flush_stroke()
                             self.drawing_obstacle = True
+                            self._stroke_end = None
+                            self._extend_stroke(x, y)
                 elif event.button == 3:
+                    self._flush_stroke()
                     self.clearing_obstacle = True
+                    self._stroke_end = None
+                    self._extend_stroke(x, y)
             elif event.type == pygame.MOUSEBUTTONUP:
+                self._flush_stroke()
+                self._stroke_end = None
                 if event.button == 1:
                     self.drawing_obstacle = False
                     self.dragging_slider = False
@@ -205,22 +314,21 @@ class FluidUI:
                     self.slider_knob_pos = min(max(x, self.viscosity_slider_rect.left), 
                                               self.viscosity_slider_rect.right)
                     self.viscosity_slider_value = (self.slider_knob_pos - self.viscosity_slider_rect.left) / self.viscosity_slider_rect.width
-                    self.sim.nu = self.viscosity_slider_value * 0.1
+                    self.set_viscosity(self.viscosity_slider_value * 0.1)
                 elif self.drawing_obstacle or self.clearing_obstacle:
-                    j = x // self.cell_size_x
-                    i = y // self.cell_size_y
-                    if 0 <= i < self.sim.ny and 0 <= j < self.sim.nx:
-                        new_obstacle = self.sim.get_obstacle().copy()
-                        new_obstacle[i, j] = self.drawing_obstacle
-                        self.sim.set_obstacle(new_obstacle)
+                    self._extend_stroke(x, y)
+        self._flush_stroke()
 
     def run(self):
         self.init_pygame()
         clock = pygame.time.Clock()
+        if self.background is not None:
+            self.background.paused = self.paused
+            self.background.start()
 
         while self.running:
             self.handle_events()
-            if not self.paused:
+            if not self.paused and self.background is None:
                 self.sim.step()
 
             self.screen.fill(self.BG_COLOR)
@@ -232,5 +340,12 @@ class FluidUI:
                 self.draw_stats()
             pygame.display.flip()
             clock.tick(60)
+            self.fps = clock.get_fps()
 
+        if self.background is not None:
+            self.background.stop()
+        if self.multires is not None:
+            self.multires.close()
+        else:
+            self.sim.close()
         pygame.quit()
@@ -1,9 +1,28 @@
-from backend.simulation import FluidSimulator
+import argparse
+
+from backend.multires import MultiResolution
+from backend.simulation import DIFFUSION_THETA, FluidSimulator
 from frontend.python.ui import FluidUI
 
 def main():
-    simulator = FluidSimulator(nx=80, ny=60, dx=1.0, dt=0.1, viscosity=0.02, u_in=1.0)
-    ui = FluidUI(simulator, width=1200, height=800)
+    parser = argparse.ArgumentParser(description="2D fluid simulation")
+    parser.add_argument("--threaded", action="store_true",
+                        help="step the simulation on a background thread, decoupled from rendering")
+    parser.add_argument("--diffusion", choices=list(DIFFUSION_THETA), default="explicit",
+                        help="implicit schemes keep dt free of the viscosity limit")
+    parser.add_argument("--nx", type=int, default=80)
+    parser.add_argument("--ny", type=int, default=60)
+    parser.add_argument("--preview", type=int, choices=[2, 4],
+                        help="start on a grid this many times coarser; M switches to the full grid")
+    args = parser.parse_args()
+
+    simulator = FluidSimulator(nx=args.nx, ny=args.ny, dx=1.0, dt=0.1, viscosity=0.02, u_in=1.0,
+                               diffusion=args.diffusion)
+    multires = None
+    if args.preview:
+        multires = MultiResolution(simulator, args.preview)
+        simulator = multires.restrict()
+    ui = FluidUI(simulator, width=1200, height=800, threaded=args.threaded, multires=multires)
     ui.run()
 
 if __name__ == "__main__":